@@ -10,11 +10,14 @@ import os
 import sys
 import threading
 import time
+from typing import List, Optional, Tuple
 
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 
-from routers import copilot, export, health, inference, training
+from export import store
+from routers import autolabel, copilot, events, export, health, inference, models, training
+from services import job_manager
 
 RUNTIME_VERSION = "0.1.0"
 
@@ -23,6 +26,14 @@ def build_app(token: str, models_dir: str, log_dir: str) -> FastAPI:
     app = FastAPI(title="Vailabel AI Runtime", version=RUNTIME_VERSION)
     app.state.token = token
     app.state.models_dir = models_dir
+    store.configure(models_dir)
+    job_db = os.environ.get("VAILABEL_RT_JOB_DB") or (
+        os.path.join(models_dir, "jobs.sqlite3") if models_dir else ""
+    )
+    if job_db:
+        # Jobs survive a runtime restart; ones left "running" are resumed or failed.
+        for action in job_manager.configure(job_db):
+            print(f"job {action['job_id']} ({action['kind']}): {action['action']}", file=sys.stderr)
     app.state.log_dir = log_dir
     app.state.start_time = time.time()
     app.state.version = RUNTIME_VERSION
@@ -41,7 +52,10 @@ def build_app(token: str, models_dir: str, log_dir: str) -> FastAPI:
     app.include_router(inference.ocr_router)
     app.include_router(copilot.router)
     app.include_router(training.router)
+    app.include_router(autolabel.router)
     app.include_router(export.router)
+    app.include_router(models.router)
+    app.include_router(events.router)
 
     @app.post("/shutdown")
     async def shutdown():
@@ -55,6 +69,36 @@ def build_app(token: str, models_dir: str, log_dir: str) -> FastAPI:
     return app
 
 
+def parse_preload(items: List[str]) -> List[Tuple[Optional[str], str]]:
+    """`--preload` values as (family, model_path); "family=path" or a bare path
+    (family inferred from the path, as for requests)."""
+    out: List[Tuple[Optional[str], str]] = []
+    for item in items:
+        family, sep, path = item.partition("=")
+        if sep and family and not any(c in family for c in "/\\:."):
+            out.append((family.strip(), path.strip()))
+        else:
+            out.append((None, item.strip()))
+    return out
+
+
+def _preload(entries: List[Tuple[Optional[str], str]]) -> None:
+    """Warm + pin each model in the background so binding the port (and the
+    launcher's health check) isn't held up by weight loading."""
+
+    def _run():
+        from inference import warmup
+
+        for family, path in entries:
+            try:
+                info = warmup.warm(path, family, pin=True)
+                print(f"preloaded {info['key']} in {info['seconds']}s", file=sys.stderr)
+            except Exception as exc:  # noqa: BLE001
+                print(f"preload of {path} failed: {exc}", file=sys.stderr)
+
+    threading.Thread(target=_run, daemon=True).start()
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Vailabel AI runtime")
     parser.add_argument("--host", default="127.0.0.1")
@@ -62,12 +106,21 @@ def main() -> None:
     parser.add_argument("--token", default="")
     parser.add_argument("--models-dir", dest="models_dir", default="")
     parser.add_argument("--log-dir", dest="log_dir", default="")
+    parser.add_argument(
+        "--preload",
+        action="append",
+        default=[],
+        metavar="FAMILY=MODEL_PATH",
+        help="load + pin a model at boot (repeatable); the family prefix is optional",
+    )
     args = parser.parse_args()
 
     if args.models_dir:
         os.makedirs(args.models_dir, exist_ok=True)
 
     app = build_app(args.token, args.models_dir, args.log_dir)
+    if args.preload:
+        _preload(parse_preload(args.preload))
 
     import uvicorn
 
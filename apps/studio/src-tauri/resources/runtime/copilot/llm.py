@@ -73,12 +73,21 @@ def _models_endpoint(base_url: str) -> str:
 
 
 def image_data_url(path: str) -> str | None:
-    """Encode an image file as an OpenAI-style `data:` URL for vision messages."""
+    """Encode an image file as an OpenAI-style `data:` URL for vision messages.
+
+    Memoized in the runtime's decoded-image cache (keyed by path + mtime), so a
+    multi-step turn encodes each image once."""
+    from inference.loader import IMAGES
+
     try:
-        with open(path, "rb") as handle:
-            raw = handle.read()
+        return IMAGES.get(path, "data_url", _encode_data_url)
     except OSError:
         return None
+
+
+def _encode_data_url(path: str) -> tuple[str, int]:
+    with open(path, "rb") as handle:
+        raw = handle.read()
     ext = os.path.splitext(path)[1].lower().lstrip(".")
     mime = {
         "png": "image/png",
@@ -86,7 +95,8 @@ def image_data_url(path: str) -> str | None:
         "gif": "image/gif",
         "bmp": "image/bmp",
     }.get(ext, "image/jpeg")
-    return f"data:{mime};base64,{base64.b64encode(raw).decode('ascii')}"
+    url = f"data:{mime};base64,{base64.b64encode(raw).decode('ascii')}"
+    return url, len(url)
 
 
 def read_text_file(path: str) -> str | None:
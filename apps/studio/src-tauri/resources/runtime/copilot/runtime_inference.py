@@ -12,7 +12,7 @@ from __future__ import annotations
 from types import SimpleNamespace
 from typing import Any
 
-from inference import detect, florence, segment
+from inference.adapters import adapter
 from inference.loader import RuntimeDependencyError, infer_family
 
 from .orchestrator import CopilotError
@@ -57,8 +57,7 @@ class RuntimeInference:
             family=None,
             prompt=None,
         )
-        family = infer_family(model_path, None)
-        fn = florence.run_detect if family == "florence2" else detect.run
+        fn = adapter("detect", infer_family(model_path, None))
         try:
             result = fn(req)
         except RuntimeDependencyError as exc:
@@ -85,26 +84,30 @@ class RuntimeInference:
                 "No segmentation model is installed. Install MobileSAM on the AI Models "
                 "page to outline detections."
             )
+        if not boxes:
+            return []
+        # All boxes in one request: SAM encodes the image once for the lot.
+        req = SimpleNamespace(
+            model_path=sam_model_path,
+            image_path=image_path,
+            points=[],
+            box_xyxy=None,
+            boxes=[list(box) for box in boxes],
+            point_groups=[],
+            family=None,
+        )
+        try:
+            result = adapter("segment", infer_family(sam_model_path, None))(req)
+        except RuntimeDependencyError as exc:
+            raise CopilotError(str(exc)) from exc
+        except FileNotFoundError as exc:
+            raise CopilotError(str(exc)) from exc
+        except Exception as exc:  # noqa: BLE001
+            raise CopilotError(f"segmentation failed: {exc}") from exc
         masks: list[dict[str, Any]] = []
-        for box in boxes:
-            req = SimpleNamespace(
-                model_path=sam_model_path,
-                image_path=image_path,
-                points=[],
-                box_xyxy=list(box),
-                family=None,
-            )
-            try:
-                result = segment.run(req)
-            except RuntimeDependencyError as exc:
-                raise CopilotError(str(exc)) from exc
-            except FileNotFoundError as exc:
-                raise CopilotError(str(exc)) from exc
-            except Exception as exc:  # noqa: BLE001
-                raise CopilotError(f"segmentation failed: {exc}") from exc
-            for mask in result.get("masks", []) if isinstance(result, dict) else []:
-                if target:
-                    mask["name"] = target
-                    mask["labelName"] = target
-                masks.append(mask)
+        for mask in result.get("masks", []) if isinstance(result, dict) else []:
+            if target:
+                mask["name"] = target
+                mask["labelName"] = target
+            masks.append(mask)
         return masks
@@ -1,2 +1,2 @@
-# Exporters (onnx, tensorrt, openvino). Each exposes a `run(req)` callable that
-# converts `req.model_path` to `req.output_path` and returns an ExportResult.
+# Exporters (onnx, tensorrt, openvino, quantize). Each exposes a `run(req)` callable
+# that converts `req.model_path` to `req.output_path` and returns an ExportResult.
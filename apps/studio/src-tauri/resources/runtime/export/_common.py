@@ -5,9 +5,11 @@ raises — a missing toolchain becomes `ok: false` with a `pip install` hint
 (HTTP 200 by contract; the Rust `export_*` command keys off `ok`).
 """
 
+import hashlib
 import os
 import shutil
-from typing import Any, Dict, Optional
+import threading
+from typing import Any, Dict, Optional, Tuple
 
 from inference.loader import RuntimeDependencyError, infer_family, lazy_import
 
@@ -26,6 +28,40 @@ _PASSTHROUGH = (
 )
 
 
+# (abspath, mtime_ns, size) -> hex digest, so re-exporting unchanged weights
+# never re-reads a multi-hundred-MB checkpoint.
+_DIGESTS: Dict[Tuple[str, int, int], str] = {}
+_DIGESTS_LOCK = threading.Lock()
+
+
+def file_sha256(path: str) -> str:
+    """SHA-256 of a file (or, for an export directory, of its files in order)."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"model not found on disk: {path}")
+    digest = hashlib.sha256()
+    if os.path.isdir(path):
+        # A directory's mtime misses in-place edits, so only its files are memoized.
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                full = os.path.join(root, name)
+                digest.update(os.path.relpath(full, path).encode("utf-8") + b"\0")
+                digest.update(file_sha256(full).encode("ascii"))
+        return digest.hexdigest()
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    with _DIGESTS_LOCK:
+        cached = _DIGESTS.get(key)
+    if cached:
+        return cached
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    with _DIGESTS_LOCK:
+        _DIGESTS[key] = digest.hexdigest()
+    return _DIGESTS[key]
+
+
 def _load(model_path: str):
     ultra = lazy_import("ultralytics", "ultralytics")
     family = infer_family(model_path)
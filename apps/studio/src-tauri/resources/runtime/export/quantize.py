@@ -0,0 +1,249 @@
+"""Static INT8 post-training quantization (ONNX / OpenVINO) with an accuracy check.
+
+Calibration images are sampled from the project's own dataset — the ultralytics
+data YAML training already takes as `dataset_path` — instead of whatever
+ultralytics would default to:
+
+- `onnx`: export FP32 ONNX, then `onnxruntime.quantization.quantize_static`
+  (QDQ, per-channel INT8 weights) calibrated on the sample, letterboxed
+  exactly as `inference/onnxrt.py` feeds it;
+- `openvino`: ultralytics' NNCF path (`int8=True, data=…`) with `fraction`
+  sized so NNCF sees the same number of images.
+
+Unless `opts.evaluate` is false, both the FP32 and INT8 artifacts are run
+through `model.val` on the dataset's val split, and the ExportResult gains
+`report: {calibration_images, fp32, int8, map50_95_drop, speedup}`. With
+`opts.max_map_drop` set (absolute mAP50-95, e.g. 0.01), an INT8 model that
+loses more is rejected: `ok: false` and nothing is written. Both formats are
+built in a scratch dir and only moved out once accepted. Like every exporter,
+`run` never raises.
+"""
+
+import os
+import random
+import shutil
+import tempfile
+from typing import Any, Dict, List, Optional
+
+from export._common import _finalize, _load
+from inference.dataset import iter_images
+from inference.loader import RuntimeDependencyError, infer_family, lazy_import
+
+FORMATS = ("onnx", "openvino")
+
+# Images drawn from the train split for calibration when `opts.calib_size` is absent.
+DEFAULT_CALIB_SIZE = 300
+
+
+def _split_sources(dataset_path: str, split: str) -> List[str]:
+    """The directories / list files a data YAML names for `split`."""
+    yaml = lazy_import("yaml", "pyyaml")
+    with open(dataset_path, "r", encoding="utf-8") as fh:
+        data = yaml.safe_load(fh) or {}
+    root = data.get("path") or ""
+    if not os.path.isabs(root):
+        root = os.path.join(os.path.dirname(os.path.abspath(dataset_path)), root)
+    entries = data.get(split) or (data.get("train") if split != "train" else None) or []
+    if isinstance(entries, str):
+        entries = [entries]
+    return [e if os.path.isabs(e) else os.path.join(root, e) for e in entries]
+
+
+def split_images(dataset_path: str, split: str = "train") -> List[str]:
+    """Every image path of `split`, in the dataset's (sorted) order."""
+    paths: List[str] = []
+    for source in _split_sources(dataset_path, split):
+        paths.extend(iter_images(source))
+    if not paths:
+        raise FileNotFoundError(f"no '{split}' images found for dataset {dataset_path}")
+    return paths
+
+
+def calibration_sample(paths: List[str], count: int, seed: int = 0) -> List[str]:
+    """A deterministic random sample of up to `count` of `paths`."""
+    if len(paths) <= count:
+        return list(paths)
+    return sorted(random.Random(seed).sample(paths, count))
+
+
+def _calibration_reader(ort_quant: Any, images: List[str], model_path: str) -> Any:
+    """An onnxruntime `CalibrationDataReader` over letterboxed `images`."""
+    from inference.loader import load_array
+    from inference.onnxrt import OnnxDetector
+    from inference.postprocess import letterbox
+
+    # Reuse the serving backend's view of the graph (input name, size, layout)
+    # so calibration sees exactly what inference will feed.
+    probe = OnnxDetector(model_path)
+    stretch = probe.layout == "rtdetr"
+    name, size = probe.input_name, probe.input_hw
+    del probe
+    np = lazy_import("numpy")
+
+    class Reader(ort_quant.CalibrationDataReader):
+        def __init__(self) -> None:
+            self._iter = iter(images)
+
+        def get_next(self) -> Optional[Dict[str, Any]]:
+            path = next(self._iter, None)
+            if path is None:
+                return None
+            tensor, _, _ = letterbox(load_array(path), size, stretch=stretch)
+            return {name: np.expand_dims(tensor, 0)}
+
+        def rewind(self) -> None:
+            self._iter = iter(images)
+
+    return Reader()
+
+
+def _quantize_onnx(
+    model: Any, images: List[str], workdir: str, kwargs: Dict[str, Any]
+) -> Dict[str, str]:
+    ort_quant = lazy_import("onnxruntime.quantization", "onnxruntime")
+    fp32 = os.path.join(workdir, "model_fp32.onnx")
+    shutil.move(str(model.export(format="onnx", dynamic=False, **kwargs)), fp32)
+    prepped = os.path.join(workdir, "model_prep.onnx")
+    try:
+        ort_quant.shape_inference.quant_pre_process(fp32, prepped)
+    except Exception:  # noqa: BLE001 — optional optimization pass; quantize as-is
+        prepped = fp32
+    int8 = os.path.join(workdir, "model_int8.onnx")
+    ort_quant.quantize_static(
+        prepped,
+        int8,
+        _calibration_reader(ort_quant, images, fp32),
+        quant_format=ort_quant.QuantFormat.QDQ,
+        per_channel=True,
+        weight_type=ort_quant.QuantType.QInt8,
+        activation_type=ort_quant.QuantType.QUInt8,
+        calibrate_method=ort_quant.CalibrationMethod.MinMax,
+    )
+    _copy_metadata(fp32, int8)
+    return {"fp32": fp32, "int8": int8}
+
+
+def _copy_metadata(src: str, dst: str) -> None:
+    """Carry ultralytics' metadata (names, imgsz, task) over to the INT8 graph."""
+    onnx = lazy_import("onnx", "onnx")
+    source, target = onnx.load(src), onnx.load(dst)
+    have = {p.key for p in target.metadata_props}
+    for prop in source.metadata_props:
+        if prop.key not in have:
+            entry = target.metadata_props.add()
+            entry.key, entry.value = prop.key, prop.value
+    onnx.save(target, dst)
+
+
+def _quantize_openvino(
+    model: Any,
+    fraction: float,
+    dataset_path: str,
+    workdir: str,
+    evaluate: bool,
+    kwargs: Dict[str, Any],
+) -> Dict[str, str]:
+    lazy_import("openvino", "openvino")
+    lazy_import("nncf", "nncf")
+    produced = str(
+        model.export(format="openvino", int8=True, data=dataset_path, fraction=fraction, **kwargs)
+    )
+    # ultralytics writes next to the weights; keep the IR in the scratch dir
+    # until it passes the accuracy check. `dest` is where it would have gone.
+    int8 = os.path.join(workdir, "int8_openvino_model")
+    shutil.move(produced, int8)
+    out = {"int8": int8, "dest": produced}
+    if evaluate:
+        # The FP32 IR is only a yardstick: park it in the scratch dir.
+        fp32 = os.path.join(workdir, "fp32_openvino_model")
+        shutil.move(str(model.export(format="openvino", **kwargs)), fp32)
+        out["fp32"] = fp32
+    return out
+
+
+def _evaluate(artifact: str, dataset_path: str, imgsz: Any, family: str) -> Dict[str, float]:
+    """mAP50 / mAP50-95 on the val split and per-image inference latency (CPU)."""
+    ultra = lazy_import("ultralytics", "ultralytics")
+    kwargs = {"imgsz": imgsz} if imgsz else {}
+    model = ultra.RTDETR(artifact) if family == "rtdetr" else ultra.YOLO(artifact, task="detect")
+    metrics = model.val(
+        data=dataset_path, batch=1, device="cpu", plots=False, verbose=False, **kwargs
+    )
+    return {
+        "map50": round(float(metrics.box.map50), 4),
+        "map50_95": round(float(metrics.box.map), 4),
+        "latency_ms": round(float(metrics.speed.get("inference", 0.0)), 2),
+    }
+
+
+def run(req: Any) -> Dict[str, Any]:
+    """Quantize `req.model_path` to static INT8 `req.format`; ExportResult + `report`."""
+    output_path = getattr(req, "output_path", "") or ""
+    fmt = (getattr(req, "format", "") or "onnx").lower()
+    opts = req.opts if isinstance(getattr(req, "opts", None), dict) else {}
+    workdir = tempfile.mkdtemp(prefix="vailabel-int8-")
+    try:
+        if fmt not in FORMATS:
+            raise ValueError(f"INT8 quantization supports {FORMATS}, not '{fmt}'")
+        family = infer_family(req.model_path)
+        if family not in ("yolo", "rtdetr"):
+            raise ValueError("INT8 quantization needs ultralytics detector weights (.pt)")
+        dataset_path = getattr(req, "dataset_path", "") or ""
+        if not os.path.isfile(dataset_path):
+            raise FileNotFoundError(f"dataset yaml not found on disk: {dataset_path}")
+
+        train = split_images(dataset_path)
+        count = max(1, int(opts.get("calib_size", DEFAULT_CALIB_SIZE)))
+        images = calibration_sample(train, count, seed=int(opts.get("seed", 0)))
+        evaluate = bool(opts.get("evaluate", True))
+        imgsz = opts.get("imgsz")
+        kwargs = {"imgsz": imgsz} if imgsz else {}
+
+        model = _load(req.model_path)
+        if fmt == "onnx":
+            artifacts = _quantize_onnx(model, images, workdir, kwargs)
+            # The scratch dir is removed below, so never leave the result there.
+            output_path = output_path or os.path.splitext(req.model_path)[0] + "_int8.onnx"
+        else:
+            # NNCF samples `fraction` of the train split: the same image count.
+            fraction = min(1.0, len(images) / len(train))
+            artifacts = _quantize_openvino(
+                model, fraction, dataset_path, workdir, evaluate, kwargs
+            )
+            output_path = output_path or artifacts["dest"]
+
+        report: Dict[str, Any] = {"format": fmt, "calibration_images": len(images)}
+        if evaluate:
+            report["fp32"] = _evaluate(artifacts["fp32"], dataset_path, imgsz, family)
+            report["int8"] = _evaluate(artifacts["int8"], dataset_path, imgsz, family)
+            report["map50_95_drop"] = round(
+                report["fp32"]["map50_95"] - report["int8"]["map50_95"], 4
+            )
+            if report["int8"]["latency_ms"]:
+                report["speedup"] = round(
+                    report["fp32"]["latency_ms"] / report["int8"]["latency_ms"], 2
+                )
+            limit = opts.get("max_map_drop")
+            if limit is not None and report["map50_95_drop"] > float(limit):
+                return {
+                    "ok": False,
+                    "output_path": output_path,
+                    "error": (
+                        f"INT8 mAP50-95 dropped {report['map50_95_drop']:.4f} "
+                        f"(> max_map_drop {float(limit):.4f}); model not written"
+                    ),
+                    "report": report,
+                }
+
+        final = _finalize(artifacts["int8"], output_path)
+        return {"ok": True, "output_path": final, "error": None, "report": report}
+    except RuntimeDependencyError as exc:
+        return {"ok": False, "output_path": output_path, "error": str(exc)}
+    except Exception as exc:  # noqa: BLE001
+        return {
+            "ok": False,
+            "output_path": output_path,
+            "error": f"int8 {fmt} export failed: {exc}",
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
@@ -0,0 +1,257 @@
+"""Content-addressed store of exported models under `<models_dir>/export-cache`.
+
+An entry is keyed by the SHA-256 of
+
+    {weights sha256, format, normalized opts, toolchain versions}
+
+so retrained weights, different options or an upgraded exporter (ultralytics,
+onnx, openvino, …) each get a fresh build, while anything identical is served
+from disk. Layout, one directory per key:
+
+    export-cache/<key>/entry.json   # format, weights sha, opts, result extras
+    export-cache/<key>/<artifact>   # the .onnx / .engine file or IR directory
+
+Requests are satisfied by hardlinking the artifact to the requested output path
+(a copy across filesystems); entries are written through a temp directory and
+renamed into place, so a crash never leaves a half-written key. After every
+`put` the least-recently-used entries are removed until the store fits
+VAILABEL_RT_EXPORT_CACHE_MB (default 4096; 0 = unbounded). The same pass, and
+opening the store, also drop what no entry owns: key dirs whose entry.json or
+artifact is gone, and staging dirs a crashed `put` left for over an hour.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from importlib import metadata
+from typing import Any, Dict, List, Optional, Tuple
+
+from inference.loader import env_number
+
+_MB = 1024 * 1024
+_STAGING = ".staging-"
+# A staging dir untouched this long belongs to a `put` that died, not a live one.
+_STALE_STAGING_S = 3600.0
+
+# Distributions whose version decides what an export produces, per format.
+TOOLCHAINS: Dict[str, Tuple[str, ...]] = {
+    "onnx": ("ultralytics", "onnx"),
+    "tensorrt": ("ultralytics", "tensorrt"),
+    "openvino": ("ultralytics", "openvino"),
+    "onnx-int8": ("ultralytics", "onnx", "onnxruntime"),
+    "openvino-int8": ("ultralytics", "openvino", "nncf"),
+}
+
+
+def toolchain(fmt: str) -> Dict[str, str]:
+    """Installed versions of the packages that build `fmt` ("" when absent)."""
+    out: Dict[str, str] = {}
+    for dist in TOOLCHAINS.get(fmt, ("ultralytics",)):
+        try:
+            out[dist] = metadata.version(dist)
+        except metadata.PackageNotFoundError:
+            out[dist] = ""
+    return out
+
+
+def normalize_opts(opts: Dict[str, Any]) -> Dict[str, Any]:
+    """Options in canonical form: no unset values, `imgsz: 640` == `[640, 640]`."""
+    out: Dict[str, Any] = {}
+    for key, value in (opts or {}).items():
+        if value is None:
+            continue
+        if key == "imgsz" and isinstance(value, (int, float)):
+            value = [int(value), int(value)]
+        elif isinstance(value, tuple):
+            value = list(value)
+        out[str(key)] = value
+    return out
+
+
+def entry_key(weights_sha: str, fmt: str, opts: Dict[str, Any]) -> str:
+    blob = json.dumps(
+        {
+            "weights": weights_sha,
+            "format": fmt,
+            "opts": normalize_opts(opts),
+            "toolchain": toolchain(fmt),
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _size(path: str) -> int:
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    try:
+        os.link(src, dst)
+    except OSError:  # other filesystem, or links unsupported
+        shutil.copy2(src, dst)
+
+
+def _place(src: str, dst: str) -> None:
+    """Hardlink (else copy) a file or directory tree from `src` to `dst`."""
+    if os.path.isdir(src):
+        shutil.copytree(src, dst, copy_function=_link_or_copy)
+    else:
+        _link_or_copy(src, dst)
+
+
+def _replace(src: str, dst: str) -> None:
+    """Place `src` at `dst`, replacing only an existing path of the same kind."""
+    if os.path.lexists(dst) and os.path.isdir(dst) != os.path.isdir(src):
+        kind = "a directory" if os.path.isdir(dst) else "a file"
+        raise FileExistsError(f"output path {dst} is {kind}; not replacing it")
+    parent = os.path.dirname(dst)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    if os.path.isdir(dst):
+        shutil.rmtree(dst, ignore_errors=True)
+    elif os.path.lexists(dst):
+        os.remove(dst)
+    _place(src, dst)
+
+
+class ArtifactStore:
+    """The on-disk entries under `root`, with an LRU size budget."""
+
+    def __init__(self, root: str, budget_bytes: Optional[int] = None):
+        self.root = root
+        if budget_bytes is None:
+            budget_bytes = int(env_number("VAILABEL_RT_EXPORT_CACHE_MB", 4096) * _MB)
+        self.budget_bytes = max(0, budget_bytes)
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        with self._lock:
+            self._sweep_locked()
+
+    def _dir(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def _entry(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(self._dir(key), "entry.json"), "r", encoding="utf-8") as fh:
+                entry = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        artifact = os.path.join(self._dir(key), entry.get("artifact", ""))
+        return entry if entry.get("artifact") and os.path.exists(artifact) else None
+
+    def get(self, key: str, output_path: str = "") -> Optional[Dict[str, Any]]:
+        """The stored ExportResult for `key`, placed at `output_path`, or None.
+
+        Without an `output_path` the result points into the store itself. A
+        single-file artifact asked for at an existing directory is placed inside
+        it; an existing path of the other kind is never replaced (FileExistsError).
+        """
+        with self._lock:
+            entry = self._entry(key)
+            if entry is None:
+                return None
+            src = os.path.join(self._dir(key), entry["artifact"])
+            os.utime(self._dir(key))  # LRU: last use is the entry dir's mtime
+            if output_path and not os.path.isdir(src) and os.path.isdir(output_path):
+                # Like the exporters' move: a file artifact goes inside the folder.
+                output_path = os.path.join(output_path, os.path.basename(src))
+            if output_path and os.path.abspath(output_path) != os.path.abspath(src):
+                _replace(src, output_path)
+            else:
+                output_path = src
+        result = dict(entry.get("result") or {})
+        result.update(ok=True, output_path=output_path, error=None)
+        return result
+
+    def put(self, key: str, artifact: str, meta: Dict[str, Any]) -> None:
+        """Record `artifact` (left where it is) under `key`, then enforce the budget."""
+        staging = tempfile.mkdtemp(prefix=_STAGING, dir=self.root)
+        try:
+            name = os.path.basename(os.path.normpath(artifact))
+            _place(artifact, os.path.join(staging, name))
+            entry = dict(meta, artifact=name, size=_size(artifact), created=time.time())
+            with open(os.path.join(staging, "entry.json"), "w", encoding="utf-8") as fh:
+                json.dump(entry, fh, default=str)
+            with self._lock:
+                if os.path.exists(self._dir(key)):
+                    shutil.rmtree(self._dir(key), ignore_errors=True)
+                os.replace(staging, self._dir(key))
+                self._collect_locked(keep=key)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def entries(self) -> List[Tuple[str, float, int]]:
+        """(key, last used, bytes) for every entry, least recently used first."""
+        out: List[Tuple[str, float, int]] = []
+        for name in os.listdir(self.root):
+            path = self._dir(name)
+            if name.startswith(".") or not os.path.isdir(path):
+                continue
+            entry = self._entry(name)
+            size = int(entry.get("size", 0)) if entry else 0
+            out.append((name, os.stat(path).st_mtime, size))
+        out.sort(key=lambda item: item[1])
+        return out
+
+    def _sweep_locked(self) -> None:
+        """Remove broken entries and stale staging dirs; they hold disk but no size."""
+        cutoff = time.time() - _STALE_STAGING_S
+        for name in os.listdir(self.root):
+            path = self._dir(name)
+            if not os.path.isdir(path):
+                continue
+            if name.startswith(_STAGING):
+                if os.stat(path).st_mtime < cutoff:
+                    shutil.rmtree(path, ignore_errors=True)
+            elif not name.startswith(".") and self._entry(name) is None:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _collect_locked(self, keep: str) -> None:
+        self._sweep_locked()
+        entries = self.entries()
+        total = sum(size for _, _, size in entries)
+        for key, _, size in entries:
+            if not self.budget_bytes or total <= self.budget_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self._dir(key), ignore_errors=True)
+            total -= size
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self.entries()
+        return {
+            "root": self.root,
+            "entries": len(entries),
+            "bytes": sum(size for _, _, size in entries),
+            "budget_bytes": self.budget_bytes,
+        }
+
+
+_store: Optional[ArtifactStore] = None
+
+
+def configure(models_dir: str) -> Optional[ArtifactStore]:
+    """Point the store at `<models_dir>/export-cache` (no `models_dir`: no store)."""
+    global _store
+    _store = ArtifactStore(os.path.join(models_dir, "export-cache")) if models_dir else None
+    return _store
+
+
+def get_store() -> Optional[ArtifactStore]:
+    return _store
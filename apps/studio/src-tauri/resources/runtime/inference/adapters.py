@@ -0,0 +1,69 @@
+"""Which adapter serves each (task, family): the runtime's one dispatch table.
+
+The inference routes, auto-label jobs, warmup and the copilot all look their
+adapter up here, so wiring in a family is a one-place change. Entries name a
+`module.function` under `inference/` and are resolved on each lookup: the
+adapters import `loader`, so this table can't be imported by it, and a plain
+attribute lookup keeps the heavy adapter modules out of processes that never
+call them.
+
+Tasks: `detect` (one image), `detect_batch` (many images, `{"results": [...]}`),
+`segment`, `caption`, `ocr`, and `warmup(model_path, family, pin) -> cache key`.
+"""
+
+import importlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# task -> (adapter for families not listed, {family: adapter}).
+ADAPTERS: Dict[str, Tuple[Optional[str], Dict[str, str]]] = {
+    "detect": (
+        "detect.run",
+        {
+            "florence2": "florence.run_detect",
+            "onnx": "onnxrt.run",
+            "openvino": "openvino_ir.run",
+            "synthetic": "synthetic.run",
+        },
+    ),
+    "detect_batch": (
+        "detect.run_batch",
+        {
+            "florence2": "florence.run_detect_batch",
+            "onnx": "onnxrt.run_batch",
+            "openvino": "openvino_ir.run_batch",
+            "synthetic": "synthetic.run_batch",
+        },
+    ),
+    "segment": ("segment.run", {"synthetic": "synthetic.run_segment"}),
+    "caption": (
+        "florence.run_caption",
+        {"qwen": "qwen.run_caption", "synthetic": "synthetic.run_caption"},
+    ),
+    "ocr": ("paddle.run", {"florence2": "florence.run_ocr", "synthetic": "synthetic.run_ocr"}),
+    "warmup": (
+        None,
+        {
+            "yolo": "detect.warmup",
+            "rtdetr": "detect.warmup",
+            "sam2": "segment.warmup",
+            "florence2": "florence.warmup",
+            "qwen": "qwen.warmup",
+            "paddleocr": "paddle.warmup",
+            "onnx": "onnxrt.warmup",
+            "openvino": "openvino_ir.warmup",
+            "synthetic": "synthetic.warmup",
+        },
+    ),
+}
+
+
+def adapter(task: str, family: str) -> Callable[..., Any]:
+    """The function serving `task` for `family`; ValueError if there is none."""
+    if task not in ADAPTERS:
+        raise ValueError(f"unknown inference task '{task}' (have: {', '.join(ADAPTERS)})")
+    default, by_family = ADAPTERS[task]
+    target = by_family.get(family, default)
+    if target is None:
+        raise ValueError(f"no {task} adapter for model family '{family}'")
+    module, _, name = target.partition(".")
+    return getattr(importlib.import_module(f"inference.{module}"), name)
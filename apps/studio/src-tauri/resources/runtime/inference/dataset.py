@@ -0,0 +1,40 @@
+"""Listing the images of a dataset: a directory tree or a manifest file.
+
+Shared by auto-label jobs and INT8 calibration, so both walk a dataset in the
+same deterministic order.
+"""
+
+import json
+import os
+from typing import Iterator
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp", ".tif", ".tiff")
+
+
+def iter_images(source: str) -> Iterator[str]:
+    """Yield image paths from a directory tree (sorted walk) or a manifest.
+
+    A manifest is a text file with one path per line, or NDJSON objects carrying
+    `image_path` / `path`. Relative manifest entries resolve against its folder.
+    """
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    yield os.path.join(root, name)
+        return
+    if not os.path.isfile(source):
+        raise FileNotFoundError(f"dataset not found on disk: {source}")
+    base = os.path.dirname(os.path.abspath(source))
+    with open(source, "r", encoding="utf-8") as fh:
+        for raw in fh:
+            line = raw.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("{"):
+                entry = json.loads(line)
+                line = entry.get("image_path") or entry.get("path") or ""
+                if not line:
+                    continue
+            yield line if os.path.isabs(line) else os.path.join(base, line)
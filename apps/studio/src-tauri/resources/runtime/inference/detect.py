@@ -2,18 +2,58 @@
 
 Returns `{"detections": [InferenceAnnotationDraft, …]}` with `type: "box"` and
 pixel-space xyxy coordinates, so results drop into the studio's predictions flow.
+
+`run_batch` serves many images per call: paths are fed to the cached model in
+mini-batches (one `predict` per chunk) and each image gets its own detections
+list in the same draft shape, so auto-labeling scales with the batch size
+rather than with per-request overhead.
+
+Boxes leave the device in one copy per image (`_columns`). Callers that set
+`columnar` get those parallel arrays back as-is — `{"columns": {xyxy, classId,
+confidence, labelName}}` — instead of one draft dict per box.
+
+Sliced inference (`tile` set): very large images are cut into overlapping
+`tile`-px windows read lazily (`loader.open_raster`), the windows go through
+the model in mini-batches at native resolution, and boxes are shifted back to
+image coordinates and merged with class-aware cross-tile NMS.
+
+Concurrent single-image `run` calls against the same model and thresholds are
+coalesced by a `loader.MicroBatcher`, so a burst of studio requests shares
+forward passes instead of contending for the model one image at a time.
 """
 
-from typing import Any, Dict
+import os
+from typing import Any, Callable, Dict, List, Optional
 
 from inference.loader import (
     CACHE,
-    draft,
+    batcher,
+    box_drafts,
     infer_family,
     lazy_import,
+    load_array,
+    open_raster,
     pick_device,
-    xyxy_to_points,
 )
+from inference.postprocess import (
+    DEFAULT_TILE_IOU,
+    batch_results,
+    merge_columns,
+    nms,
+    offset_columns,
+    tile_grid,
+)
+from inference.tracing import span
+
+# Images per `model.predict` call in batch mode when the caller doesn't say.
+DEFAULT_BATCH_SIZE = 8
+
+
+def _default_batch_size() -> int:
+    try:
+        return max(1, int(os.environ.get("VAILABEL_RT_DETECT_BATCH", DEFAULT_BATCH_SIZE)))
+    except ValueError:
+        return DEFAULT_BATCH_SIZE
 
 
 def _load(model_path: str, family: str):
@@ -23,33 +63,209 @@ def _load(model_path: str, family: str):
     return ultra.YOLO(model_path)
 
 
-def run(req: Any) -> Dict[str, Any]:
-    family = infer_family(req.model_path, getattr(req, "family", None))
-    model = CACHE.get_or_load(
-        f"detect:{family}:{req.model_path}",
-        lambda: _load(req.model_path, family),
+def _key(model_path: str, family: str) -> str:
+    return f"detect:{family}:{model_path}"
+
+
+def _model(model_path: str, family: str, pin: bool = False):
+    return CACHE.get_or_load(
+        _key(model_path, family), lambda: _load(model_path, family), model_path, pin
     )
 
+
+def warmup(model_path: str, family: str, pin: bool = False) -> str:
+    """Load the detector and run one blank forward pass; return its cache key."""
+    model = _model(model_path, family, pin)
+    np = lazy_import("numpy")
+    model.predict(np.zeros((640, 640, 3), dtype=np.uint8), **_predict_kwargs(None, None))
+    return _key(model_path, family)
+
+
+def _predict_kwargs(conf: Optional[float], iou: Optional[float]) -> Dict[str, Any]:
     kwargs: Dict[str, Any] = {"device": pick_device(), "verbose": False}
-    if getattr(req, "conf", None) is not None:
-        kwargs["conf"] = float(req.conf)
-    if getattr(req, "iou", None) is not None:
-        kwargs["iou"] = float(req.iou)
-
-    results = model.predict(req.image_path, **kwargs)
-
-    detections = []
-    for res in results:
-        names = getattr(res, "names", {}) or {}
-        boxes = getattr(res, "boxes", None)
-        if boxes is None:
-            continue
-        for box in boxes:
-            x1, y1, x2, y2 = (float(v) for v in box.xyxy[0].tolist())
-            cls_id = int(box.cls[0].item()) if box.cls is not None else -1
-            conf = float(box.conf[0].item()) if box.conf is not None else 0.0
-            label = names.get(cls_id, str(cls_id)) if isinstance(names, dict) else str(cls_id)
-            item = draft(label, "box", xyxy_to_points(x1, y1, x2, y2), conf)
-            item["classId"] = cls_id
-            detections.append(item)
-    return {"detections": detections}
+    if conf is not None:
+        kwargs["conf"] = float(conf)
+    if iou is not None:
+        kwargs["iou"] = float(iou)
+    return kwargs
+
+
+def _columns(res: Any) -> Dict[str, List[Any]]:
+    """Parallel `xyxy` / `classId` / `confidence` / `labelName` arrays for one `Results`.
+
+    Reads `boxes.data` (`[N, 6]`: x1, y1, x2, y2, conf, cls — a track id sits
+    before conf when tracking) with ONE device-to-host copy and one `tolist`,
+    instead of three tensor syncs and scalar allocations per box.
+    """
+    names = getattr(res, "names", {}) or {}
+    boxes = getattr(res, "boxes", None)
+    data = getattr(boxes, "data", None) if boxes is not None else None
+    if data is None:
+        return merge_columns([])
+    if hasattr(data, "cpu"):
+        data = data.cpu()
+    if hasattr(data, "numpy"):
+        data = data.numpy()
+    rows = data.tolist()
+    class_ids = [int(row[-1]) for row in rows]
+    lookup = names.get if isinstance(names, dict) else (lambda k, d: d)
+    return {
+        "xyxy": [row[:4] for row in rows],
+        "classId": class_ids,
+        "confidence": [float(row[-2]) for row in rows],
+        "labelName": [lookup(c, str(c)) for c in class_ids],
+    }
+
+
+def _detections(res: Any) -> List[Dict[str, Any]]:
+    """Drafts for one ultralytics `Results` object."""
+    return box_drafts(_columns(res))
+
+
+def run(req: Any) -> Dict[str, Any]:
+    """`{"detections": [...]}`, or `{"columns": {...}}` when `req.columnar` is set."""
+    model_path, image_path = req.model_path, req.image_path
+    family = infer_family(model_path, getattr(req, "family", None))
+    conf, iou = getattr(req, "conf", None), getattr(req, "iou", None)
+    columnar = bool(getattr(req, "columnar", False))
+    model = _model(model_path, family)
+    if not image_path or not os.path.exists(image_path):
+        # Checked up front so one bad path can't fail a whole coalesced batch.
+        raise FileNotFoundError(f"image not found on disk: {image_path}")
+
+    key = "columns" if columnar else "detections"
+    tile = getattr(req, "tile", None)
+    if tile:
+        columns = run_tiled(
+            model,
+            image_path,
+            int(tile),
+            getattr(req, "tile_overlap", None),
+            getattr(req, "tile_iou", None),
+            conf,
+            iou,
+        )
+        return {key: columns if columnar else box_drafts(columns)}
+
+    shared = batcher(
+        f"detect:{family}:{model_path}:{conf}:{iou}:{key}",
+        lambda paths: predict_many(
+            model_path, family, paths, conf, iou, len(paths), cache_images=True, columnar=columnar
+        ),
+    )
+    if shared is not None:
+        return {key: shared.submit(image_path)}
+
+    image = load_array(image_path, "bgr")
+    with span("predict"):
+        results = model.predict(image, **_predict_kwargs(conf, iou))
+    with span("postprocess"):
+        columns = merge_columns([_columns(res) for res in results])
+        return {key: columns if columnar else box_drafts(columns)}
+
+
+def run_tiled(
+    model: Any,
+    image_path: str,
+    tile: int,
+    overlap: Optional[float] = None,
+    tile_iou: Optional[float] = None,
+    conf: Optional[float] = None,
+    iou: Optional[float] = None,
+) -> Dict[str, List[Any]]:
+    """`_columns` for a whole large image, predicted window by window.
+
+    Only one mini-batch of windows is prepared at a time. The windows are real
+    reads only for `.npy` and TIFF (with `tifffile`); see `open_raster`. Any
+    other format is decoded whole once and the windows are views into it.
+    """
+    raster = open_raster(image_path)
+    windows = tile_grid(raster.width, raster.height, tile, 0.2 if overlap is None else overlap)
+    kwargs = _predict_kwargs(conf, iou)
+    kwargs["imgsz"] = tile  # keep tiles at native resolution
+    size = _default_batch_size()
+
+    parts: List[Dict[str, List[Any]]] = []
+    for start in range(0, len(windows), size):
+        chunk = windows[start : start + size]
+        with span("decode"):
+            sources = [raster.read(*w, order="bgr") for w in chunk]
+        with span("predict"):
+            results = model.predict(sources, batch=len(chunk), **kwargs)
+        with span("postprocess"):
+            for (x0, y0, _, _), res in zip(chunk, results):
+                parts.append(offset_columns(_columns(res), x0, y0))
+
+    with span("postprocess"):
+        merged = merge_columns(parts)
+        keep = nms(
+            merged["xyxy"],
+            merged["confidence"],
+            merged["classId"],
+            DEFAULT_TILE_IOU if tile_iou is None else tile_iou,
+        )
+        return {name: [values[i] for i in keep] for name, values in merged.items()}
+
+
+def predict_many(
+    model_path: str,
+    family: str,
+    image_paths: List[str],
+    conf: Optional[float] = None,
+    iou: Optional[float] = None,
+    batch_size: Optional[int] = None,
+    cache_images: bool = False,
+    columnar: bool = False,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> List[Any]:
+    """Detections for each of `image_paths` (same order), `batch_size` at a time.
+
+    Every path must exist — callers filter missing files first. Interactive
+    callers pass `cache_images=True` to decode through the shared image cache;
+    bulk jobs leave it off so a one-pass sweep doesn't flush the cache. With
+    `columnar=True` each entry is a `_columns` dict instead of a draft list.
+    `on_progress(done, total)` is called after every forward pass.
+    """
+    if not image_paths:
+        return []
+    model = _model(model_path, family)
+    size = max(1, int(batch_size or _default_batch_size()))
+    kwargs = _predict_kwargs(conf, iou)
+
+    convert = _columns if columnar else _detections
+    out: List[Any] = []
+    for start in range(0, len(image_paths), size):
+        chunk = image_paths[start : start + size]
+        sources = [load_array(p, "bgr") for p in chunk] if cache_images else chunk
+        with span("predict"):
+            results = model.predict(sources, batch=len(chunk), **kwargs)
+        with span("postprocess"):
+            out.extend(convert(res) for res in results)
+        if on_progress is not None:
+            on_progress(len(out), len(image_paths))
+    return out
+
+
+def run_batch(req: Any) -> Dict[str, Any]:
+    """`{"results": [{image_path, detections, error?}, …]}` in request order.
+
+    A missing or unreadable image fails only its own entry (`error` set, no
+    detections; see `postprocess.batch_results`) so one bad path doesn't sink a
+    whole batch. With `req.columnar` each entry carries `columns` (see
+    `_columns`) instead of `detections`.
+    """
+    family = infer_family(req.model_path, getattr(req, "family", None))
+    paths = list(getattr(req, "image_paths", None) or [])
+    if any(p and os.path.exists(p) for p in paths):
+        _model(req.model_path, family)  # a model that won't load fails the request
+    conf, iou = getattr(req, "conf", None), getattr(req, "iou", None)
+    columnar = bool(getattr(req, "columnar", False))
+    return batch_results(
+        paths,
+        lambda chunk: predict_many(
+            req.model_path, family, chunk, conf, iou, len(chunk), columnar=columnar
+        ),
+        getattr(req, "batch_size", None) or _default_batch_size(),
+        columnar,
+        getattr(req, "on_progress", None),
+    )
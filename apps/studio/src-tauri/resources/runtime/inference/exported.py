@@ -0,0 +1,153 @@
+"""Serving shared by the exported-detector backends (ONNX Runtime, OpenVINO).
+
+A backend subclasses `ExportedDetector`: it sets `names`, `input_hw`, `layout`
+and `batch` from the artifact and implements `_infer` (one stacked batch in,
+stacked heads out) — or overrides `_infer_many` to keep several requests in
+flight. Letterboxing, head decoding, NMS and the columnar result all happen
+here, and `run` / `run_batch` give every backend the request/response contract
+of `detect.py` (drafts or `columns`, micro-batching, per-entry missing files).
+"""
+
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from inference.loader import (
+    batcher,
+    box_drafts,
+    decode_rgb,
+    env_number,
+    lazy_import,
+    load_array,
+)
+from inference.postprocess import (
+    batch_results,
+    decode_detections,
+    letterbox,
+    unletterbox,
+)
+from inference.tracing import span
+
+# Ultralytics' predict() defaults, so every backend agrees out of the box.
+DEFAULT_CONF = 0.25
+DEFAULT_IOU = 0.7
+
+
+class ExportedDetector:
+    """Pre/post-processing around a backend's raw forward pass."""
+
+    names: Dict[int, str] = {}
+    input_hw: Tuple[int, int] = (640, 640)
+    layout = "yolo"  # see postprocess.decode_detections
+    batch = 0  # 0: any batch size; N: fixed batch axis, short batches are padded
+    resident_bytes = 0  # read by loader.estimate_footprint
+
+    def _infer(self, tensors: Any) -> Any:
+        """`[B, 3, H, W]` float32 in, `[B, …]` first-output heads out."""
+        raise NotImplementedError
+
+    def _infer_many(self, tensors: List[Any]) -> List[Any]:
+        """One head per `[3, H, W]` tensor, in order."""
+        np = lazy_import("numpy")
+        step = self.batch or len(tensors) or 1
+        heads: List[Any] = []
+        for start in range(0, len(tensors), step):
+            chunk = tensors[start : start + step]
+            real = len(chunk)
+            if self.batch and real < self.batch:
+                chunk = chunk + [np.zeros_like(chunk[0])] * (self.batch - real)
+            heads.extend(self._infer(np.stack(chunk))[:real])
+        return heads
+
+    def predict(
+        self,
+        images: List[Any],
+        conf: Optional[float] = None,
+        iou: Optional[float] = None,
+    ) -> List[Dict[str, List[Any]]]:
+        """Columnar detections (see `detect._columns`) per HxWx3 RGB image."""
+        conf = DEFAULT_CONF if conf is None else float(conf)
+        iou = DEFAULT_IOU if iou is None else float(iou)
+        stretch = self.layout == "rtdetr"
+        with span("preprocess"):
+            prepped = [letterbox(img, self.input_hw, stretch=stretch) for img in images]
+        with span("predict"):
+            heads = self._infer_many([tensor for tensor, _, _ in prepped])
+
+        out: List[Dict[str, List[Any]]] = []
+        with span("postprocess"):
+            for img, (_, gain, pad), head in zip(images, prepped, heads):
+                boxes, scores, classes = decode_detections(
+                    head, self.layout, self.input_hw, conf, iou
+                )
+                class_ids = classes.tolist()
+                out.append(
+                    {
+                        "xyxy": unletterbox(boxes, gain, pad, img.shape[:2]).tolist(),
+                        "classId": class_ids,
+                        "confidence": scores.tolist(),
+                        "labelName": [self.names.get(c, str(c)) for c in class_ids],
+                    }
+                )
+        return out
+
+
+def predict_many(
+    det: ExportedDetector,
+    image_paths: List[str],
+    conf: Optional[float] = None,
+    iou: Optional[float] = None,
+    cache_images: bool = False,
+    columnar: bool = False,
+) -> List[Any]:
+    """Per-image detections (drafts, or columns with `columnar`) in path order."""
+    images = [load_array(p) if cache_images else decode_rgb(p) for p in image_paths]
+    columns = det.predict(images, conf, iou) if images else []
+    return columns if columnar else [box_drafts(c) for c in columns]
+
+
+def run(req: Any, key_prefix: str, load: Callable[[], ExportedDetector]) -> Dict[str, Any]:
+    """`{"detections": [...]}`, or `{"columns": {...}}` when `req.columnar` is set.
+
+    `load()` resolves the detector through the model cache (so a batcher that
+    outlives an eviction reloads rather than pinning a stale one); `key_prefix`
+    names it for the micro-batcher, which coalesces concurrent calls when the
+    graph takes any batch size.
+    """
+    image_path = req.image_path
+    conf, iou = getattr(req, "conf", None), getattr(req, "iou", None)
+    columnar = bool(getattr(req, "columnar", False))
+    key = "columns" if columnar else "detections"
+    det = load()
+    if not image_path or not os.path.exists(image_path):
+        raise FileNotFoundError(f"image not found on disk: {image_path}")
+
+    if not det.batch:
+        shared = batcher(
+            f"{key_prefix}:{conf}:{iou}:{key}",
+            lambda paths: predict_many(
+                load(), paths, conf, iou, cache_images=True, columnar=columnar
+            ),
+        )
+        if shared is not None:
+            return {key: shared.submit(image_path)}
+    columns = det.predict([load_array(image_path)], conf, iou)[0]
+    return {key: columns if columnar else box_drafts(columns)}
+
+
+def run_batch(req: Any, load: Callable[[], ExportedDetector]) -> Dict[str, Any]:
+    """Same contract as `detect.run_batch`: one entry per path, bad ones flagged.
+
+    `req.on_progress(done, total)`, when set, is called after every chunk.
+    """
+    columnar = bool(getattr(req, "columnar", False))
+    paths = list(getattr(req, "image_paths", None) or [])
+    batch_size = getattr(req, "batch_size", None) or env_number("VAILABEL_RT_DETECT_BATCH", 8)
+    det = load() if any(p and os.path.exists(p) for p in paths) else None
+    conf, iou = getattr(req, "conf", None), getattr(req, "iou", None)
+    return batch_results(
+        paths,
+        lambda chunk: predict_many(det, chunk, conf, iou, columnar=columnar),
+        batch_size,
+        columnar,
+        getattr(req, "on_progress", None),
+    )
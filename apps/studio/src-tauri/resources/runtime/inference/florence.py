@@ -5,9 +5,13 @@ repo), not a single weight file. Each public `run_*` returns the response shape
 its endpoint expects: caption → `{text}`, ocr → `{lines}`, detect → `{detections}`.
 """
 
+import os
+from types import SimpleNamespace
 from typing import Any, Dict, List, Optional, Tuple
 
 from inference.loader import CACHE, draft, lazy_import, load_image, pick_device
+from inference.postprocess import batch_results
+from inference.tracing import span
 
 CAPTION_TASK = "<MORE_DETAILED_CAPTION>"
 OCR_TASK = "<OCR_WITH_REGION>"
@@ -32,23 +36,44 @@ def _load(model_path: str):
     return model, processor, device, dtype
 
 
+def _key(model_path: str) -> str:
+    return f"florence:{model_path}"
+
+
+def _model(model_path: str, pin: bool = False):
+    return CACHE.get_or_load(_key(model_path), lambda: _load(model_path), model_path, pin)
+
+
+def warmup(model_path: str, family: str, pin: bool = False) -> str:
+    """Load Florence-2 and generate one token for a blank image; return its key."""
+    model, processor, device, dtype = _model(model_path, pin)
+    pil_image = lazy_import("PIL.Image", "pillow")
+    blank = pil_image.new("RGB", (64, 64))
+    inputs = processor(text=CAPTION_TASK, images=blank, return_tensors="pt").to(device, dtype)
+    model.generate(
+        input_ids=inputs["input_ids"], pixel_values=inputs["pixel_values"], max_new_tokens=1
+    )
+    return _key(model_path)
+
+
 def _generate(req: Any, task: str, text_input: Optional[str] = None) -> Tuple[Any, Tuple[int, int]]:
     """Run one Florence-2 task; return (parsed_result, (width, height))."""
-    model, processor, device, dtype = CACHE.get_or_load(
-        f"florence:{req.model_path}", lambda: _load(req.model_path)
-    )
+    model, processor, device, dtype = _model(req.model_path)
     image, size = load_image(req.image_path)
     prompt = task + (text_input or "")
-    inputs = processor(text=prompt, images=image, return_tensors="pt").to(device, dtype)
-    generated_ids = model.generate(
-        input_ids=inputs["input_ids"],
-        pixel_values=inputs["pixel_values"],
-        max_new_tokens=1024,
-        num_beams=3,
-        do_sample=False,
-    )
-    text = processor.batch_decode(generated_ids, skip_special_tokens=False)[0]
-    parsed = processor.post_process_generation(text, task=task, image_size=size)
+    with span("preprocess"):
+        inputs = processor(text=prompt, images=image, return_tensors="pt").to(device, dtype)
+    with span("predict"):
+        generated_ids = model.generate(
+            input_ids=inputs["input_ids"],
+            pixel_values=inputs["pixel_values"],
+            max_new_tokens=1024,
+            num_beams=3,
+            do_sample=False,
+        )
+    with span("postprocess"):
+        text = processor.batch_decode(generated_ids, skip_special_tokens=False)[0]
+        parsed = processor.post_process_generation(text, task=task, image_size=size)
     return parsed.get(task, parsed), size
 
 
@@ -92,3 +117,20 @@ def run_detect(req: Any) -> Dict[str, Any]:
         coords = [{"x": x1, "y": y1}, {"x": x2, "y": y2}]
         detections.append(draft(name, "box", coords, 1.0))
     return {"detections": detections}
+
+
+def run_detect_batch(req: Any) -> Dict[str, Any]:
+    """Batch shape of `run_detect`. Florence-2 generates per image, so this loops;
+    the win over separate requests is one HTTP round trip and one model lookup.
+    A missing or unreadable image fails only its own entry."""
+    paths = list(getattr(req, "image_paths", None) or [])
+    if any(p and os.path.exists(p) for p in paths):
+        _model(req.model_path)  # a model that won't load fails the request
+
+    def predict(chunk: List[str]) -> List[Any]:
+        one = SimpleNamespace(
+            model_path=req.model_path, image_path=chunk[0], prompt=getattr(req, "prompt", None)
+        )
+        return [run_detect(one)["detections"]]
+
+    return batch_results(paths, predict, 1, on_progress=getattr(req, "on_progress", None))
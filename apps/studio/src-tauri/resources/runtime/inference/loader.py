@@ -17,10 +17,15 @@ from __future__ import annotations
 
 import importlib
 import os
+import sys
 import threading
+import time
 from collections import OrderedDict
+from concurrent.futures import Future
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
+from inference.tracing import span
+
 # Mirror engines/sam.rs MAX_POLYGON_VERTICES so masks simplify identically.
 MAX_POLYGON_VERTICES = 150
 
@@ -71,19 +76,236 @@ def pick_device() -> str:
 
 
 def load_image(path: str) -> Tuple[Any, Tuple[int, int]]:
-    """Load an RGB PIL image, returning (image, (width, height))."""
-    if not path or not os.path.exists(path):
-        raise FileNotFoundError(f"image not found on disk: {path}")
+    """Load an RGB PIL image, returning (image, (width, height)).
+
+    Backed by the decoded-image cache: the PIL image wraps the cached array.
+    """
     pil_image = lazy_import("PIL.Image", "pillow")
-    img = pil_image.open(path).convert("RGB")
+    img = pil_image.fromarray(load_array(path))
     return img, img.size
 
 
+def load_array(path: str, order: str = "rgb") -> Any:
+    """Decoded HxWx3 uint8 pixels for `path` ("rgb", or "bgr" for ultralytics /
+    OpenCV / PaddleOCR, which treat arrays as BGR). Cached + read-only: callers
+    must copy before mutating."""
+    if order == "bgr":
+        return IMAGES.get(path, "bgr", lambda p: _flip_channels(load_array(p)))
+    return IMAGES.get(path, "rgb", _decode_rgb)
+
+
+def decode_rgb(path: str) -> Any:
+    """One uncached RGB decode of `path`, upright per its EXIF orientation.
+
+    Every decoder in the runtime goes through here so cached, OpenCV-order and
+    exported-model paths agree on rotated phone JPEGs.
+    """
+    pil_image = lazy_import("PIL.Image", "pillow")
+    image_ops = lazy_import("PIL.ImageOps", "pillow")
+    np = lazy_import("numpy")
+    with span("decode"), pil_image.open(path) as img:
+        return np.asarray(image_ops.exif_transpose(img).convert("RGB"))
+
+
+def _decode_rgb(path: str) -> Tuple[Any, int]:
+    arr = decode_rgb(path)
+    arr.setflags(write=False)
+    return arr, int(arr.nbytes)
+
+
+def _flip_channels(rgb: Any) -> Tuple[Any, int]:
+    np = lazy_import("numpy")
+    with span("decode"):
+        arr = np.ascontiguousarray(rgb[..., ::-1])
+    arr.setflags(write=False)
+    return arr, int(arr.nbytes)
+
+
+class Raster:
+    """Windowed pixel access to one large image (aerial / microscopy scans).
+
+    `pixels` is anything sliceable as `[y0:y1, x0:x1]` — an `np.memmap`, a
+    zarr array over a tiled TIFF, or (fallback) a decoded array — so only the
+    windows actually read are paged in or decoded. `planar` marks `[C, H, W]`.
+    `value_range` is the `(lo, hi)` mapped onto 0..255 for non-uint8 pixels;
+    it is fixed per raster (see `open_raster`) so neighbouring tiles match.
+    """
+
+    def __init__(
+        self,
+        pixels: Any,
+        planar: bool = False,
+        value_range: Optional[Tuple[float, float]] = None,
+    ) -> None:
+        self.pixels = pixels
+        self.planar = planar
+        self.value_range = value_range
+        shape = pixels.shape
+        self.height, self.width = (shape[1], shape[2]) if planar else (shape[0], shape[1])
+
+    def read(self, x0: int, y0: int, x1: int, y1: int, order: str = "rgb") -> Any:
+        """HxWx3 uint8 window (contiguous, safe to mutate), scaled by `value_range`."""
+        np = lazy_import("numpy")
+        if self.planar:
+            win = np.moveaxis(np.asarray(self.pixels[:, y0:y1, x0:x1]), 0, -1)
+        else:
+            win = np.asarray(self.pixels[y0:y1, x0:x1])
+        if win.ndim == 2:
+            win = win[..., None]
+        if win.dtype != np.uint8:
+            lo, hi = self.value_range or _value_range(win)
+            win = np.nan_to_num(win.astype(np.float32), nan=lo)
+            win = (np.clip(win, lo, hi) - lo) * (255.0 / (hi - lo))
+            win = win.astype(np.uint8)
+        channels = win.shape[2]
+        if channels == 1:
+            win = np.repeat(win, 3, axis=2)
+        elif channels != 3:
+            win = win[..., :3]  # drop alpha / extra spectral bands
+        if order == "bgr":
+            win = win[..., ::-1]
+        return np.array(win, order="C")
+
+
+def open_raster(path: str) -> Raster:
+    """A `Raster` for `path`, reading lazily where the format allows.
+
+    `.npy` is memory-mapped; TIFFs go through `tifffile` when installed (a
+    memmap for uncompressed data, else a zarr view that decodes only the TIFF
+    tiles a window touches, or a full `tifffile` decode without zarr).
+    Anything else — or TIFF without `tifffile` — falls back to one full
+    decode through the image cache. Images past PIL's decompression-bomb
+    guard (~179 MP) are decoded by OpenCV instead: these are the user's own
+    local scans, and the guard would otherwise turn them into a 500.
+
+    Deeper-than-8-bit rasters get one value range for all their windows: the
+    TIFF's `SMaxSampleValue` / `BitsPerSample` when they say more than the
+    dtype does, else a strided sample of the pixels (see `_value_range`).
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"image not found on disk: {path}")
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".npy":
+        np = lazy_import("numpy")
+        return _raster(np.load(path, mmap_mode="r"))
+    if ext in (".tif", ".tiff"):
+        pixels = _tiff_pixels(path)
+        if pixels is not None:
+            return _raster(pixels, _tiff_max_value(path))
+    pil_image = lazy_import("PIL.Image", "pillow")
+    try:
+        return Raster(load_array(path))
+    except pil_image.DecompressionBombError:
+        return Raster(_decode_oversized(path))
+
+
+def _decode_oversized(path: str) -> Any:
+    """RGB view of a full OpenCV decode (honours EXIF orientation).
+
+    OpenCV has its own cap, CV_IO_MAX_IMAGE_PIXELS (2^30 px by default); past
+    it `imread` returns None and this raises ValueError.
+    """
+    cv2 = lazy_import("cv2", "opencv-python-headless")
+    with span("decode"):
+        bgr = cv2.imread(path, cv2.IMREAD_COLOR)
+    if bgr is None:
+        raise ValueError(f"could not decode image: {path}")
+    return bgr[..., ::-1]
+
+
+def _raster(pixels: Any, max_value: Optional[float] = None) -> Raster:
+    shape = pixels.shape
+    planar = len(shape) == 3 and shape[0] in (3, 4) and shape[2] not in (1, 3, 4)
+    np = lazy_import("numpy")
+    if np.dtype(pixels.dtype) == np.uint8:
+        return Raster(pixels, planar=planar)
+    if max_value and np.issubdtype(pixels.dtype, np.integer):
+        return Raster(pixels, planar=planar, value_range=(0.0, float(max_value)))
+    height, width = (shape[1], shape[2]) if planar else (shape[0], shape[1])
+    sy = max(1, height // _RANGE_SAMPLES)
+    sx = max(1, width // _RANGE_SAMPLES)
+    sample = np.asarray(pixels[:, ::sy, ::sx] if planar else pixels[::sy, ::sx])
+    return Raster(pixels, planar=planar, value_range=_value_range(sample))
+
+
+# Rows/columns sampled (at most) to measure a raster's value range.
+_RANGE_SAMPLES = 512
+
+
+def _value_range(sample: Any) -> Tuple[float, float]:
+    """`(lo, hi)` to map onto 0..255 for pixels like `sample`.
+
+    Unsigned integers go from 0 to the smallest bit depth holding the sample's
+    maximum, so 12-bit data in uint16 spans 0..4095 without stretching dim
+    content. Floats already in 0..1 keep that range; anything else (signed
+    data, other floats) spans the sample's own minimum and maximum.
+    """
+    np = lazy_import("numpy")
+    values = sample[np.isfinite(sample)] if sample.dtype.kind == "f" else sample.ravel()
+    if not values.size:
+        return 0.0, 1.0
+    lo, hi = float(values.min()), float(values.max())
+    if sample.dtype.kind == "u" or (sample.dtype.kind == "i" and lo >= 0):
+        return 0.0, float((1 << max(1, int(hi).bit_length())) - 1)
+    if sample.dtype.kind == "f" and lo >= 0.0 and hi <= 1.0:
+        return 0.0, 1.0
+    return lo, hi if hi > lo else lo + 1.0
+
+
+def _tiff_max_value(path: str) -> Optional[float]:
+    """The largest sample value the TIFF's tags declare, when narrower than its dtype."""
+    try:
+        import tifffile
+
+        with tifffile.TiffFile(path) as tif:
+            page = tif.pages[0]
+            tag = page.tags.get("SMaxSampleValue")
+            if tag is not None:
+                value = tag.value
+                return float(max(value) if isinstance(value, (tuple, list)) else value)
+            bits = page.bitspersample
+            if bits < page.dtype.itemsize * 8:
+                return float((1 << bits) - 1)
+    except Exception:  # noqa: BLE001 — no tags to go by: sample the pixels
+        pass
+    return None
+
+
+def _tiff_pixels(path: str) -> Any:
+    try:
+        import tifffile
+    except ImportError:
+        return None
+    try:
+        return tifffile.memmap(path, mode="r")
+    except Exception:  # noqa: BLE001 — compressed / tiled: try a zarr view
+        pass
+    try:
+        import zarr
+
+        store = zarr.open(tifffile.imread(path, aszarr=True), mode="r")
+    except Exception:  # noqa: BLE001 — no zarr, or an unusual layout
+        return tifffile.imread(path)
+    # Pyramidal TIFFs open as a group of levels; level "0" is full resolution.
+    return store if hasattr(store, "shape") else store["0"]
+
+
 # ---------------------------------------------------------------------------
-# Model LRU cache — keeps a couple of heavy models resident across requests.
+# Model LRU cache — keeps heavy models resident within a RAM / VRAM budget.
 # ---------------------------------------------------------------------------
 
 
+def env_number(name: str, default: float) -> float:
+    """A numeric VAILABEL_RT_* tunable, falling back to `default` when unset/bad."""
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+_MB = 1024 * 1024
+
+
 def _free(model: Any) -> None:
     """Best-effort release of an evicted model + its VRAM."""
     del model
@@ -95,41 +317,435 @@ def _free(model: Any) -> None:
         pass
 
 
+def estimate_footprint(obj: Any) -> Tuple[int, int]:
+    """Resident (ram_bytes, vram_bytes) of a cached entry, best-effort.
+
+    Sums parameter + buffer bytes of every torch module reachable from `obj`
+    (the entry itself, tuple members like `(model, processor, …)`, or a wrapper's
+    `.model` such as ultralytics' YOLO), split by device placement. Objects
+    exposing an int `resident_bytes` (ONNX Runtime sessions) count as that much
+    RAM. Anything else without tensors (processors, PaddleOCR) counts as 0.
+    """
+    ram = vram = 0
+    seen = set()
+    stack = [(obj, 0)]
+    while stack:
+        cur, depth = stack.pop()
+        if cur is None or id(cur) in seen or depth > 3:
+            continue
+        seen.add(id(cur))
+        if isinstance(cur, (tuple, list)):
+            stack.extend((item, depth + 1) for item in cur)
+            continue
+        own = getattr(cur, "resident_bytes", None)
+        if isinstance(own, int):  # non-torch backends that know their own size
+            ram += own
+            continue
+        params = getattr(cur, "parameters", None)
+        buffers = getattr(cur, "buffers", None)
+        if callable(params) and callable(buffers):
+            try:
+                for tensor in list(params()) + list(buffers()):
+                    nbytes = int(tensor.numel()) * int(tensor.element_size())
+                    if tensor.device.type == "cuda":
+                        vram += nbytes
+                    else:
+                        ram += nbytes
+            except Exception:  # noqa: BLE001
+                pass
+            continue
+        inner = getattr(cur, "model", None)
+        if inner is not None and not isinstance(inner, (str, bytes)):
+            stack.append((inner, depth + 1))
+    return ram, vram
+
+
+def _default_ram_budget() -> int:
+    """Half the machine's physical RAM (0 = unlimited when it can't be read)."""
+    try:
+        return int(os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // 2)
+    except (AttributeError, ValueError, OSError):
+        return 0
+
+
+def _default_vram_budget() -> int:
+    """80% of the current CUDA device's memory (0 = unlimited / no CUDA).
+
+    Only consults torch once something has imported it — a VRAM-resident model
+    implies it has — so building the cache never pulls torch in.
+    """
+    torch = sys.modules.get("torch")
+    if torch is None:
+        return 0
+    try:
+        if torch.cuda.is_available():
+            total = torch.cuda.get_device_properties(torch.cuda.current_device()).total_memory
+            return int(total * 0.8)
+    except Exception:  # noqa: BLE001
+        pass
+    return 0
+
+
+class _Entry:
+    __slots__ = ("model", "ram", "vram", "pinned", "model_path")
+
+    def __init__(self, model: Any, ram: int, vram: int, model_path: str, pinned: bool):
+        self.model = model
+        self.ram = ram
+        self.vram = vram
+        self.model_path = model_path
+        self.pinned = pinned
+
+
 class ModelCache:
-    """Tiny thread-safe LRU keyed by an opaque string (family + model_path)."""
+    """Thread-safe LRU keyed by an opaque string (family + model_path).
+
+    Evicts least-recently-used entries until the estimated resident size fits
+    the RAM and VRAM budgets (VAILABEL_RT_RAM_BUDGET_MB /
+    VAILABEL_RT_VRAM_BUDGET_MB; defaults: half of physical RAM, 80% of the GPU),
+    so many small detectors stay hot while a large VLM still fits.
+    VAILABEL_RT_MODEL_CACHE optionally caps the entry count as well. The entry
+    just loaded is never evicted, even if it alone exceeds a budget, and neither
+    are pinned entries (see `pin`) — those leave only via `unload`.
+
+    `on_evict(key)` runs (outside the lock) for every entry dropped by eviction
+    or unload, so state derived from a model can go with it.
+    """
 
-    def __init__(self, capacity: Optional[int] = None):
+    def __init__(
+        self,
+        capacity: Optional[int] = None,
+        ram_budget: Optional[int] = None,
+        vram_budget: Optional[int] = None,
+        estimate: Callable[[Any], Tuple[int, int]] = estimate_footprint,
+        on_evict: Optional[Callable[[str], None]] = None,
+    ):
         if capacity is None:
-            try:
-                capacity = int(os.environ.get("VAILABEL_RT_MODEL_CACHE", "2"))
-            except ValueError:
-                capacity = 2
+            capacity = int(env_number("VAILABEL_RT_MODEL_CACHE", 16))
         self.capacity = max(1, capacity)
-        self._items: "OrderedDict[str, Any]" = OrderedDict()
+        if ram_budget is None:
+            mb = env_number("VAILABEL_RT_RAM_BUDGET_MB", -1)
+            ram_budget = int(mb * _MB) if mb >= 0 else _default_ram_budget()
+        self.ram_budget = max(0, ram_budget)
+        # None = resolve lazily (needs torch, which may not be imported yet).
+        self._vram_budget = vram_budget
+        self._estimate = estimate
+        self._on_evict = on_evict
+        self._items: "OrderedDict[str, _Entry]" = OrderedDict()
+        # key -> Future of the in-progress load (single-flight).
+        self._loading: Dict[str, Future] = {}
         self._lock = threading.Lock()
 
-    def get_or_load(self, key: str, loader: Callable[[], Any]) -> Any:
-        with self._lock:
-            if key in self._items:
-                self._items.move_to_end(key)
-                return self._items[key]
-        # Load outside the lock (slow); tolerate a rare double-load race.
-        model = loader()
+    @property
+    def vram_budget(self) -> int:
+        if self._vram_budget is None:
+            mb = env_number("VAILABEL_RT_VRAM_BUDGET_MB", -1)
+            if mb >= 0:
+                self._vram_budget = int(mb * _MB)
+            else:
+                budget = _default_vram_budget()
+                if budget <= 0:
+                    return 0  # re-probe later: CUDA may come up with the first model
+                self._vram_budget = budget
+        return self._vram_budget
+
+    def get_or_load(
+        self, key: str, loader: Callable[[], Any], model_path: str = "", pin: bool = False
+    ) -> Any:
+        """Return the cached model for `key`, loading it at most once at a time.
+
+        Concurrent misses on the same key are single-flighted: the first caller
+        runs `loader` (outside the lock — it's slow) and the rest wait on its
+        future. A failed load is raised to every waiter and leaves nothing
+        behind, so the next call simply retries. `model_path` is what the entry
+        was loaded from (see `unload_path`). With `pin`, the entry is pinned
+        under the same lock that returns it, so no eviction can slip in between.
+        """
+        while True:
+            with self._lock:
+                entry = self._items.get(key)
+                if entry is not None:
+                    self._items.move_to_end(key)
+                    entry.pinned = entry.pinned or pin
+                    return entry.model
+                pending = self._loading.get(key)
+                if pending is None:
+                    self._loading[key] = flight = Future()
+                    break
+            with span("load"):
+                model = pending.result()
+            if not pin:
+                return model
+            # Pinning needs the entry itself: loop to pin it, or to reload it
+            # if an eviction already dropped it.
+
+        try:
+            with span("load"):
+                model = loader()
+                ram, vram = self._estimate(model)
+        except BaseException as exc:
+            with self._lock:
+                self._loading.pop(key, None)
+            flight.set_exception(exc)
+            raise
         with self._lock:
-            self._items[key] = model
+            self._items[key] = _Entry(model, ram, vram, model_path, pin)
             self._items.move_to_end(key)
-            while len(self._items) > self.capacity:
-                _, evicted = self._items.popitem(last=False)
-                _free(evicted)
+            self._loading.pop(key, None)
+            evicted = self._evict_locked(keep=key)
+        flight.set_result(model)
+        self._release(evicted)
         return model
 
+    def _over_budget_locked(self) -> bool:
+        if len(self._items) > self.capacity:
+            return True
+        if self.ram_budget and sum(e.ram for e in self._items.values()) > self.ram_budget:
+            return True
+        vram_budget = self.vram_budget
+        return bool(vram_budget) and sum(e.vram for e in self._items.values()) > vram_budget
+
+    def _evict_locked(self, keep: str) -> List[Tuple[str, Any]]:
+        evicted: List[Tuple[str, Any]] = []
+        while self._over_budget_locked():
+            victim = next(
+                (k for k, e in self._items.items() if k != keep and not e.pinned), None
+            )
+            if victim is None:
+                break
+            evicted.append((victim, self._items.pop(victim).model))
+        return evicted
+
+    def _release(self, dropped: List[Tuple[str, Any]]) -> None:
+        """Free dropped `(key, model)` pairs and notify `on_evict`; call unlocked."""
+        for key, model in dropped:
+            _free(model)
+            if self._on_evict is not None:
+                self._on_evict(key)
+
+    def pin(self, key: str, pinned: bool = True) -> bool:
+        """Exempt a loaded entry from eviction (or release it). False if absent."""
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                return False
+            entry.pinned = pinned
+            if pinned:
+                return True
+            evicted = self._evict_locked(keep="")
+        self._release(evicted)
+        return True
+
+    def unload(self, key: str) -> bool:
+        """Drop an entry now, pinned or not. False if it wasn't loaded."""
+        with self._lock:
+            entry = self._items.pop(key, None)
+        if entry is None:
+            return False
+        self._release([(key, entry.model)])
+        return True
+
+    def unload_path(self, model_path: str) -> List[str]:
+        """Drop every entry loaded from exactly `model_path`; returns their keys."""
+        with self._lock:
+            keys = [k for k, e in self._items.items() if model_path and e.model_path == model_path]
+            dropped = [(k, self._items.pop(k).model) for k in keys]
+        self._release(dropped)
+        return keys
+
     def loaded_keys(self) -> List[str]:
         with self._lock:
             return list(self._items.keys())
 
+    def stats(self) -> Dict[str, Any]:
+        """Per-entry size estimates and budget usage (served on /health)."""
+        with self._lock:
+            entries = [
+                {"key": k, "ram_mb": e.ram / _MB, "vram_mb": e.vram / _MB, "pinned": e.pinned}
+                for k, e in self._items.items()
+            ]
+        return {
+            "entries": entries,
+            "capacity": self.capacity,
+            "ram_used_mb": sum(e["ram_mb"] for e in entries),
+            "ram_budget_mb": self.ram_budget / _MB,
+            "vram_used_mb": sum(e["vram_mb"] for e in entries),
+            "vram_budget_mb": self.vram_budget / _MB,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Decoded-image cache — one decode per file version across adapters + turns.
+# ---------------------------------------------------------------------------
+
+
+class ImageCache:
+    """Thread-safe, byte-budgeted LRU of decoded images (and derived forms).
+
+    Keyed by (kind, path, mtime, size), so an edited file is a fresh entry and
+    the stale one ages out. `kind` names the representation ("rgb", "bgr",
+    "data_url", …); `decode(path)` returns `(value, nbytes)`. Budget:
+    VAILABEL_RT_IMAGE_CACHE_MB (default 512; 0 disables caching).
+    """
+
+    def __init__(self, budget_bytes: Optional[int] = None):
+        if budget_bytes is None:
+            budget_bytes = int(env_number("VAILABEL_RT_IMAGE_CACHE_MB", 512) * _MB)
+        self.budget = max(0, budget_bytes)
+        self._items: "OrderedDict[Tuple[str, str, int, int], Tuple[Any, int]]" = OrderedDict()
+        self._used = 0
+        self._lock = threading.Lock()
+
+    def get(self, path: str, kind: str, decode: Callable[[str], Tuple[Any, int]]) -> Any:
+        try:
+            st = os.stat(path) if path else None
+        except OSError:
+            st = None
+        if st is None:
+            raise FileNotFoundError(f"image not found on disk: {path}")
+        key = (kind, os.path.abspath(path), st.st_mtime_ns, st.st_size)
+        with self._lock:
+            hit = self._items.get(key)
+            if hit is not None:
+                self._items.move_to_end(key)
+                return hit[0]
+        value, nbytes = decode(path)
+        if nbytes > self.budget:
+            return value  # too big (or caching disabled): serve uncached
+        with self._lock:
+            if key not in self._items:
+                self._items[key] = (value, nbytes)
+                self._used += nbytes
+            while self._used > self.budget and self._items:
+                _, (_, size) = self._items.popitem(last=False)
+                self._used -= size
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._items),
+                "used_mb": self._used / _MB,
+                "budget_mb": self.budget / _MB,
+            }
+
+
+# Process-wide caches shared by every adapter. A model's micro-batchers go
+# with it (see `drop_batchers`).
+CACHE = ModelCache(on_evict=lambda key: drop_batchers(key))
+IMAGES = ImageCache()
+
+
+# ---------------------------------------------------------------------------
+# Micro-batching — coalesce concurrent single-image calls into one forward pass.
+# ---------------------------------------------------------------------------
+
 
-# Process-wide cache shared by every adapter.
-CACHE = ModelCache()
+class MicroBatcher:
+    """Coalesces concurrent `submit(item)` calls into `fn([item, …])` batches.
+
+    Callers block until their own result is ready. A drain thread exists only
+    while work is queued: it takes whatever has piled up (up to `max_batch`),
+    waits at most `window_s` for stragglers when the batch isn't full, runs one
+    `fn` call and fans the results back out in order. `fn` must return one
+    result per item. If a batch raises, its items are retried one at a time,
+    so only the caller whose item fails gets the error.
+    """
+
+    def __init__(self, fn: Callable[[List[Any]], List[Any]], max_batch: int, window_s: float):
+        self._fn = fn
+        self.max_batch = max(1, int(max_batch))
+        self.window_s = max(0.0, float(window_s))
+        self._pending: List[Tuple[Any, Future]] = []
+        self._cond = threading.Condition()
+        self._draining = False
+
+    def submit(self, item: Any) -> Any:
+        fut: Future = Future()
+        with span("batched"):
+            with self._cond:
+                self._pending.append((item, fut))
+                if self._draining:
+                    self._cond.notify()
+                else:
+                    self._draining = True
+                    threading.Thread(target=self._drain, daemon=True).start()
+            return fut.result()
+
+    def _take(self) -> List[Tuple[Any, Future]]:
+        with self._cond:
+            if self.window_s and 0 < len(self._pending) < self.max_batch:
+                deadline = time.monotonic() + self.window_s
+                while len(self._pending) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            batch = self._pending[: self.max_batch]
+            del self._pending[: self.max_batch]
+            if not batch:
+                self._draining = False
+            return batch
+
+    def _drain(self) -> None:
+        while True:
+            batch = self._take()
+            if not batch:
+                return
+            try:
+                results = self._run([item for item, _ in batch])
+            except BaseException as exc:  # noqa: BLE001 — isolate the bad item(s)
+                if len(batch) == 1:
+                    batch[0][1].set_exception(exc)
+                    continue
+                for item, fut in batch:
+                    try:
+                        fut.set_result(self._run([item])[0])
+                    except BaseException as item_exc:  # noqa: BLE001 — this caller's
+                        fut.set_exception(item_exc)
+                continue
+            for (_, fut), result in zip(batch, results):
+                fut.set_result(result)
+
+    def _run(self, items: List[Any]) -> List[Any]:
+        results = self._fn(items)
+        if len(results) != len(items):
+            raise RuntimeError(f"batch returned {len(results)} results for {len(items)} inputs")
+        return results
+
+
+_BATCHERS: Dict[str, MicroBatcher] = {}
+_BATCHERS_LOCK = threading.Lock()
+
+
+def batcher(key: str, fn: Callable[[List[Any]], List[Any]]) -> Optional[MicroBatcher]:
+    """The shared batcher for `key` (create on first use), or None when disabled.
+
+    `key` must capture everything `fn` closes over (model + predict options) so
+    only compatible requests share a batch. Tuned by VAILABEL_RT_BATCH_MAX
+    (default 8; 1 disables batching) and VAILABEL_RT_BATCH_WINDOW_MS (default 5).
+    """
+    max_batch = int(env_number("VAILABEL_RT_BATCH_MAX", 8))
+    if max_batch <= 1:
+        return None
+    window_s = env_number("VAILABEL_RT_BATCH_WINDOW_MS", 5) / 1000.0
+    with _BATCHERS_LOCK:
+        found = _BATCHERS.get(key)
+        if found is None:
+            found = _BATCHERS[key] = MicroBatcher(fn, max_batch, window_s)
+        return found
+
+
+def drop_batchers(model_key: str) -> None:
+    """Forget the batchers of a model that left the cache.
+
+    Batcher keys start with the model's cache key (`detect:yolo:/m/a.pt:…`).
+    Callers already queued on a dropped batcher still get their results.
+    """
+    prefix = model_key + ":"
+    with _BATCHERS_LOCK:
+        for key in [k for k in _BATCHERS if k == model_key or k.startswith(prefix)]:
+            del _BATCHERS[key]
 
 
 # ---------------------------------------------------------------------------
@@ -150,21 +766,44 @@ _FAMILY_HINTS: Tuple[Tuple[str, str], ...] = (
 )
 
 
+def synthetic_enabled() -> bool:
+    """Whether fake `synthetic` models may load (VAILABEL_RT_SYNTHETIC=1).
+
+    Only tests and benches set it, so a shipped runtime never mistakes a real
+    model for a fake one.
+    """
+    return os.environ.get("VAILABEL_RT_SYNTHETIC", "").strip() == "1"
+
+
 def infer_family(model_path: str, explicit: Optional[str] = None) -> str:
     """Resolve a model family from an explicit hint, the parent dir, or the name.
 
     The Rust catalog downloads weights into `models/<family>/…` (see glue.rs), so
     the parent directory is the most reliable signal; the filename is a fallback.
+    Exported artifacts go by format first: `.onnx` files are "onnx" (served by
+    onnxruntime) and OpenVINO IR — an `.xml` or a `*_openvino_model` export
+    directory — is "openvino", whatever architecture they hold. With
+    `synthetic_enabled()`, a `synthetic://` spec, or any path whose parent dir or
+    name contains "synthetic", is a fake model for load tests
+    (`inference/synthetic.py`) and that check comes before all others.
     Defaults to "yolo" — ultralytics handles most generic `.pt` detectors.
     """
     if explicit:
         return explicit.strip().lower()
     p = (model_path or "").replace("\\", "/").lower()
     parent = os.path.basename(os.path.dirname(p)) if p else ""
+    name = os.path.basename(p)
+    if synthetic_enabled() and (
+        p.startswith("synthetic://") or "synthetic" in parent or "synthetic" in name
+    ):
+        return "synthetic"
+    if p.endswith(".onnx"):
+        return "onnx"
+    if p.endswith(".xml") or "_openvino_model" in p:
+        return "openvino"
     for needle, fam in _FAMILY_HINTS:
         if needle in parent:
             return fam
-    name = os.path.basename(p)
     for needle, fam in _FAMILY_HINTS:
         if needle in name:
             return fam
@@ -195,28 +834,99 @@ def draft(
     }
 
 
+def box_drafts(columns: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """Box drafts (with `classId`) from parallel `xyxy` / `classId` / `confidence`
+    / `labelName` columns — the detectors' columnar result shape."""
+    out: List[Dict[str, Any]] = []
+    for (x1, y1, x2, y2), cls_id, conf, label in zip(
+        columns["xyxy"], columns["classId"], columns["confidence"], columns["labelName"]
+    ):
+        item = draft(label, "box", xyxy_to_points(x1, y1, x2, y2), conf)
+        item["classId"] = cls_id
+        out.append(item)
+    return out
+
+
+def _simplify(cv2: Any, contour: Any) -> Any:
+    """RDP-simplify `contour` to at most MAX_POLYGON_VERTICES points.
+
+    Starts at 1% of the perimeter (usually already under the cap); otherwise
+    binary-searches the smallest epsilon that fits, keeping as much shape as
+    the cap allows in ~a dozen `approxPolyDP` calls.
+    """
+    peri = cv2.arcLength(contour, True)
+    lo = 0.01 * peri
+    approx = cv2.approxPolyDP(contour, lo, True)
+    if len(approx) <= MAX_POLYGON_VERTICES:
+        return approx
+    hi = max(peri, lo)
+    best = cv2.approxPolyDP(contour, hi, True)
+    for _ in range(12):
+        mid = (lo + hi) / 2
+        candidate = cv2.approxPolyDP(contour, mid, True)
+        if len(candidate) <= MAX_POLYGON_VERTICES:
+            best, hi = candidate, mid
+        else:
+            lo = mid
+    return best
+
+
+def _trace(cv2: Any, m: Any, offset: Tuple[int, int] = (0, 0)) -> List[Dict[str, float]]:
+    """Largest external contour of a uint8 mask, simplified, in pixel space."""
+    contours, _ = cv2.findContours(m, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE, offset=offset)
+    if not contours:
+        return []
+    contour = max(contours, key=cv2.contourArea)
+    pts = _simplify(cv2, contour).reshape(-1, 2)[:MAX_POLYGON_VERTICES]
+    return [{"x": float(pt[0]), "y": float(pt[1])} for pt in pts.tolist()]
+
+
 def mask_to_polygon(mask: Any) -> List[Dict[str, float]]:
     """Convert a binary mask (HxW; bool / 0-1 / 0-255) to a simplified polygon.
 
-    Largest external contour, RDP-simplified (epsilon grows until under the
-    vertex cap), returned as pixel-space [{x, y}, …]. Mirrors the Rust SAM path.
+    Largest external contour, RDP-simplified to the vertex cap, returned as
+    pixel-space [{x, y}, …]. Mirrors the Rust SAM path. For many masks at once
+    use `masks_to_polygons`.
     """
-    cv2 = lazy_import("cv2", "opencv-python-headless")
     np = lazy_import("numpy")
     m = np.asarray(mask)
     if m.ndim > 2:
         m = m.squeeze()
-    if m.dtype != np.uint8:
-        m = (m > 0).astype(np.uint8) * 255
-    contours, _ = cv2.findContours(m, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    if not contours:
+    polys = masks_to_polygons(m)
+    return polys[0] if polys else []
+
+
+def masks_to_polygons(masks: Any) -> List[List[Dict[str, float]]]:
+    """`mask_to_polygon` for a whole `[N, H, W]` stack (torch tensor or array).
+
+    Thresholds on-device and does ONE device-to-host copy of a 1-byte-per-pixel
+    stack (not N float copies), finds every mask's bounding box with two
+    vectorized reductions, and contours only that crop — offset back to full
+    image coordinates. Returns one polygon per mask, `[]` for an empty mask.
+    """
+    cv2 = lazy_import("cv2", "opencv-python-headless")
+    np = lazy_import("numpy")
+    data = masks
+    if hasattr(data, "gt") and hasattr(data, "cpu"):  # torch: bool on device, then copy
+        data = data.gt(0).cpu().numpy()
+    arr = np.asarray(data)
+    if arr.ndim == 2:
+        arr = arr[None]
+    if arr.dtype != np.bool_:
+        arr = arr > 0
+    if arr.shape[0] == 0:
         return []
-    contour = max(contours, key=cv2.contourArea)
-    peri = cv2.arcLength(contour, True)
-    eps = 0.01 * peri
-    approx = cv2.approxPolyDP(contour, eps, True)
-    while len(approx) > MAX_POLYGON_VERTICES and eps < peri:
-        eps *= 1.5
-        approx = cv2.approxPolyDP(contour, eps, True)
-    pts = approx.reshape(-1, 2)[:MAX_POLYGON_VERTICES]
-    return [{"x": float(pt[0]), "y": float(pt[1])} for pt in pts]
+
+    rows = arr.any(axis=2)  # [N, H]
+    cols = arr.any(axis=1)  # [N, W]
+    out: List[List[Dict[str, float]]] = []
+    for i in range(arr.shape[0]):
+        ys = np.flatnonzero(rows[i])
+        if ys.size == 0:
+            out.append([])
+            continue
+        xs = np.flatnonzero(cols[i])
+        y0, y1, x0, x1 = int(ys[0]), int(ys[-1]) + 1, int(xs[0]), int(xs[-1]) + 1
+        crop = arr[i, y0:y1, x0:x1].astype(np.uint8)
+        out.append(_trace(cv2, crop, (x0, y0)))
+    return out
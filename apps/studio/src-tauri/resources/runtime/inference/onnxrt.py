@@ -0,0 +1,96 @@
+"""ONNX Runtime detection for ultralytics-exported YOLO / RT-DETR `.onnx` files.
+
+Serves the artifacts `export/onnx.py` writes without importing torch or
+ultralytics, so CPU-only workstations skip torch start-up and eager execution.
+Class names, input size and task come from the metadata ultralytics embeds in
+every export; letterboxing, decoding, NMS and the request contract (drafts or
+`columns`, micro-batching, `run_batch`) are shared via `inference/exported.py`.
+"""
+
+import ast
+import os
+from typing import Any, Dict, Optional
+
+from inference import exported
+from inference.loader import CACHE, env_number, lazy_import
+from inference.postprocess import head_layout
+
+# Preferred execution providers, best first; CPU is always available.
+_PROVIDERS = ("CUDAExecutionProvider", "CoreMLExecutionProvider", "CPUExecutionProvider")
+
+
+def _literal(value: Optional[str], default: Any) -> Any:
+    try:
+        return ast.literal_eval(value) if value else default
+    except (ValueError, SyntaxError):
+        return default
+
+
+class OnnxDetector(exported.ExportedDetector):
+    """One `InferenceSession` plus what it takes to feed and decode it."""
+
+    def __init__(self, model_path: str):
+        ort = lazy_import("onnxruntime", "onnxruntime")
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        threads = int(env_number("VAILABEL_RT_ORT_THREADS", 0))
+        if threads > 0:
+            opts.intra_op_num_threads = threads
+        available = set(ort.get_available_providers())
+        providers = [p for p in _PROVIDERS if p in available] or ["CPUExecutionProvider"]
+        self.session = ort.InferenceSession(model_path, sess_options=opts, providers=providers)
+
+        meta = dict(self.session.get_modelmeta().custom_metadata_map or {})
+        task = meta.get("task", "detect")
+        if task != "detect":
+            raise ValueError(f"only detection ONNX exports are supported (task={task!r})")
+        names = _literal(meta.get("names"), {})
+        self.names = names if isinstance(names, dict) else dict(enumerate(names))
+
+        inp = self.session.get_inputs()[0]
+        self.input_name = inp.name
+        height, width = inp.shape[2], inp.shape[3]
+        if not (isinstance(height, int) and isinstance(width, int)):
+            size = _literal(meta.get("imgsz"), [640, 640])
+            height, width = (size, size) if isinstance(size, int) else size
+        self.input_hw = (int(height), int(width))
+        # A symbolic batch axis takes any batch; a fixed one is fed in chunks of it.
+        self.batch = inp.shape[0] if isinstance(inp.shape[0], int) else 0
+        self.layout = head_layout(
+            meta.get("description", "") + " " + os.path.basename(model_path),
+            self.session.get_outputs()[0].shape,
+            len(self.names),
+            end2end=str(meta.get("end2end", "")).lower() == "true",
+        )
+        self.resident_bytes = os.path.getsize(model_path)
+
+    def _infer(self, tensors: Any) -> Any:
+        return self.session.run(None, {self.input_name: tensors})[0]
+
+
+def _key(model_path: str) -> str:
+    return f"onnx:{model_path}"
+
+
+def _detector(model_path: str, pin: bool = False) -> OnnxDetector:
+    return CACHE.get_or_load(_key(model_path), lambda: OnnxDetector(model_path), model_path, pin)
+
+
+def warmup(model_path: str, family: str, pin: bool = False) -> str:
+    """Create the session and run one blank image through it; return its key."""
+    det = _detector(model_path, pin)
+    np = lazy_import("numpy")
+    det.predict([np.zeros((det.input_hw[0], det.input_hw[1], 3), dtype=np.uint8)])
+    return _key(model_path)
+
+
+def run(req: Any) -> Dict[str, Any]:
+    """`{"detections": [...]}`, or `{"columns": {...}}` when `req.columnar` is set."""
+    model_path = req.model_path
+    return exported.run(req, _key(model_path), lambda: _detector(model_path))
+
+
+def run_batch(req: Any) -> Dict[str, Any]:
+    """Same contract as `detect.run_batch`: one entry per path, missing ones flagged."""
+    model_path = req.model_path
+    return exported.run_batch(req, lambda: _detector(model_path))
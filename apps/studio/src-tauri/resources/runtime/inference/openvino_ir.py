@@ -0,0 +1,157 @@
+"""OpenVINO detection for ultralytics-exported IR (`<name>_openvino_model/`).
+
+Serves what `export/openvino.py` writes — an `.xml`/`.bin` pair plus
+`metadata.yaml` — on Intel CPUs (or any `VAILABEL_RT_OV_DEVICE`) without torch.
+The IR is reshaped to a static `[1, 3, H, W]` input and compiled once per
+performance hint into the model cache; each image is its own request on an
+`AsyncInferQueue`, so a batch keeps as many requests in flight as the device
+reports optimal (`OPTIMAL_NUMBER_OF_INFER_REQUESTS`).
+
+Performance hints: `perf_hint` on the request ("latency" / "throughput" /
+"cumulative_throughput"), else `VAILABEL_RT_OV_HINT`, else "latency" for
+single images and "throughput" for `run_batch`. Pre/post-processing and the
+response contract are shared with ONNX Runtime via `inference/exported.py`.
+"""
+
+import glob
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from inference import exported
+from inference.loader import CACHE, lazy_import
+from inference.postprocess import head_layout
+
+HINTS = {
+    "latency": "LATENCY",
+    "throughput": "THROUGHPUT",
+    "cumulative_throughput": "CUMULATIVE_THROUGHPUT",
+}
+
+
+def ir_file(model_path: str) -> str:
+    """The `.xml` for an IR path given as the file itself or its export directory."""
+    if os.path.isdir(model_path):
+        found = sorted(glob.glob(os.path.join(model_path, "*.xml")))
+        if not found:
+            raise FileNotFoundError(f"no OpenVINO .xml in {model_path}")
+        return found[0]
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"model not found on disk: {model_path}")
+    return model_path
+
+
+def _metadata(ir_dir: str) -> Dict[str, Any]:
+    """Ultralytics' `metadata.yaml` next to the IR, or `{}` if absent/unreadable."""
+    path = os.path.join(ir_dir, "metadata.yaml")
+    if not os.path.exists(path):
+        return {}
+    try:
+        yaml = lazy_import("yaml", "pyyaml")
+        with open(path, "r", encoding="utf-8") as fh:
+            meta = yaml.safe_load(fh)
+    except Exception:  # noqa: BLE001 — names fall back to the IR's rt_info
+        return {}
+    return meta if isinstance(meta, dict) else {}
+
+
+def _rt_labels(model: Any) -> Dict[int, str]:
+    """Class names from the IR's `model_info/labels` rt_info (space-separated)."""
+    try:
+        labels = model.get_rt_info(["model_info", "labels"]).astype(str).split()
+    except Exception:  # noqa: BLE001 — older IRs carry no rt_info
+        return {}
+    return dict(enumerate(labels))
+
+
+def _hint(explicit: Optional[str], default: str) -> str:
+    name = (explicit or os.environ.get("VAILABEL_RT_OV_HINT") or default).strip().lower()
+    if name not in HINTS:
+        raise ValueError(f"unknown OpenVINO performance hint '{name}' (expected {sorted(HINTS)})")
+    return name
+
+
+class OpenVinoDetector(exported.ExportedDetector):
+    """A compiled IR plus an async request queue sized by the device."""
+
+    def __init__(self, model_path: str, hint: str):
+        ov = lazy_import("openvino", "openvino")
+        xml = ir_file(model_path)
+        meta = _metadata(os.path.dirname(xml))
+        task = meta.get("task", "detect")
+        if task != "detect":
+            raise ValueError(f"only detection OpenVINO exports are supported (task={task!r})")
+
+        core = ov.Core()
+        model = core.read_model(xml)
+        names = meta.get("names") or _rt_labels(model)
+        self.names = names if isinstance(names, dict) else dict(enumerate(names))
+        shape = model.input(0).get_partial_shape()
+        if shape[2].is_static and shape[3].is_static:
+            height, width = shape[2].get_length(), shape[3].get_length()
+        else:
+            size = meta.get("imgsz") or [640, 640]
+            height, width = (size, size) if isinstance(size, int) else size
+        self.input_hw = (int(height), int(width))
+        # Static single-image input: dynamic shapes cost CPU plugins real speed,
+        # and in-flight parallelism comes from the request queue instead.
+        model.reshape([1, 3, self.input_hw[0], self.input_hw[1]])
+
+        device = os.environ.get("VAILABEL_RT_OV_DEVICE", "CPU")
+        self.compiled = core.compile_model(model, device, {"PERFORMANCE_HINT": HINTS[hint]})
+        self.layout = head_layout(
+            str(meta.get("description", "")) + " " + os.path.basename(xml),
+            list(self.compiled.output(0).shape),
+            len(self.names),
+            end2end=bool(meta.get("end2end")),
+        )
+        jobs = int(self.compiled.get_property("OPTIMAL_NUMBER_OF_INFER_REQUESTS"))
+        self.queue = ov.AsyncInferQueue(self.compiled, max(1, jobs))
+        self.queue.set_callback(self._done)
+        self._heads: List[Any] = []
+        self._lock = threading.Lock()  # one caller drives the queue at a time
+        weights = os.path.splitext(xml)[0] + ".bin"
+        self.resident_bytes = os.path.getsize(weights) if os.path.exists(weights) else 0
+
+    def _done(self, request: Any, index: int) -> None:
+        self._heads[index] = request.get_output_tensor(0).data[0].copy()
+
+    def _infer_many(self, tensors: List[Any]) -> List[Any]:
+        with self._lock:
+            self._heads = [None] * len(tensors)
+            for index, tensor in enumerate(tensors):
+                self.queue.start_async({0: tensor[None]}, index)
+            self.queue.wait_all()
+            heads, self._heads = self._heads, []
+        return heads
+
+
+def _key(model_path: str, hint: str) -> str:
+    return f"openvino:{hint}:{model_path}"
+
+
+def _detector(model_path: str, hint: str, pin: bool = False) -> OpenVinoDetector:
+    return CACHE.get_or_load(
+        _key(model_path, hint), lambda: OpenVinoDetector(model_path, hint), model_path, pin
+    )
+
+
+def warmup(model_path: str, family: str, pin: bool = False) -> str:
+    """Compile the IR (default hint) and run one blank image; return its key."""
+    hint = _hint(None, "latency")
+    det = _detector(model_path, hint, pin)
+    np = lazy_import("numpy")
+    det.predict([np.zeros((det.input_hw[0], det.input_hw[1], 3), dtype=np.uint8)])
+    return _key(model_path, hint)
+
+
+def run(req: Any) -> Dict[str, Any]:
+    """`{"detections": [...]}`, or `{"columns": {...}}` when `req.columnar` is set."""
+    model_path, hint = req.model_path, _hint(getattr(req, "perf_hint", None), "latency")
+    return exported.run(req, _key(model_path, hint), lambda: _detector(model_path, hint))
+
+
+def run_batch(req: Any) -> Dict[str, Any]:
+    """Same contract as `detect.run_batch`; defaults to the throughput hint."""
+    model_path, hint = req.model_path, _hint(getattr(req, "perf_hint", None), "throughput")
+    return exported.run_batch(req, lambda: _detector(model_path, hint))
@@ -9,7 +9,8 @@ to its own bundled English models.
 
 from typing import Any, Dict, List
 
-from inference.loader import CACHE, lazy_import, pick_device
+from inference.loader import CACHE, lazy_import, load_array, pick_device
+from inference.tracing import span
 
 
 def _load(model_path: str):
@@ -25,9 +26,24 @@ def _load(model_path: str):
     return paddleocr.PaddleOCR(**kwargs)
 
 
+# PaddleOCR is keyed by family alone: one OCR pipeline serves every request.
+_KEY = "paddleocr"
+
+
+def warmup(model_path: str, family: str, pin: bool = False) -> str:
+    """Load PaddleOCR and read a blank image once; return its cache key."""
+    ocr = CACHE.get_or_load(_KEY, lambda: _load(model_path), model_path, pin)
+    np = lazy_import("numpy")
+    ocr.ocr(np.zeros((64, 256, 3), dtype=np.uint8), cls=True)
+    return _KEY
+
+
 def run(req: Any) -> Dict[str, Any]:
-    ocr = CACHE.get_or_load("paddleocr", lambda: _load(getattr(req, "model_path", "")))
-    result = ocr.ocr(req.image_path, cls=True)
+    model_path = getattr(req, "model_path", "") or ""
+    ocr = CACHE.get_or_load(_KEY, lambda: _load(model_path), model_path)
+    image = load_array(req.image_path, "bgr")
+    with span("predict"):
+        result = ocr.ocr(image, cls=True)
 
     lines: List[Dict[str, Any]] = []
     for page in result or []:
@@ -0,0 +1,287 @@
+"""Detector-agnostic post-processing shared by the inference adapters.
+
+- `tile_grid`: overlapping windows covering a large image (sliced inference);
+- `merge_columns` / `offset_columns`: concatenate columnar detection results,
+  shift a tile's boxes into image space;
+- `batch_results`: the per-path entries of a batch detect, a bad image failing
+  only its own entry;
+- `nms`: class-aware greedy non-maximum suppression over merged tile results;
+- `letterbox` / `unletterbox` / `head_layout` / `decode_detections`: the
+  pre/post-processing ultralytics would do, for exported detectors run
+  without torch.
+
+numpy (and opencv for resizing) are imported lazily, so the module is
+importable without them.
+"""
+
+import os
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from inference.loader import RuntimeDependencyError, lazy_import
+
+# Cross-tile NMS IoU when the caller doesn't pass `tile_iou`.
+DEFAULT_TILE_IOU = 0.5
+
+
+def tile_grid(
+    width: int, height: int, tile: int, overlap: float = 0.2
+) -> List[Tuple[int, int, int, int]]:
+    """`(x0, y0, x1, y1)` windows of `tile` px with `overlap` (fraction) between them.
+
+    The last row/column is shifted back so every window is full-size whenever
+    the image is larger than a tile; an image smaller than `tile` is one window.
+    """
+    tile = max(1, int(tile))
+    overlap = min(max(float(overlap), 0.0), 0.9)
+    step = max(1, int(round(tile * (1.0 - overlap))))
+
+    def starts(extent: int) -> List[int]:
+        if extent <= tile:
+            return [0]
+        out = list(range(0, extent - tile, step))
+        out.append(extent - tile)
+        return out
+
+    return [
+        (x0, y0, min(x0 + tile, width), min(y0 + tile, height))
+        for y0 in starts(height)
+        for x0 in starts(width)
+    ]
+
+
+def merge_columns(parts: List[Dict[str, List[Any]]]) -> Dict[str, List[Any]]:
+    """Concatenate columnar detection results (an empty set for no parts)."""
+    merged: Dict[str, List[Any]] = {"xyxy": [], "classId": [], "confidence": [], "labelName": []}
+    for part in parts:
+        for name, values in part.items():
+            merged[name].extend(values)
+    return merged
+
+
+def _isolated(chunk: List[str], predict: Callable[[List[str]], List[Any]]) -> List[Any]:
+    """`predict(chunk)`, else each path on its own; a path that still fails yields its error."""
+    try:
+        return list(predict(chunk))
+    except RuntimeDependencyError:
+        raise
+    except Exception as exc:  # noqa: BLE001 — retry alone to find the bad image(s)
+        if len(chunk) == 1:
+            return [exc]
+    out: List[Any] = []
+    for path in chunk:
+        try:
+            out.extend(predict([path]))
+        except RuntimeDependencyError:
+            raise
+        except Exception as exc:  # noqa: BLE001
+            out.append(exc)
+    return out
+
+
+def batch_results(
+    paths: List[str],
+    predict: Callable[[List[str]], List[Any]],
+    batch_size: int,
+    columnar: bool = False,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict[str, Any]:
+    """`{"results": [{image_path, detections | columns, error?}, …]}` in path order.
+
+    `predict(chunk)` returns the detections (drafts, or columns with `columnar`)
+    of up to `batch_size` existing paths. A missing path, or one that still
+    fails when its chunk is retried a path at a time, gets an entry with
+    `error` and no detections; only a missing dependency fails the whole
+    batch, since no image could succeed. `on_progress(done, total)` is called
+    after every chunk.
+    """
+    key = "columns" if columnar else "detections"
+    present = [p for p in paths if p and os.path.exists(p)]
+    size = max(1, int(batch_size))
+    found: Dict[str, Any] = {}
+    for start in range(0, len(present), size):
+        chunk = present[start : start + size]
+        found.update(zip(chunk, _isolated(chunk, predict)))
+        if on_progress is not None:
+            on_progress(min(start + size, len(present)), len(present))
+
+    results: List[Dict[str, Any]] = []
+    for path in paths:
+        value = found.get(path, FileNotFoundError(f"image not found on disk: {path}"))
+        if isinstance(value, Exception):
+            empty = merge_columns([]) if columnar else []
+            results.append({"image_path": path, key: empty, "error": str(value)})
+        else:
+            results.append({"image_path": path, key: value})
+    return {"results": results}
+
+
+def offset_columns(columns: Dict[str, List[Any]], dx: float, dy: float) -> Dict[str, List[Any]]:
+    """Copy of `columns` with every `xyxy` row shifted by `(dx, dy)`."""
+    out = dict(columns)
+    out["xyxy"] = [[x1 + dx, y1 + dy, x2 + dx, y2 + dy] for x1, y1, x2, y2 in columns["xyxy"]]
+    return out
+
+
+def nms(
+    boxes: Sequence[Sequence[float]],
+    scores: Sequence[float],
+    classes: Optional[Sequence[int]] = None,
+    iou: float = DEFAULT_TILE_IOU,
+    max_keep: Optional[int] = None,
+) -> List[int]:
+    """Indices of the boxes kept by greedy NMS, highest score first.
+
+    With `classes`, boxes only suppress boxes of the same class (each class is
+    shifted to a disjoint coordinate range so one vectorized pass handles all).
+    `max_keep` stops after that many survivors — the loop runs once per kept
+    box, so a low-confidence flood of candidates stays bounded.
+    """
+    np = lazy_import("numpy")
+    b = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    if b.shape[0] == 0:
+        return []
+    if classes is not None:
+        b = b + (b.max() + 1.0) * np.asarray(classes, dtype=np.float64)[:, None]
+    x1, y1, x2, y2 = b[:, 0], b[:, 1], b[:, 2], b[:, 3]
+    areas = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    order = np.argsort(-np.asarray(scores, dtype=np.float64), kind="stable")
+
+    keep: List[int] = []
+    while order.size and (max_keep is None or len(keep) < max_keep):
+        i = int(order[0])
+        keep.append(i)
+        rest = order[1:]
+        w = np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0, None)
+        h = np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0, None)
+        inter = w * h
+        union = areas[i] + areas[rest] - inter
+        overlap = np.where(union > 0, inter / np.where(union > 0, union, 1), 0)
+        order = rest[overlap <= iou]
+    return keep
+
+
+# ---------------------------------------------------------------------------
+# Exported-detector pre/post-processing (ONNX Runtime / OpenVINO backends).
+# ---------------------------------------------------------------------------
+
+# Ultralytics pads letterboxed inputs with this grey.
+LETTERBOX_FILL = 114
+
+
+def letterbox(
+    rgb: Any, size: Tuple[int, int], stretch: bool = False
+) -> Tuple[Any, Tuple[float, float], Tuple[float, float]]:
+    """Resize an HxWx3 uint8 RGB image into a `(height, width)` network input.
+
+    Aspect-preserving with grey padding (YOLO), or a plain `stretch` resize
+    (RT-DETR, matching ultralytics' `scale_fill`). Returns the `[3, H, W]`
+    float32 0-1 tensor plus the `(gx, gy)` scale and `(px, py)` padding that
+    `unletterbox` needs to map boxes back.
+    """
+    cv2 = lazy_import("cv2", "opencv-python-headless")
+    np = lazy_import("numpy")
+    height, width = int(size[0]), int(size[1])
+    h, w = rgb.shape[:2]
+    if stretch:
+        gx, gy = width / w, height / h
+        canvas = cv2.resize(rgb, (width, height), interpolation=cv2.INTER_LINEAR)
+        px = py = 0.0
+    else:
+        gain = min(width / w, height / h)
+        gx = gy = gain
+        nw, nh = int(round(w * gain)), int(round(h * gain))
+        px, py = (width - nw) / 2, (height - nh) / 2
+        canvas = np.full((height, width, 3), LETTERBOX_FILL, dtype=np.uint8)
+        top, left = int(round(py - 0.1)), int(round(px - 0.1))
+        resized = rgb if (nw, nh) == (w, h) else cv2.resize(
+            rgb, (nw, nh), interpolation=cv2.INTER_LINEAR
+        )
+        canvas[top : top + nh, left : left + nw] = resized
+        px, py = float(left), float(top)
+    tensor = canvas.transpose(2, 0, 1).astype(np.float32) * (1.0 / 255.0)
+    return tensor, (gx, gy), (px, py)
+
+
+def unletterbox(
+    xyxy: Any, gain: Tuple[float, float], pad: Tuple[float, float], shape: Tuple[int, int]
+) -> Any:
+    """Map network-space `[N, 4]` xyxy boxes back onto the `(h, w)` source image."""
+    np = lazy_import("numpy")
+    out = np.array(xyxy, dtype=np.float32, copy=True).reshape(-1, 4)
+    out[:, [0, 2]] = (out[:, [0, 2]] - pad[0]) / gain[0]
+    out[:, [1, 3]] = (out[:, [1, 3]] - pad[1]) / gain[1]
+    out[:, [0, 2]] = out[:, [0, 2]].clip(0, shape[1])
+    out[:, [1, 3]] = out[:, [1, 3]].clip(0, shape[0])
+    return out
+
+
+def _cxcywh_to_xyxy(b: Any) -> Any:
+    np = lazy_import("numpy")
+    half = b[:, 2:4] / 2
+    return np.concatenate([b[:, 0:2] - half, b[:, 0:2] + half], axis=1)
+
+
+def head_layout(arch: str, out_shape: Sequence[Any], nc: int, end2end: bool = False) -> str:
+    """Which `decode_detections` layout an exported head uses.
+
+    `arch` is any architecture hint (export description, file name); the
+    output shape disambiguates the rest — `[4 + nc, anchors]` is a raw YOLO
+    head, `[N, 6]` an end-to-end export, `[queries, 4 + nc]` RT-DETR.
+    """
+    arch = arch.lower()
+    if "rtdetr" in arch or "rt-detr" in arch:
+        return "rtdetr"
+    if end2end:
+        return "end2end"
+    dims = list(out_shape)[-2:]
+    if len(dims) == 2:
+        rows, cols = dims
+        if nc and rows == 4 + nc:
+            return "yolo"
+        if cols == 6:
+            return "end2end"
+        if nc and cols == 4 + nc:
+            return "rtdetr"
+    return "yolo"
+
+
+def decode_detections(
+    output: Any,
+    layout: str,
+    input_hw: Tuple[int, int],
+    conf: float = 0.25,
+    iou: float = 0.7,
+    max_det: int = 300,
+) -> Tuple[Any, Any, Any]:
+    """`(xyxy [N, 4], scores [N], classes [N])` in network pixels for one image.
+
+    `output` is one image's slice of an ultralytics-exported head:
+
+    - `"yolo"`:    `[4 + nc, anchors]` — cx, cy, w, h (pixels) then class
+      scores; needs NMS;
+    - `"rtdetr"`:  `[queries, 4 + nc]` — normalized cx, cy, w, h then sigmoid
+      class scores; NMS-free;
+    - `"end2end"`: `[max_det, 6]` — x1, y1, x2, y2, score, class (exported with
+      `nms=True`, or YOLOv10-style heads).
+    """
+    np = lazy_import("numpy")
+    out = np.asarray(output, dtype=np.float32)
+    if layout == "end2end":
+        keep = out[:, 4] >= conf
+        rows = out[keep][:max_det]
+        return rows[:, :4], rows[:, 4], rows[:, 5].astype(np.int64)
+
+    if layout == "yolo":
+        out = out.T  # [anchors, 4 + nc]
+    scores_all = out[:, 4:]
+    classes = scores_all.argmax(axis=1)
+    scores = scores_all[np.arange(out.shape[0]), classes]
+    keep = scores >= conf
+    boxes = _cxcywh_to_xyxy(out[keep, :4])
+    scores, classes = scores[keep], classes[keep]
+    if layout == "rtdetr":
+        boxes = boxes * np.array([input_hw[1], input_hw[0]] * 2, dtype=np.float32)
+        order = np.argsort(-scores, kind="stable")[:max_det]
+        return boxes[order], scores[order], classes[order]
+    idx = nms(boxes, scores, classes, iou=iou, max_keep=max_det)
+    return boxes[idx], scores[idx], classes[idx]
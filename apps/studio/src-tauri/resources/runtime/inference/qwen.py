@@ -6,6 +6,7 @@
 from typing import Any, Dict
 
 from inference.loader import CACHE, lazy_import, load_image, pick_device
+from inference.tracing import span
 
 
 def _load(model_path: str):
@@ -27,9 +28,20 @@ def _load(model_path: str):
     return model, processor, device
 
 
+def _key(model_path: str) -> str:
+    return f"qwen:{model_path}"
+
+
+def warmup(model_path: str, family: str, pin: bool = False) -> str:
+    """Load Qwen2-VL; return its cache key. No dummy pass — a chat-template
+    generate on a multi-billion-parameter VLM costs more than it warms."""
+    CACHE.get_or_load(_key(model_path), lambda: _load(model_path), model_path, pin)
+    return _key(model_path)
+
+
 def run_caption(req: Any) -> Dict[str, Any]:
     model, processor, device = CACHE.get_or_load(
-        f"qwen:{req.model_path}", lambda: _load(req.model_path)
+        _key(req.model_path), lambda: _load(req.model_path), req.model_path
     )
     image, _ = load_image(req.image_path)
     question = (getattr(req, "prompt", None) or "").strip() or "Describe this image in detail."
@@ -42,12 +54,15 @@ def run_caption(req: Any) -> Dict[str, Any]:
             ],
         }
     ]
-    text = processor.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
-    inputs = processor(text=[text], images=[image], return_tensors="pt").to(device)
-    generated = model.generate(**inputs, max_new_tokens=512)
-    # Drop the prompt tokens before decoding the answer.
-    trimmed = generated[:, inputs["input_ids"].shape[1] :]
-    out = processor.batch_decode(
-        trimmed, skip_special_tokens=True, clean_up_tokenization_spaces=False
-    )[0]
+    with span("preprocess"):
+        text = processor.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
+        inputs = processor(text=[text], images=[image], return_tensors="pt").to(device)
+    with span("predict"):
+        generated = model.generate(**inputs, max_new_tokens=512)
+    with span("postprocess"):
+        # Drop the prompt tokens before decoding the answer.
+        trimmed = generated[:, inputs["input_ids"].shape[1] :]
+        out = processor.batch_decode(
+            trimmed, skip_special_tokens=True, clean_up_tokenization_spaces=False
+        )[0]
     return {"text": out.strip()}
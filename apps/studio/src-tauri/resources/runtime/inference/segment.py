@@ -5,11 +5,42 @@ we trace into polygons — far more robust than hand-wiring SAM2 configs, and it
 reuses the ultralytics dependency the detect/train paths already need.
 
 Returns `{"masks": [InferenceAnnotationDraft, …]}` with `type: "polygon"`.
+
+Many prompts for one image (`boxes`, `point_groups`) are decoded in a single
+call, so SAM runs its heavy image encoder once rather than once per object.
+
+The image embedding itself is cached per (model, image path, mtime) in an LRU
+(`EMBEDDINGS`), so interactive click refinement — the same image again with
+one more point — only pays for the lightweight mask decoder. This drives
+ultralytics' SAM predictor directly (`set_image` → `features`); if its
+internals ever stop matching, we fall back to a plain `model.predict`.
 """
 
-from typing import Any, Dict, List
+import threading
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+from inference.loader import (
+    CACHE,
+    ImageCache,
+    draft,
+    env_number,
+    lazy_import,
+    load_array,
+    masks_to_polygons,
+    pick_device,
+)
+from inference.tracing import span
+
 
-from inference.loader import CACHE, draft, lazy_import, mask_to_polygon, pick_device
+# Image embeddings, byte-budgeted (VAILABEL_RT_SAM_EMBED_CACHE_MB, default 256).
+# Keyed like the image cache, with the model path folded into the kind.
+EMBEDDINGS = ImageCache(int(env_number("VAILABEL_RT_SAM_EMBED_CACHE_MB", 256) * 1024 * 1024))
+
+# One lock per loaded model: the predictor's `features` slot is shared mutable
+# state. Keyed weakly, so a lock goes away with the model the cache dropped.
+_PREDICT_LOCKS: "weakref.WeakKeyDictionary[Any, threading.Lock]" = weakref.WeakKeyDictionary()
+_LOCKS_GUARD = threading.Lock()
 
 
 def _load(model_path: str):
@@ -17,29 +48,163 @@ def _load(model_path: str):
     return ultra.SAM(model_path)
 
 
-def run(req: Any) -> Dict[str, Any]:
-    model = CACHE.get_or_load(f"segment:{req.model_path}", lambda: _load(req.model_path))
+def _key(model_path: str) -> str:
+    return f"segment:{model_path}"
+
+
+def warmup(model_path: str, family: str, pin: bool = False) -> str:
+    """Load SAM and segment one box on a blank image; return its cache key."""
+    model = CACHE.get_or_load(_key(model_path), lambda: _load(model_path), model_path, pin)
+    np = lazy_import("numpy")
+    blank = np.zeros((640, 640, 3), dtype=np.uint8)
+    with _predict_lock(model):
+        model.predict(blank, bboxes=[[0, 0, 64, 64]], device=pick_device(), verbose=False)
+    return _key(model_path)
+
+
+def _predict_lock(model: Any) -> threading.Lock:
+    with _LOCKS_GUARD:
+        lock = _PREDICT_LOCKS.get(model)
+        if lock is None:
+            lock = _PREDICT_LOCKS[model] = threading.Lock()
+        return lock
+
+
+def _predictor(model: Any) -> Optional[Any]:
+    """The model's ultralytics SAM predictor, created the way `SAM.predict`
+    would on first use. None when the internals don't look as expected."""
+    predictor = getattr(model, "predictor", None)
+    if predictor is None:
+        try:
+            args = {
+                **getattr(model, "overrides", {}),
+                "conf": 0.25,
+                "task": "segment",
+                "mode": "predict",
+                "imgsz": 1024,
+                "device": pick_device(),
+                "verbose": False,
+            }
+            predictor = model._smart_load("predictor")(overrides=args, _callbacks=model.callbacks)
+            predictor.setup_model(model=model.model, verbose=False)
+            model.predictor = predictor
+        except Exception:  # noqa: BLE001
+            return None
+    if not (hasattr(predictor, "set_image") and hasattr(predictor, "features")):
+        return None
+    return predictor
+
+
+def _tensor_bytes(obj: Any) -> int:
+    """Bytes held by a tensor or a dict/list of them (SAM2 features are a dict)."""
+    if isinstance(obj, dict):
+        return sum(_tensor_bytes(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(_tensor_bytes(v) for v in obj)
+    try:
+        return int(obj.numel()) * int(obj.element_size())
+    except Exception:  # noqa: BLE001
+        return 0
+
 
-    kwargs: Dict[str, Any] = {"device": pick_device(), "verbose": False}
+def _predict(model: Any, model_path: str, image_path: str, image: Any, prompts: Dict[str, Any]):
+    """Prompted SAM inference reusing the cached embedding for this image."""
+    with _predict_lock(model):
+        predictor = _predictor(model)
+        if predictor is None:
+            return model.predict(image, device=pick_device(), verbose=False, **prompts)
+
+        def encode(_path: str) -> Tuple[Any, int]:
+            predictor.set_image(image)
+            return predictor.features, _tensor_bytes(predictor.features)
+
+        try:
+            predictor.features = EMBEDDINGS.get(image_path, f"sam:{model_path}", encode)
+            return predictor(image, **prompts)
+        finally:
+            predictor.reset_image()
+
+
+def _prompt_batches(req: Any) -> List[Tuple[Optional[int], Dict[str, Any]]]:
+    """(first prompt index, predict kwargs) per SAM call, in output order.
+
+    The legacy single prompt (`points` and/or `box_xyxy`) stays one combined
+    prompt. `boxes` go in one call and `point_groups` in another — each call
+    encodes the image once and decodes every prompt in it. Ragged point groups
+    are padded with SAM's "not a point" label (-1) so they batch together.
+    No prompt at all keeps ultralytics' segment-everything mode (index None).
+    """
+    batches: List[Tuple[Optional[int], Dict[str, Any]]] = []
+    count = 0
+
+    legacy: Dict[str, Any] = {}
     points = [list(p) for p in (getattr(req, "points", None) or [])]
     if points:
-        kwargs["points"] = points
-        kwargs["labels"] = [1] * len(points)  # all foreground clicks
+        legacy["points"] = points
+        legacy["labels"] = [1] * len(points)  # all foreground clicks
     box = getattr(req, "box_xyxy", None)
     if box:
-        kwargs["bboxes"] = [list(box)]
+        legacy["bboxes"] = [list(box)]
+    if legacy:
+        batches.append((count, legacy))
+        count += 1
+
+    boxes = [list(b) for b in (getattr(req, "boxes", None) or [])]
+    if boxes:
+        batches.append((count, {"bboxes": boxes}))
+        count += len(boxes)
+
+    groups = [[list(p) for p in g] for g in (getattr(req, "point_groups", None) or []) if g]
+    if groups:
+        width = max(len(g) for g in groups)
+        batches.append(
+            (
+                count,
+                {
+                    "points": [g + [[0.0, 0.0]] * (width - len(g)) for g in groups],
+                    "labels": [[1] * len(g) + [-1] * (width - len(g)) for g in groups],
+                },
+            )
+        )
+        count += len(groups)
 
-    results = model.predict(req.image_path, **kwargs)
+    return batches or [(None, {})]
+
+
+def run(req: Any) -> Dict[str, Any]:
+    """`{"masks": [...]}` — one polygon per prompt (prompted masks carry
+    `promptIndex`, their position across points/box, `boxes`, `point_groups`);
+    prompts whose mask traces to nothing are skipped."""
+    model = CACHE.get_or_load(
+        _key(req.model_path), lambda: _load(req.model_path), req.model_path
+    )
+    image = load_array(req.image_path, "bgr")
 
     masks_out: List[Dict[str, Any]] = []
+    for first, prompts in _prompt_batches(req):
+        with span("predict"):
+            if prompts:
+                results = _predict(model, req.model_path, req.image_path, image, prompts)
+            else:
+                with _predict_lock(model):
+                    results = model.predict(image, device=pick_device(), verbose=False)
+        with span("postprocess"):
+            masks_out.extend(_masks(results, first))
+    return {"masks": masks_out}
+
+
+def _masks(results: Any, first: Optional[int]) -> List[Dict[str, Any]]:
+    out: List[Dict[str, Any]] = []
     for res in results:
         masks = getattr(res, "masks", None)
         if masks is None or getattr(masks, "data", None) is None:
             continue
-        data = masks.data  # tensor [N, H, W]
-        for i in range(int(data.shape[0])):
-            poly = mask_to_polygon(data[i].cpu().numpy())
+        # tensor [N, H, W] -> N polygons with one device-to-host copy.
+        for i, poly in enumerate(masks_to_polygons(masks.data)):
             if not poly:
                 continue
-            masks_out.append(draft("object", "polygon", poly, 1.0))
-    return {"masks": masks_out}
+            item = draft("object", "polygon", poly, 1.0)
+            if first is not None:
+                item["promptIndex"] = first + i
+            out.append(item)
+    return out
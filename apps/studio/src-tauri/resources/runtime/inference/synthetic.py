@@ -0,0 +1,276 @@
+"""Synthetic model family: fake models with tunable cost, for load testing.
+
+Lets the whole runtime (routing, threadpool, model cache, micro-batching, job
+scheduler) be driven at realistic concurrency on a plain machine, with no
+weights, torch or GPU. The model path is a spec, not a file:
+
+    synthetic://detector-a?load_ms=800&compute_ms=25&work=sleep&boxes=40&mb=64
+
+The family only exists with VAILABEL_RT_SYNTHETIC=1, which tests and benches
+set; a shipped runtime refuses to load these models. With it set, any path
+whose parent directory or name contains "synthetic" resolves to this family
+before any other hint (see `loader.infer_family`). The part before `?` names
+the model, so different names are different cache entries. Parameters:
+
+- `load_ms`: time to "load the weights", once per cache miss;
+- `mb`: resident size the cache accounts for (a real allocation, capped at
+  `MAX_MB`), so budgets and eviction behave as they would for real models;
+- `compute_ms`: per-image forward time. `batch_scale` (default 0.3) is the
+  cost of each extra image in a batch, relative to the first;
+- `work`: "sleep" (default) releases the GIL like a GPU kernel; "cpu" spins
+  in Python and holds it, like CPU-bound pre/post-processing;
+- output size: `boxes` per image, `masks` x `vertices` per segmentation,
+  `text_chars` per caption, `lines` per OCR;
+- `decode=1` decodes the image through the shared image cache (needs pillow).
+  Otherwise the image only has to exist.
+
+Outputs are deterministic per (model, image) and have the same shape as the
+real adapters (drafts, `columns`, masks, text, lines).
+"""
+
+import hashlib
+import math
+import os
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+from inference.loader import CACHE, batcher, box_drafts, draft, load_array, synthetic_enabled
+from inference.postprocess import batch_results
+from inference.tracing import span
+
+_MB = 1024 * 1024
+
+# Largest `mb` a spec may ask for: the allocation is real.
+MAX_MB = 4096.0
+
+_DEFAULTS: Dict[str, float] = {
+    "load_ms": 500.0,
+    "mb": 16.0,
+    "compute_ms": 20.0,
+    "batch_scale": 0.3,
+    "boxes": 20,
+    "masks": 1,
+    "vertices": 48,
+    "text_chars": 120,
+    "lines": 4,
+    "decode": 0,
+}
+
+_WORDS = ("a", "car", "person", "parked", "near", "the", "road", "with", "red", "tree", "sign")
+
+
+class SyntheticModel:
+    """A loaded fake model: its spec plus `mb` of real, cache-accounted memory."""
+
+    def __init__(self, name: str, params: Dict[str, Any]):
+        self.name = name
+        self.params = params
+        self.weights = bytearray(int(params["mb"] * _MB))
+        self.resident_bytes = len(self.weights)  # read by loader.estimate_footprint
+        self.classes = [f"class{i}" for i in range(8)]
+
+    def compute(self, images: int) -> None:
+        """Spend the forward-pass time for a batch of `images`."""
+        if images <= 0:
+            return
+        seconds = self.params["compute_ms"] / 1000 * (
+            1 + (images - 1) * self.params["batch_scale"]
+        )
+        _spend(seconds, self.params["work"])
+
+    def rng(self, image_path: str) -> random.Random:
+        digest = hashlib.blake2b(f"{self.name}|{image_path}".encode(), digest_size=8).digest()
+        return random.Random(int.from_bytes(digest, "big"))
+
+
+def _spend(seconds: float, work: str) -> None:
+    if work == "cpu":
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            pass
+    elif seconds > 0:
+        time.sleep(seconds)
+
+
+def parse_spec(model_path: str) -> Dict[str, Any]:
+    """`{"name", <params>…}` from a synthetic model path (unknown keys ignored)."""
+    parts = urlsplit(model_path or "")
+    name = (parts.netloc + parts.path) if parts.scheme == "synthetic" else parts.path
+    params: Dict[str, Any] = dict(_DEFAULTS)
+    params["work"] = "sleep"
+    for key, value in parse_qsl(parts.query):
+        if key == "work":
+            params["work"] = "cpu" if value.strip().lower() == "cpu" else "sleep"
+        elif key in _DEFAULTS:
+            try:
+                params[key] = max(0.0, float(value))
+            except ValueError:
+                pass
+    params["mb"] = min(params["mb"], MAX_MB)
+    for key in ("boxes", "masks", "vertices", "text_chars", "lines"):
+        params[key] = int(params[key])
+    params["name"] = name or "synthetic"
+    return params
+
+
+def _load(model_path: str) -> SyntheticModel:
+    params = parse_spec(model_path)
+    _spend(params["load_ms"] / 1000, params["work"])
+    return SyntheticModel(params["name"], params)
+
+
+def _key(model_path: str) -> str:
+    return f"synthetic:{model_path}"
+
+
+def _model(model_path: str, pin: bool = False) -> SyntheticModel:
+    if not synthetic_enabled():
+        raise ValueError("synthetic models are disabled (set VAILABEL_RT_SYNTHETIC=1)")
+    return CACHE.get_or_load(_key(model_path), lambda: _load(model_path), model_path, pin)
+
+
+def warmup(model_path: str, family: str, pin: bool = False) -> str:
+    _model(model_path, pin).compute(1)
+    return _key(model_path)
+
+
+def _check(model: SyntheticModel, image_path: str) -> None:
+    if not image_path or not os.path.exists(image_path):
+        raise FileNotFoundError(f"image not found on disk: {image_path}")
+    if model.params["decode"]:
+        load_array(image_path)
+
+
+def _columns(model: SyntheticModel, image_path: str) -> Dict[str, List[Any]]:
+    rng = model.rng(image_path)
+    columns: Dict[str, List[Any]] = {"xyxy": [], "classId": [], "confidence": [], "labelName": []}
+    for _ in range(model.params["boxes"]):
+        x, y = rng.uniform(0, 1200), rng.uniform(0, 650)
+        cls_id = rng.randrange(len(model.classes))
+        columns["xyxy"].append([x, y, x + rng.uniform(8, 80), y + rng.uniform(8, 80)])
+        columns["classId"].append(cls_id)
+        columns["confidence"].append(rng.uniform(0.25, 1.0))
+        columns["labelName"].append(model.classes[cls_id])
+    return columns
+
+
+def predict_many(
+    model_path: str,
+    image_paths: List[str],
+    columnar: bool = False,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    batch_size: int = 8,
+) -> List[Any]:
+    """Detections per image (drafts, or columns with `columnar`), `batch_size` at a time."""
+    model = _model(model_path)
+    out: List[Any] = []
+    for start in range(0, len(image_paths), max(1, batch_size)):
+        chunk = image_paths[start : start + max(1, batch_size)]
+        with span("predict"):
+            model.compute(len(chunk))
+        with span("postprocess"):
+            for path in chunk:
+                columns = _columns(model, path)
+                out.append(columns if columnar else box_drafts(columns))
+        if on_progress is not None:
+            on_progress(len(out), len(image_paths))
+    return out
+
+
+def run(req: Any) -> Dict[str, Any]:
+    """Detection, micro-batched with concurrent calls like `detect.run`."""
+    model = _model(req.model_path)
+    _check(model, req.image_path)
+    columnar = bool(getattr(req, "columnar", False))
+    key = "columns" if columnar else "detections"
+    shared = batcher(
+        f"synthetic:{req.model_path}:{key}",
+        lambda paths: predict_many(req.model_path, paths, columnar, batch_size=len(paths)),
+    )
+    if shared is not None:
+        return {key: shared.submit(req.image_path)}
+    return {key: predict_many(req.model_path, [req.image_path], columnar)[0]}
+
+
+def run_batch(req: Any) -> Dict[str, Any]:
+    """Same contract as `detect.run_batch`: one entry per path, bad ones flagged."""
+    model = _model(req.model_path)
+    columnar = bool(getattr(req, "columnar", False))
+
+    def predict(chunk: List[str]) -> List[Any]:
+        for path in chunk:
+            _check(model, path)
+        return predict_many(req.model_path, chunk, columnar, batch_size=len(chunk))
+
+    return batch_results(
+        list(getattr(req, "image_paths", None) or []),
+        predict,
+        int(getattr(req, "batch_size", None) or 8),
+        columnar,
+        getattr(req, "on_progress", None),
+    )
+
+
+def run_segment(req: Any) -> Dict[str, Any]:
+    """`{"masks": [...]}`: one polygon per prompt (`masks` of them without prompts)."""
+    model = _model(req.model_path)
+    _check(model, req.image_path)
+    prompts = (
+        (1 if (getattr(req, "points", None) or getattr(req, "box_xyxy", None)) else 0)
+        + len(getattr(req, "boxes", None) or [])
+        + len(getattr(req, "point_groups", None) or [])
+    )
+    count = prompts or model.params["masks"]
+    with span("predict"):
+        model.compute(1)
+    rng = model.rng(req.image_path)
+    vertices = max(3, model.params["vertices"])
+    masks: List[Dict[str, Any]] = []
+    with span("postprocess"):
+        for index in range(count):
+            cx, cy, r = rng.uniform(100, 1100), rng.uniform(100, 600), rng.uniform(10, 90)
+            step = 2 * math.pi / vertices
+            poly = [
+                {"x": cx + r * math.cos(i * step), "y": cy + r * math.sin(i * step)}
+                for i in range(vertices)
+            ]
+            item = draft("object", "polygon", poly, 1.0)
+            if prompts:
+                item["promptIndex"] = index
+            masks.append(item)
+    return {"masks": masks}
+
+
+def run_caption(req: Any) -> Dict[str, Any]:
+    model = _model(req.model_path)
+    _check(model, req.image_path)
+    with span("predict"):
+        model.compute(1)
+    rng = model.rng(req.image_path)
+    words: List[str] = []
+    while sum(len(w) + 1 for w in words) < model.params["text_chars"]:
+        words.append(rng.choice(_WORDS))
+    return {"text": " ".join(words)[: model.params["text_chars"]]}
+
+
+def run_ocr(req: Any) -> Dict[str, Any]:
+    model = _model(req.model_path)
+    _check(model, req.image_path)
+    with span("predict"):
+        model.compute(1)
+    rng = model.rng(req.image_path)
+    lines: List[Dict[str, Any]] = []
+    for index in range(model.params["lines"]):
+        x, y = rng.uniform(0, 900), 40.0 * index + 10
+        coords = [
+            {"x": x, "y": y},
+            {"x": x + 300, "y": y},
+            {"x": x + 300, "y": y + 30},
+            {"x": x, "y": y + 30},
+        ]
+        text = " ".join(rng.choice(_WORDS) for _ in range(4))
+        lines.append({"text": text, "confidence": rng.uniform(0.5, 1.0), "coordinates": coords})
+    return {"lines": lines}
+
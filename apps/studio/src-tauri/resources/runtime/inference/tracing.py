@@ -0,0 +1,162 @@
+"""Per-request stage timings for the inference routes.
+
+`routers/inference._dispatch` opens a `Trace` for each request while
+VAILABEL_RT_TRACE is set. Anything it calls can wrap a stage in
+`with span("predict"):`: the model cache, image decode, the adapters. The
+time lands in that request's trace even across the threadpool hop, because
+the trace travels in a context variable. Repeated stages add up, e.g. one
+`predict` per chunk. Each trace is returned as a `Server-Timing` header and
+folded into per-route / per-family summaries that `/metrics` serves as
+Prometheus text.
+
+With tracing off, `span` costs one context-variable read and returns a
+shared no-op, so instrumented code pays well under a microsecond per stage.
+
+Stages: `load` (model load or wait, cache misses only), `decode` (image
+decode, image-cache misses only), `preprocess`, `predict`, `postprocess`,
+`batched` (time in a shared micro-batch, which runs on another thread and so
+isn't broken down), `threadpool` (waiting for a worker), `encode` (JSON or
+packed response) and `total`.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Deque, Dict, List, Optional, Tuple
+
+# Most recent samples kept per (route, family, stage) for quantiles.
+DEFAULT_WINDOW = 1024
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+_CURRENT: "ContextVar[Optional[Trace]]" = ContextVar("vailabel_trace", default=None)
+
+
+def enabled() -> bool:
+    return os.environ.get("VAILABEL_RT_TRACE", "").strip().lower() not in ("", "0", "false", "no")
+
+
+class Trace:
+    """Seconds spent per stage by one request, in first-seen order."""
+
+    __slots__ = ("stages", "_start")
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, float] = {}
+        self._start = time.perf_counter()
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._start
+
+    def server_timing(self) -> str:
+        return ", ".join(f"{stage};dur={secs * 1000:.2f}" for stage, secs in self.stages.items())
+
+
+class _Span:
+    __slots__ = ("trace", "stage", "start")
+
+    def __init__(self, trace: Trace, stage: str) -> None:
+        self.trace = trace
+        self.stage = stage
+
+    def __enter__(self) -> "_Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.trace.add(self.stage, time.perf_counter() - self.start)
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoSpan":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(stage: str):
+    """Context manager timing `stage` into the current trace (no-op without one)."""
+    trace = _CURRENT.get()
+    return _NO_SPAN if trace is None else _Span(trace, stage)
+
+
+def begin() -> Optional[Trace]:
+    """Start a trace for the current request, or None while tracing is off."""
+    if not enabled():
+        return None
+    trace = Trace()
+    _CURRENT.set(trace)
+    return trace
+
+
+class Summaries:
+    """Sliding-window latency summaries keyed by (route, family, stage)."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW) -> None:
+        self.window = max(1, window)
+        self._samples: Dict[Tuple[str, str, str], Deque[float]] = {}
+        self._totals: Dict[Tuple[str, str, str], List[float]] = {}  # [sum, count]
+        self._lock = threading.Lock()
+
+    def record(self, route: str, family: str, trace: Trace) -> None:
+        with self._lock:
+            for stage, seconds in trace.stages.items():
+                key = (route, family, stage)
+                samples = self._samples.get(key)
+                if samples is None:
+                    samples = self._samples[key] = deque(maxlen=self.window)
+                    self._totals[key] = [0.0, 0]
+                samples.append(seconds)
+                totals = self._totals[key]
+                totals[0] += seconds
+                totals[1] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._totals.clear()
+
+    def render(self) -> str:
+        """Prometheus text exposition of every summary."""
+        with self._lock:
+            rows = [
+                (key, sorted(samples), *self._totals[key])
+                for key, samples in sorted(self._samples.items())
+            ]
+        lines = [
+            "# HELP vailabel_stage_seconds Time spent per request stage.",
+            "# TYPE vailabel_stage_seconds summary",
+        ]
+        for (route, family, stage), ordered, total, count in rows:
+            labels = f'route="{_escape(route)}",family="{_escape(family)}",stage="{stage}"'
+            for q in QUANTILES:
+                value = ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+                lines.append(f'vailabel_stage_seconds{{{labels},quantile="{q}"}} {value:.6f}')
+            lines.append(f"vailabel_stage_seconds_sum{{{labels}}} {total:.6f}")
+            lines.append(f"vailabel_stage_seconds_count{{{labels}}} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _window() -> int:
+    try:
+        return int(os.environ.get("VAILABEL_RT_TRACE_WINDOW", DEFAULT_WINDOW))
+    except ValueError:
+        return DEFAULT_WINDOW
+
+
+SUMMARIES = Summaries(_window())
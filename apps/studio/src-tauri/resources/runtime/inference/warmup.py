@@ -0,0 +1,37 @@
+"""Model prewarm, pinning and unloading over the process-wide `CACHE`.
+
+Each adapter exposes `warmup(model_path, family, pin)`: load through its usual
+cache key, run one cheap dummy forward pass (so lazy CUDA/kernel init happens
+now, not on the user's first click) and return the key. `warm` dispatches by
+family and has the load pin the entry (`ModelCache.get_or_load(pin=True)`), so
+neither a concurrent load nor one-off requests for other models can evict it.
+"""
+
+import time
+from typing import Any, Dict, List, Optional
+
+from inference.adapters import adapter
+from inference.loader import CACHE, infer_family
+
+
+def warm(model_path: str, family: Optional[str] = None, pin: bool = True) -> Dict[str, Any]:
+    """Load + dummy-run one model; returns `{key, family, pinned, seconds}`."""
+    fam = infer_family(model_path, family)
+    fn = adapter("warmup", fam)
+    start = time.perf_counter()
+    key = fn(model_path, fam, pin)
+    return {
+        "key": key,
+        "family": fam,
+        "pinned": pin,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def unload(key: Optional[str] = None, model_path: Optional[str] = None) -> List[str]:
+    """Drop a cache entry by exact key, or every entry loaded from `model_path`."""
+    if key:
+        return [key] if CACHE.unload(key) else []
+    if not model_path:
+        return []
+    return CACHE.unload_path(model_path)
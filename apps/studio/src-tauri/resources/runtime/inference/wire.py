@@ -0,0 +1,173 @@
+"""Packed binary encoding of inference responses (`application/x-vailabel-drafts`).
+
+JSON responses repeat every key per draft and spell each vertex as an
+`{"x": …, "y": …}` object, so for dozens of 150-vertex polygons encoding and
+parsing cost more than the model. Clients that send
+`Accept: application/x-vailabel-drafts` get the same response packed as:
+
+    b"VLD1" | uint32 LE header length | header (UTF-8 JSON) | float32 LE vertices
+
+Every list of dicts carrying `coordinates` (drafts, OCR lines — also nested,
+e.g. batch `results[i].detections`) becomes a *table* in the header and a
+`{"$table": i}` placeholder in the body. A table stores per-row vertex counts,
+its start in the vertex buffer, and one column per remaining key; a column
+whose rows all agree (`type`, `labelColor`, `isAiGenerated`, …) collapses to
+`{"=": value}`. All vertices of all tables share one flat `x0, y0, x1, y1, …`
+buffer. Keys missing from some rows are listed under the table's `absent`.
+
+Pure Python (stdlib `array`/`struct`/`json`) so every adapter can use it;
+`decode` restores the JSON shape (coordinates round-trip at float32 precision).
+"""
+
+import json
+import struct
+import sys
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+MEDIA_TYPE = "application/x-vailabel-drafts"
+MAGIC = b"VLD1"
+VERSION = 1
+
+_LEN = struct.Struct("<I")
+_SWAP = sys.byteorder != "little"
+
+
+def accepts_packed(accept: Optional[str]) -> bool:
+    """True when an `Accept` header lists the packed media type (q > 0)."""
+    if not accept:
+        return False
+    for part in accept.split(","):
+        fields = [f.strip() for f in part.split(";")]
+        if fields[0].lower() != MEDIA_TYPE:
+            continue
+        for param in fields[1:]:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+def _is_table(value: Any) -> bool:
+    return (
+        isinstance(value, list)
+        and bool(value)
+        and all(isinstance(row, dict) and isinstance(row.get("coordinates"), list) for row in value)
+    )
+
+
+class _Encoder:
+    def __init__(self) -> None:
+        self.tables: List[Dict[str, Any]] = []
+        self.coords = array("f")
+
+    def walk(self, value: Any) -> Any:
+        if _is_table(value):
+            self.tables.append(self.table(value))
+            return {"$table": len(self.tables) - 1}
+        if isinstance(value, dict):
+            return {k: self.walk(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self.walk(v) for v in value]
+        return value
+
+    def table(self, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        start = len(self.coords) // 2
+        counts: List[int] = []
+        flat: List[float] = []
+        for row in rows:
+            pts = row["coordinates"]
+            counts.append(len(pts))
+            for pt in pts:
+                flat.append(pt["x"])
+                flat.append(pt["y"])
+        self.coords.extend(flat)
+
+        keys: List[str] = []
+        for row in rows:
+            for key in row:
+                if key != "coordinates" and key not in keys:
+                    keys.append(key)
+        columns: Dict[str, Any] = {}
+        absent: Dict[str, List[int]] = {}
+        for key in keys:
+            values = [row.get(key) for row in rows]
+            missing = [i for i, row in enumerate(rows) if key not in row]
+            if missing:
+                absent[key] = missing
+            first = values[0]
+            if all(v == first and type(v) is type(first) for v in values):
+                columns[key] = {"=": first}
+            else:
+                columns[key] = [self.walk(v) for v in values]
+        out: Dict[str, Any] = {"rows": len(rows), "start": start, "vertices": counts}
+        out["columns"] = columns
+        if absent:
+            out["absent"] = absent
+        return out
+
+
+def encode(payload: Any) -> bytes:
+    """Pack a JSON-shaped response; see the module docstring for the layout."""
+    enc = _Encoder()
+    body = enc.walk(payload)
+    header = json.dumps(
+        {"version": VERSION, "body": body, "tables": enc.tables}, separators=(",", ":")
+    ).encode("utf-8")
+    coords = enc.coords
+    if _SWAP:
+        coords = array("f", coords)
+        coords.byteswap()
+    return b"".join((MAGIC, _LEN.pack(len(header)), header, coords.tobytes()))
+
+
+def _split(blob: bytes) -> Tuple[Dict[str, Any], array]:
+    if blob[:4] != MAGIC:
+        raise ValueError("not a packed drafts payload (bad magic)")
+    (size,) = _LEN.unpack_from(blob, 4)
+    header = json.loads(blob[8 : 8 + size].decode("utf-8"))
+    if header.get("version") != VERSION:
+        raise ValueError(f"unsupported packed drafts version: {header.get('version')}")
+    coords = array("f")
+    coords.frombytes(blob[8 + size :])
+    if _SWAP:
+        coords.byteswap()
+    return header, coords
+
+
+def decode(blob: bytes) -> Any:
+    """Inverse of `encode`: the JSON-shaped response, vertices as float32 values."""
+    header, coords = _split(blob)
+    tables = header["tables"]
+
+    def restore(value: Any) -> Any:
+        if isinstance(value, dict):
+            if len(value) == 1 and "$table" in value:
+                return rows(tables[value["$table"]])
+            return {k: restore(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [restore(v) for v in value]
+        return value
+
+    def rows(table: Dict[str, Any]) -> List[Dict[str, Any]]:
+        absent = {k: set(v) for k, v in table.get("absent", {}).items()}
+        out: List[Dict[str, Any]] = []
+        cursor = table["start"] * 2
+        for i, count in enumerate(table["vertices"]):
+            row: Dict[str, Any] = {}
+            for key, column in table["columns"].items():
+                if i in absent.get(key, ()):
+                    continue
+                row[key] = column["="] if isinstance(column, dict) else restore(column[i])
+            end = cursor + 2 * count
+            pts = coords[cursor:end]
+            row["coordinates"] = [{"x": pts[j], "y": pts[j + 1]} for j in range(0, len(pts), 2)]
+            cursor = end
+            out.append(row)
+        return out
+
+    return restore(header["body"])
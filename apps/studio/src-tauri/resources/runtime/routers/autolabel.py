@@ -0,0 +1,46 @@
+"""Auto-label endpoints. Jobs run in the `job_manager` table next to training,
+so status and logs poll through `/training/jobs?kind=autolabel` and `/training/logs`."""
+
+from typing import Dict, Optional
+
+from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+
+from services import job_manager
+
+router = APIRouter(prefix="/autolabel")
+
+
+class AutoLabelStartReq(BaseModel):
+    job_id: str
+    project_id: str = ""
+    # "detect" | "segment" | "ocr"
+    task: str = "detect"
+    model_path: str
+    family: Optional[str] = None
+    # A dataset directory (walked recursively) or a manifest file.
+    source: str
+    # NDJSON results; `<output_path>.cursor` holds the resume checkpoint.
+    output_path: str
+    # conf / iou / prompt / batch_size / resume (default true).
+    config: Dict = {}
+    log_path: str = ""
+    # Queue order: higher runs first, FIFO within a priority.
+    priority: int = 0
+
+
+class JobIdReq(BaseModel):
+    job_id: str
+
+
+@router.post("/start")
+async def start(req: AutoLabelStartReq):
+    job = await run_in_threadpool(job_manager.start_autolabel_job, req.model_dump())
+    return {"job_id": req.job_id, "status": job["status"], "queue_position": job["queue_position"]}
+
+
+@router.post("/stop")
+async def stop(req: JobIdReq):
+    job_manager.stop_job(req.job_id)
+    return {"ok": True}
@@ -0,0 +1,78 @@
+"""Server-sent events for job progress, so clients stop polling `/training/jobs`.
+
+`GET /events` (optionally `?job_id=a&job_id=b` to follow only those jobs)
+streams:
+
+- `event: snapshot`, first and after any resync: the current rows of the
+  followed jobs, or of every queued/running job when unfiltered;
+- `data: [delta, …]`: what changed since the last batch, one merged
+  `{"job_id", <changed fields>…}` per job (status, progress, metrics,
+  error, result, queue_position). Updates are coalesced over
+  VAILABEL_RT_EVENTS_INTERVAL_S (default 0.25 s), so an auto-label job
+  reporting every chunk costs the client a few messages per second at most.
+
+Batch inferences sent with a `request_id` report here too (`kind:
+"inference"`). A client too slow to keep up gets a fresh snapshot instead of
+an ever-growing backlog.
+"""
+
+import asyncio
+import json
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+from inference.loader import env_number
+from services import job_manager
+from services.events import BROKER, JOBS_TOPIC
+
+router = APIRouter()
+
+
+def _snapshot(job_ids: Optional[List[str]]) -> List[Dict]:
+    if job_ids:
+        return [job for job in map(job_manager.get_job, job_ids) if job is not None]
+    return job_manager.list_jobs(status="running") + job_manager.list_jobs(status="queued")
+
+
+def _sse(data, event: Optional[str] = None) -> str:
+    head = f"event: {event}\n" if event else ""
+    return f"{head}data: {json.dumps(data, default=str)}\n\n"
+
+
+async def _job_events(job_ids: Optional[List[str]]):
+    interval = max(0.0, env_number("VAILABEL_RT_EVENTS_INTERVAL_S", 0.25))
+    keepalive = env_number("VAILABEL_RT_SSE_KEEPALIVE_S", 15)
+    wanted = set(job_ids or ())
+    with BROKER.subscribe(JOBS_TOPIC, maxsize=4096) as sub:
+        yield _sse(await run_in_threadpool(_snapshot, job_ids), "snapshot")
+        while True:
+            first = await sub.get(keepalive)
+            if first is None:
+                yield ": keepalive\n\n"
+                continue
+            # Let a burst accumulate, then merge it into one delta per job.
+            await asyncio.sleep(interval)
+            if sub.dropped:
+                sub.dropped = 0
+                sub.drain()
+                yield _sse(await run_in_threadpool(_snapshot, job_ids), "snapshot")
+                continue
+            merged: Dict[str, Dict] = {}
+            for delta in [first] + sub.drain():
+                if wanted and delta["job_id"] not in wanted:
+                    continue
+                merged.setdefault(delta["job_id"], {}).update(delta)
+            if merged:
+                yield _sse(list(merged.values()))
+
+
+@router.get("/events")
+async def events(job_id: Optional[List[str]] = Query(None)):
+    return StreamingResponse(
+        _job_events(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
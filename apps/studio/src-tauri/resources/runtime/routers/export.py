@@ -1,18 +1,27 @@
-"""Model export endpoints (ONNX / TensorRT / OpenVINO).
+"""Model export endpoints (ONNX / TensorRT / OpenVINO, plus INT8 quantization).
 
-Each returns an `ExportResult { ok, output_path, error }`. Exporters never raise:
-a missing toolchain reports `ok: false` (HTTP 200) so the caller can show a
-friendly message instead of a hard failure. The blocking export runs in a
-threadpool so the event loop stays free.
+`/export/start` runs an export as a job in the `job_manager` table (kind
+"export"): poll `/export/jobs` (or `/training/jobs?kind=export`), read its log through
+`/training/logs`, cancel with `/export/stop`. A finished job carries its
+`result`. Exports are cached by (weights hash, format, opts), so repeating one
+returns the existing artifact at once: the start response is already
+`completed` and carries the `result`.
+
+The per-format routes below are the original blocking calls, kept for older
+clients; they share the same cache. Each returns an `ExportResult { ok,
+output_path, error }` (`/export/int8` adds a `report` with the FP32-vs-INT8 mAP
+and latency comparison). Exporters never raise: a missing toolchain reports
+`ok: false` (HTTP 200) so the caller can show a friendly message instead of a
+hard failure.
 """
 
-from typing import Dict
+from typing import Dict, Optional
 
 from fastapi import APIRouter
 from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
-from export import onnx, openvino, tensorrt
+from services import exports, job_manager
 
 router = APIRouter(prefix="/export")
 
@@ -24,16 +33,83 @@ class ExportReq(BaseModel):
     opts: Dict = {}
 
 
+class QuantizeReq(BaseModel):
+    model_path: str
+    # "onnx" (onnxruntime static QDQ) or "openvino" (NNCF).
+    format: str = "onnx"
+    output_path: str = ""
+    # Ultralytics data YAML (same as training's `dataset_path`): calibration
+    # images come from its train split, the accuracy check from its val split.
+    dataset_path: str
+    # calib_size (300), seed, imgsz, evaluate (true), max_map_drop (mAP50-95).
+    opts: Dict = {}
+
+
+class ExportStartReq(BaseModel):
+    job_id: str
+    model_path: str
+    # onnx | tensorrt | openvino | onnx-int8 | openvino-int8
+    format: str
+    output_path: str = ""
+    # Calibration / validation data YAML, for the -int8 formats only.
+    dataset_path: str = ""
+    opts: Dict = {}
+    log_path: str = ""
+    # Queue order: higher runs first, FIFO within a priority.
+    priority: int = 0
+
+
+class JobIdReq(BaseModel):
+    job_id: str
+
+
+def _blocking(spec: Dict) -> Dict:
+    """One export on the calling thread, through the shared results cache."""
+    try:
+        result = exports.run(spec, lambda p, m=None: None, lambda line: None, lambda: False)
+    except Exception as exc:  # noqa: BLE001 — keep the never-raise contract
+        return {"ok": False, "output_path": spec.get("output_path", ""), "error": str(exc)}
+    result.pop("cached", None)
+    return result
+
+
+@router.post("/start")
+async def start(req: ExportStartReq):
+    return await run_in_threadpool(job_manager.start_export_job, req.model_dump())
+
+
+@router.post("/stop")
+async def stop(req: JobIdReq):
+    job_manager.stop_job(req.job_id)
+    return {"ok": True}
+
+
+@router.get("/jobs")
+async def jobs(
+    project_id: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+):
+    return job_manager.list_jobs("export", project_id, status, limit, offset)
+
+
 @router.post("/onnx")
 async def export_onnx(req: ExportReq):
-    return await run_in_threadpool(onnx.run, req)
+    return await run_in_threadpool(_blocking, dict(req.model_dump(), format="onnx"))
 
 
 @router.post("/tensorrt")
 async def export_tensorrt(req: ExportReq):
-    return await run_in_threadpool(tensorrt.run, req)
+    return await run_in_threadpool(_blocking, dict(req.model_dump(), format="tensorrt"))
 
 
 @router.post("/openvino")
 async def export_openvino(req: ExportReq):
-    return await run_in_threadpool(openvino.run, req)
+    return await run_in_threadpool(_blocking, dict(req.model_dump(), format="openvino"))
+
+
+@router.post("/int8")
+async def export_int8(req: QuantizeReq):
+    spec = dict(req.model_dump(), format=f"{req.format.lower()}-int8")
+    return await run_in_threadpool(_blocking, spec)
@@ -1,11 +1,13 @@
-"""Health, system and GPU introspection endpoints."""
+"""Health, system, GPU and metrics introspection endpoints."""
 
 import os
 import platform
 import time
 
 from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
 
+from inference import tracing
 from services import device
 
 router = APIRouter()
@@ -21,6 +23,16 @@ def _loaded_models() -> list:
         return []
 
 
+def _model_cache() -> dict:
+    """Size estimates + RAM/VRAM budget usage of the model cache (best-effort)."""
+    try:
+        from inference.loader import CACHE
+
+        return CACHE.stats()
+    except Exception:
+        return {}
+
+
 @router.get("/health")
 async def health(request: Request):
     start = getattr(request.app.state, "start_time", time.time())
@@ -30,6 +42,7 @@ async def health(request: Request):
         "uptime_s": time.time() - start,
         "gpu_available": device.gpu_available(),
         "loaded_models": _loaded_models(),
+        "model_cache": _model_cache(),
     }
 
 
@@ -46,3 +59,12 @@ async def system():
 @router.get("/gpu")
 async def gpu():
     return device.gpu_info()
+
+
+@router.get("/metrics")
+async def metrics():
+    """Per-route / per-family stage latency summaries (Prometheus text format).
+
+    Empty unless VAILABEL_RT_TRACE is set (see `inference/tracing.py`).
+    """
+    return PlainTextResponse(tracing.SUMMARIES.render(), media_type="text/plain; version=0.0.4")
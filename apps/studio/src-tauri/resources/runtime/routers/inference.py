@@ -4,20 +4,37 @@ Each endpoint resolves the model family (explicit hint, else from `model_path`)
 and dispatches to a per-family adapter under `inference/`. The blocking torch
 work runs in a threadpool so the event loop stays free. A missing family
 dependency surfaces as HTTP 501 with a `pip install` hint; other failures as 500.
+
+Every route negotiates its encoding: `Accept: application/x-vailabel-drafts`
+returns the response packed by `inference/wire.py` (columnar header + float32
+vertex buffer) instead of JSON.
+
+With VAILABEL_RT_TRACE set, each response carries a `Server-Timing` header
+with its stage timings (model load, decode, predict, post-processing,
+encoding…; see `inference/tracing.py`), and `/metrics` aggregates them per
+route and family.
 """
 
-from typing import Any, Callable, List, Optional
+from types import SimpleNamespace
+from typing import Any, Callable, List, Literal, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Response
 from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
-from inference import detect, florence, paddle, qwen, segment
+from inference import tracing, wire
+from inference.adapters import adapter
 from inference.loader import RuntimeDependencyError, infer_family
+from services.events import BROKER, JOBS_TOPIC
 
 router = APIRouter(prefix="/inference")
 ocr_router = APIRouter()
 
+# OpenVINO IR only (`inference/openvino_ir.HINTS`); anything else is a 422.
+PerfHint = Literal["latency", "throughput", "cumulative_throughput"]
+
 
 class DetectReq(BaseModel):
     model_path: str
@@ -28,6 +45,32 @@ class DetectReq(BaseModel):
     # the family is inferred from `model_path`.
     family: Optional[str] = None
     prompt: Optional[str] = None
+    # Parallel arrays (`{"columns": {xyxy, classId, confidence, labelName}}`)
+    # instead of a draft list; honored by the ultralytics detectors.
+    columnar: bool = False
+    # Sliced inference for very large images: `tile`-px windows overlapping by
+    # `tile_overlap` (fraction, default 0.2), merged with cross-tile NMS at
+    # `tile_iou` (default 0.5). Ultralytics detectors only.
+    tile: Optional[int] = None
+    tile_overlap: Optional[float] = None
+    tile_iou: Optional[float] = None
+    perf_hint: Optional[PerfHint] = None
+
+
+class BatchDetectReq(BaseModel):
+    model_path: str
+    image_paths: List[str]
+    conf: Optional[float] = None
+    iou: Optional[float] = None
+    family: Optional[str] = None
+    prompt: Optional[str] = None
+    # Images per forward pass; defaults to VAILABEL_RT_DETECT_BATCH (8).
+    batch_size: Optional[int] = None
+    columnar: bool = False
+    perf_hint: Optional[PerfHint] = None
+    # When set, per-chunk progress is pushed on `/events` under this id
+    # (`kind: "inference"`). ultralytics / ONNX / OpenVINO detectors only.
+    request_id: Optional[str] = None
 
 
 class SegmentReq(BaseModel):
@@ -35,6 +78,10 @@ class SegmentReq(BaseModel):
     image_path: str
     points: List[List[float]] = []
     box_xyxy: Optional[List[float]] = None
+    # Many prompts, one mask each, from a single image embedding: one xyxy box
+    # per object, and/or one list of [x, y] foreground clicks per object.
+    boxes: List[List[float]] = []
+    point_groups: List[List[List[float]]] = []
     family: Optional[str] = None
 
 
@@ -51,10 +98,30 @@ class OcrReq(BaseModel):
     family: Optional[str] = None
 
 
-async def _dispatch(fn: Callable[[Any], Any], req: Any):
-    """Run an adapter off the event loop and normalize failures to HTTP errors."""
+async def _dispatch(
+    fn: Callable[[Any], Any], req: Any, accept: Optional[str] = None, route: str = ""
+):
+    """Run an adapter off the event loop and normalize failures to HTTP errors.
+
+    Packed responses are encoded in the same worker thread as the inference,
+    and so are JSON ones while tracing (so `encode` can be timed).
+    """
+    packed = wire.accepts_packed(accept)
+    trace = tracing.begin()
+
+    def call() -> Any:
+        if trace is not None:
+            trace.add("threadpool", trace.elapsed())
+        result = fn(req)
+        with tracing.span("encode"):
+            if packed:
+                return wire.encode(result)
+            if trace is not None:
+                return JSONResponse(content=jsonable_encoder(result))
+            return result
+
     try:
-        return await run_in_threadpool(fn, req)
+        result = await run_in_threadpool(call)
     except RuntimeDependencyError as exc:
         raise HTTPException(status_code=501, detail=str(exc))
     except FileNotFoundError as exc:
@@ -63,29 +130,66 @@ async def _dispatch(fn: Callable[[Any], Any], req: Any):
         raise
     except Exception as exc:  # noqa: BLE001
         raise HTTPException(status_code=500, detail=f"inference failed: {exc}")
+    if packed:
+        result = Response(content=result, media_type=wire.MEDIA_TYPE)
+    if trace is not None:
+        trace.add("total", trace.elapsed())
+        result.headers["Server-Timing"] = trace.server_timing()
+        family = infer_family(req.model_path, getattr(req, "family", None))
+        tracing.SUMMARIES.record(route, family, trace)
+    return result
+
+
+def _with_progress(req: BatchDetectReq) -> Any:
+    """`req`, plus an `on_progress` that reports on `/events` when it has an id."""
+    if not req.request_id:
+        return req
+
+    def report(done: int, total: int) -> None:
+        BROKER.publish(
+            JOBS_TOPIC,
+            {
+                "job_id": req.request_id,
+                "kind": "inference",
+                "status": "running" if done < total else "completed",
+                "progress": done / total if total else 1.0,
+                "metrics": {"processed": done, "total": total},
+            },
+        )
+
+    return SimpleNamespace(**req.model_dump(), on_progress=report)
 
 
 @router.post("/object-detection")
-async def object_detection(req: DetectReq):
+async def object_detection(req: DetectReq, accept: Optional[str] = Header(None)):
+    family = infer_family(req.model_path, req.family)
+    fn = adapter("detect", family)
+    return await _dispatch(fn, req, accept, "/inference/object-detection")
+
+
+@router.post("/object-detection/batch")
+async def object_detection_batch(req: BatchDetectReq, accept: Optional[str] = Header(None)):
     family = infer_family(req.model_path, req.family)
-    fn = florence.run_detect if family == "florence2" else detect.run
-    return await _dispatch(fn, req)
+    fn = adapter("detect_batch", family)
+    return await _dispatch(fn, _with_progress(req), accept, "/inference/object-detection/batch")
 
 
 @router.post("/segmentation")
-async def segmentation(req: SegmentReq):
-    return await _dispatch(segment.run, req)
+async def segmentation(req: SegmentReq, accept: Optional[str] = Header(None)):
+    family = infer_family(req.model_path, req.family)
+    fn = adapter("segment", family)
+    return await _dispatch(fn, req, accept, "/inference/segmentation")
 
 
 @router.post("/caption")
-async def caption(req: CaptionReq):
+async def caption(req: CaptionReq, accept: Optional[str] = Header(None)):
     family = infer_family(req.model_path, req.family)
-    fn = qwen.run_caption if family == "qwen" else florence.run_caption
-    return await _dispatch(fn, req)
+    fn = adapter("caption", family)
+    return await _dispatch(fn, req, accept, "/inference/caption")
 
 
 @ocr_router.post("/ocr")
-async def ocr(req: OcrReq):
+async def ocr(req: OcrReq, accept: Optional[str] = Header(None)):
     family = infer_family(req.model_path, req.family)
-    fn = florence.run_ocr if family == "florence2" else paddle.run
-    return await _dispatch(fn, req)
+    fn = adapter("ocr", family)
+    return await _dispatch(fn, req, accept, "/ocr")
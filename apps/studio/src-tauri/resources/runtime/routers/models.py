@@ -0,0 +1,56 @@
+"""Model residency endpoints: prewarm + pin, unload, and cache introspection.
+
+`/models/warmup` loads a model and runs one dummy forward pass so the first
+real request doesn't pay the import + weight-load cost; pinned models are
+exempt from LRU eviction. Errors map like the inference router: a missing
+family dependency is HTTP 501, a missing file 400, an unknown family 422.
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+
+from inference import warmup
+from inference.loader import CACHE, RuntimeDependencyError
+
+router = APIRouter(prefix="/models")
+
+
+class WarmupReq(BaseModel):
+    model_path: str
+    family: Optional[str] = None
+    pin: bool = True
+
+
+class UnloadReq(BaseModel):
+    # Either an exact cache key (as listed by /models or /health) or a model
+    # path, which unloads every entry loaded from it.
+    key: Optional[str] = None
+    model_path: Optional[str] = None
+
+
+@router.get("")
+async def models():
+    return CACHE.stats()
+
+
+@router.post("/warmup")
+async def warm(req: WarmupReq):
+    try:
+        return await run_in_threadpool(warmup.warm, req.model_path, req.family, req.pin)
+    except RuntimeDependencyError as exc:
+        raise HTTPException(status_code=501, detail=str(exc))
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    except Exception as exc:  # noqa: BLE001
+        raise HTTPException(status_code=500, detail=f"warmup failed: {exc}")
+
+
+@router.post("/unload")
+async def unload(req: UnloadReq):
+    removed = await run_in_threadpool(warmup.unload, req.key, req.model_path)
+    return {"ok": bool(removed), "unloaded": removed}
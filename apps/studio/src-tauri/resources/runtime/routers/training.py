@@ -1,11 +1,27 @@
-"""Training endpoints. Jobs run in background threads managed by `job_manager`."""
+"""Training endpoints. Jobs run in background threads managed by `job_manager`.
 
-from typing import Dict
+Logs can be polled (`/training/logs`, byte offsets, `eof` once the job is done
+and fully read) or streamed: `/training/logs/stream` is a server-sent-events
+feed of the same chunks, `data: {"lines", "next_offset"}` per batch of new
+lines and a final `event: eof`.
+
+`/training/jobs` lists training jobs only, which is what the Rust client's
+`TrainingJobStatus` expects; `?kind=autolabel` or `?kind=export` select those
+jobs instead and `?kind=all` lists every kind.
+"""
+
+import asyncio
+import json
+from typing import Dict, Optional
 
 from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from services import job_manager
+from inference.loader import env_number
+from services import job_logs, job_manager
+from services.events import BROKER
 
 router = APIRouter(prefix="/training")
 
@@ -17,6 +33,8 @@ class TrainStartReq(BaseModel):
     dataset_path: str
     config: Dict = {}
     log_path: str = ""
+    # Queue order: higher runs first, FIFO within a priority.
+    priority: int = 0
 
 
 class JobIdReq(BaseModel):
@@ -25,8 +43,8 @@ class JobIdReq(BaseModel):
 
 @router.post("/start")
 async def start(req: TrainStartReq):
-    job_manager.start_job(req.model_dump())
-    return {"job_id": req.job_id, "status": "running"}
+    job = await run_in_threadpool(job_manager.start_job, req.model_dump())
+    return {"job_id": req.job_id, "status": job["status"], "queue_position": job["queue_position"]}
 
 
 @router.post("/stop")
@@ -36,10 +54,53 @@ async def stop(req: JobIdReq):
 
 
 @router.get("/jobs")
-async def jobs():
-    return job_manager.list_jobs()
+async def jobs(
+    kind: str = "training",
+    project_id: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+):
+    kind = None if kind == "all" else kind
+    return job_manager.list_jobs(kind, project_id, status, limit, offset)
 
 
 @router.get("/logs")
-async def logs(job_id: str, offset: int = 0):
-    return job_manager.read_logs(job_id, offset)
+async def logs(job_id: str, offset: int = 0, max_bytes: int = job_logs.DEFAULT_MAX_BYTES):
+    return await run_in_threadpool(job_manager.read_logs, job_id, offset, max_bytes)
+
+
+async def _log_events(job_id: str, offset: int, topic):
+    # Appends only wake the loop; lines always come from `read_logs`, so a
+    # slow client that missed wake-ups still gets every line exactly once.
+    keepalive = env_number("VAILABEL_RT_SSE_KEEPALIVE_S", 15)
+    sub = BROKER.subscribe(topic, maxsize=1) if topic else None
+    try:
+        while True:
+            chunk = await run_in_threadpool(job_manager.read_logs, job_id, offset)
+            if chunk["lines"]:
+                offset = chunk["next_offset"]
+                data = {"lines": chunk["lines"], "next_offset": offset}
+                yield f"data: {json.dumps(data)}\n\n"
+                continue
+            if chunk["eof"]:
+                yield f"event: eof\ndata: {json.dumps({'next_offset': offset})}\n\n"
+                return
+            if sub is None:  # no log file: only the job's end is left to see
+                await asyncio.sleep(1.0)
+            elif await sub.get(keepalive) is None:
+                # Also re-checks for jobs that finish without writing a line.
+                yield ": keepalive\n\n"
+    finally:
+        if sub:
+            sub.close()
+
+
+@router.get("/logs/stream")
+async def stream_logs(job_id: str, offset: int = 0):
+    topic = await run_in_threadpool(job_manager.log_topic, job_id)
+    return StreamingResponse(
+        _log_events(job_id, offset, topic),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
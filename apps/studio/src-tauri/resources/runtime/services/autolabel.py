@@ -0,0 +1,210 @@
+"""Streaming auto-label over a whole dataset directory or manifest.
+
+`job_manager` calls `run(...)` with the same callbacks it hands the trainers
+(progress, log, cancel), so this module never imports the job table. Every
+image is pushed through the matching `inference/` adapter and its drafts are
+appended to `output_path` as one NDJSON line:
+
+    {"image_path": "...", "detections": [InferenceAnnotationDraft, ...]}
+
+(`masks` for segment, `lines` for ocr; `error` when that image failed.)
+
+Memory stays bounded: images are walked lazily in a deterministic order and
+results are written as they come. After each chunk a cursor sidecar
+(`<output_path>.cursor`) records how many images are done and how many bytes
+of output are valid, so a restarted job truncates any half-written tail and
+picks up exactly where it stopped. The cursor also records the source, task,
+model and thresholds; a run with any of them changed starts over.
+
+An image that can't be decoded gets an `error` record instead of failing the
+job, so a resume never trips on the same chunk again.
+"""
+
+import json
+import os
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from inference.dataset import iter_images
+
+# Images per adapter call / checkpoint when `config.batch_size` isn't given.
+DEFAULT_CHUNK = 16
+
+_RESULT_KEYS = {"detect": "detections", "segment": "masks", "ocr": "lines"}
+
+
+def cursor_path(output_path: str) -> str:
+    return output_path + ".cursor"
+
+
+def run_key(
+    source: str, task: str, family: str, model_path: str, config: Dict[str, Any]
+) -> Dict[str, Any]:
+    """What a cursor is only valid for: a resume must match all of it."""
+    return {
+        "source": source,
+        "task": task,
+        "family": family,
+        "model_path": model_path,
+        "conf": config.get("conf"),
+        "iou": config.get("iou"),
+        "prompt": config.get("prompt"),
+    }
+
+
+def load_cursor(output_path: str, key: Dict[str, Any]) -> Tuple[int, int]:
+    """(images done, valid output bytes) from a previous run of `key`, else (0, 0)."""
+    try:
+        with open(cursor_path(output_path), "r", encoding="utf-8") as fh:
+            cur = json.load(fh)
+    except (OSError, ValueError):
+        return 0, 0
+    if cur.get("run") != key:
+        return 0, 0
+    return int(cur.get("index", 0)), int(cur.get("bytes", 0))
+
+
+def _save_cursor(output_path: str, key: Dict[str, Any], index: int, size: int) -> None:
+    path = cursor_path(output_path)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump({"run": key, "index": index, "bytes": size}, fh)
+    os.replace(tmp, path)
+
+
+def _label_chunk(
+    task: str,
+    family: str,
+    model_path: str,
+    paths: List[str],
+    config: Dict[str, Any],
+) -> List[Dict[str, Any]]:
+    """One NDJSON record per path, in order.
+
+    A failing image becomes a record with `error` (the batch detect adapters
+    isolate bad images themselves). Only a missing dependency fails the chunk,
+    since no other image could succeed either.
+    """
+    from inference.adapters import adapter
+    from inference.loader import RuntimeDependencyError
+
+    key = _RESULT_KEYS[task]
+    if task == "detect":
+        req = SimpleNamespace(
+            model_path=model_path,
+            image_paths=paths,
+            family=family,
+            conf=config.get("conf"),
+            iou=config.get("iou"),
+            prompt=config.get("prompt"),
+            batch_size=len(paths),
+        )
+        return adapter("detect_batch", family)(req)["results"]
+
+    fn = adapter(task, family)
+    records: List[Dict[str, Any]] = []
+    for path in paths:
+        req = SimpleNamespace(
+            model_path=model_path,
+            image_path=path,
+            family=family,
+            conf=config.get("conf"),
+            iou=config.get("iou"),
+            prompt=config.get("prompt"),
+            points=[],
+            box_xyxy=None,
+        )
+        try:
+            records.append({"image_path": path, key: fn(req).get(key, [])})
+        except RuntimeDependencyError:
+            raise
+        except Exception as exc:  # noqa: BLE001
+            records.append({"image_path": path, key: [], "error": str(exc)})
+    return records
+
+
+def run(
+    spec: Dict[str, Any],
+    set_progress: Callable[[float, Dict[str, Any]], None],
+    append_log: Callable[[str], None],
+    is_canceled: Callable[[], bool],
+) -> None:
+    """Label every image under `spec["source"]` into `spec["output_path"]`."""
+    from inference.loader import infer_family
+
+    config = spec.get("config") or {}
+    task = (spec.get("task") or "detect").lower()
+    if task not in _RESULT_KEYS:
+        raise ValueError(f"unknown auto-label task '{task}' (expected detect, segment or ocr)")
+    source = spec["source"]
+    output_path = spec["output_path"]
+    model_path = spec.get("model_path") or ""
+    family = infer_family(model_path, spec.get("family"))
+    try:
+        chunk_size = max(1, int(config.get("batch_size", DEFAULT_CHUNK)))
+    except (TypeError, ValueError):
+        chunk_size = DEFAULT_CHUNK
+
+    total = sum(1 for _ in iter_images(source))
+    cursor_key = run_key(source, task, family, model_path, config)
+    done, valid_bytes = 0, 0
+    if config.get("resume") is not False:
+        done, valid_bytes = load_cursor(output_path, cursor_key)
+    done = min(done, total)
+
+    parent = os.path.dirname(output_path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    existing = os.path.getsize(output_path) if os.path.exists(output_path) else 0
+    if existing < valid_bytes:
+        # The output was removed or replaced since the checkpoint: start over.
+        done, valid_bytes = 0, 0
+    # Drop anything written after the last checkpoint (a torn line on crash).
+    with open(output_path, "ab") as fh:
+        fh.truncate(valid_bytes)
+    if done:
+        append_log(f"[runtime] resuming auto-label at image {done}/{total}")
+    append_log(
+        f"[runtime] auto-label {task} with {family} over {total} images -> {output_path}"
+    )
+
+    failed = 0
+
+    def report(size: int) -> None:
+        set_progress(
+            done / total if total else 1.0,
+            {"processed": done, "total": total, "failed": failed, "output_offset": size},
+        )
+
+    with open(output_path, "ab") as out:
+        pending: List[str] = []
+        images: Iterator[str] = iter_images(source)
+        for _ in range(done):
+            next(images, None)
+
+        def flush() -> None:
+            nonlocal done, failed
+            for record in _label_chunk(task, family, model_path, pending, config):
+                if record.get("error"):
+                    failed += 1
+                    append_log(f"[runtime] {record['image_path']}: {record['error']}")
+                out.write((json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8"))
+            out.flush()
+            done += len(pending)
+            pending.clear()
+            size = out.tell()
+            _save_cursor(output_path, cursor_key, done, size)
+            report(size)
+
+        report(out.tell())
+        for path in images:
+            if is_canceled():
+                break
+            pending.append(path)
+            if len(pending) >= chunk_size:
+                flush()
+        if pending and not is_canceled():
+            flush()
+
+    append_log(f"[runtime] auto-label processed {done}/{total} images ({failed} failed)")
+
@@ -42,7 +42,7 @@ def gpu_info() -> dict:
             props = t.cuda.get_device_properties(idx)
             used_mb = int(t.cuda.memory_allocated(idx) // (1024 * 1024))
             total_mb = int(props.total_memory // (1024 * 1024))
-            return {
+            info = {
                 "available": True,
                 "name": props.name,
                 "backend": "cuda",
@@ -50,6 +50,14 @@ def gpu_info() -> dict:
                 "vram_total_mb": total_mb,
                 "cuda_version": getattr(getattr(t, "version", None), "cuda", None),
             }
+            # `vram_used_mb` is this process's tensors only; the driver's free
+            # figure also counts other processes and PyTorch's cached blocks.
+            try:
+                free, _ = t.cuda.mem_get_info(idx)
+                info["vram_free_mb"] = int(free // (1024 * 1024))
+            except Exception:
+                pass
+            return info
         if accel == "mps":
             return {"available": True, "name": "Apple GPU (Metal/MPS)", "backend": "mps"}
     except Exception:
@@ -0,0 +1,102 @@
+"""In-process publish/subscribe from worker threads to asyncio subscribers.
+
+Job runners live on plain threads while streaming endpoints (SSE) live on the
+event loop. `BROKER.publish(topic, item)` may be called from any thread; every
+subscription to `topic` receives `item` on its own loop. Queues are bounded
+and a subscriber that falls behind loses the oldest items (`dropped` counts
+them), so a stalled client never holds memory on the publisher's side —
+consumers treat items as hints and re-read authoritative state (the log ring
+buffer, the job table) when they wake up.
+
+Publishing to a topic nobody subscribes to is a dict lookup.
+"""
+
+import asyncio
+import threading
+from typing import Any, Dict, Hashable, List, Optional
+
+# Items a subscription holds before it starts dropping the oldest.
+DEFAULT_QUEUE = 256
+
+# Job deltas: `{"job_id", <changed fields>…}` from `job_manager`, plus progress
+# of long batch inferences (`kind: "inference"`, keyed by their request id).
+JOBS_TOPIC = "jobs"
+
+
+class Subscription:
+    """One subscriber's queue; create via `Broker.subscribe` on the event loop."""
+
+    def __init__(self, broker: "Broker", topic: Hashable, maxsize: int):
+        self._broker = broker
+        self.topic = topic
+        self.loop = asyncio.get_running_loop()
+        self.queue: "asyncio.Queue[Any]" = asyncio.Queue(max(1, maxsize))
+        self.dropped = 0
+
+    def _offer(self, item: Any) -> None:
+        # Runs on `self.loop`.
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(item)
+
+    async def get(self, timeout: Optional[float] = None) -> Any:
+        """The next item, or None after `timeout` seconds without one."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def drain(self) -> List[Any]:
+        """Everything queued right now, without waiting."""
+        items = []
+        while not self.queue.empty():
+            items.append(self.queue.get_nowait())
+        return items
+
+    def close(self) -> None:
+        self._broker.unsubscribe(self)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class Broker:
+    def __init__(self) -> None:
+        self._subs: Dict[Hashable, List[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic: Hashable, maxsize: int = DEFAULT_QUEUE) -> Subscription:
+        sub = Subscription(self, topic, maxsize)
+        with self._lock:
+            self._subs.setdefault(topic, []).append(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._subs.get(sub.topic)
+            if subs and sub in subs:
+                subs.remove(sub)
+                if not subs:
+                    del self._subs[sub.topic]
+
+    def has_subscribers(self, topic: Hashable) -> bool:
+        return topic in self._subs
+
+    def publish(self, topic: Hashable, item: Any) -> None:
+        subs = self._subs.get(topic)
+        if not subs:
+            return
+        with self._lock:
+            subs = list(self._subs.get(topic, ()))
+        for sub in subs:
+            try:
+                sub.loop.call_soon_threadsafe(sub._offer, item)
+            except RuntimeError:  # its loop is closed: the client is gone
+                self.unsubscribe(sub)
+
+
+BROKER = Broker()
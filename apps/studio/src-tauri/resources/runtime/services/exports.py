@@ -0,0 +1,157 @@
+"""Export jobs: run an exporter from the job table and reuse identical results.
+
+`job_manager` calls `run(...)` with the same callbacks it hands the trainers
+(progress, log, cancel); the blocking `/export/<format>` routes call it too,
+with no-op callbacks. Both go through the content-addressed artifact store
+(`export/store.py`, under `<models_dir>/export-cache`), keyed by weights hash,
+format, normalized opts and toolchain versions: a repeat export returns the
+stored artifact, hardlinked to the requested `output_path`, without touching
+ultralytics. Without a models dir (tests, ad-hoc launches) nothing is stored.
+Identical exports started concurrently run once: the second waits for the
+first and then hits the store.
+
+ultralytics' own log lines emitted while a job converts are mirrored into
+that job's log. Cancellation is cooperative: it is honored until the
+conversion starts; one already inside ultralytics runs to the end, but its
+artifact is not stored.
+"""
+
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from export import onnx, openvino, quantize, store, tensorrt
+from export._common import file_sha256
+
+# Job `format` -> (exporter, format the exporter itself is asked for).
+EXPORTERS: Dict[str, Tuple[Callable[[Any], Dict[str, Any]], str]] = {
+    "onnx": (onnx.run, "onnx"),
+    "tensorrt": (tensorrt.run, "engine"),
+    "openvino": (openvino.run, "openvino"),
+    "onnx-int8": (quantize.run, "onnx"),
+    "openvino-int8": (quantize.run, "openvino"),
+}
+
+# Fields every ExportResult has; anything else is kept with the stored entry.
+_RESULT_FIELDS = ("ok", "output_path", "error", "cached")
+
+# cache key -> [lock, holders]: one export per key at a time. The entry goes
+# away with its last holder, so finished keys don't pile up.
+_inflight: Dict[str, List[Any]] = {}
+_lock = threading.Lock()
+
+
+@contextmanager
+def _exclusive(key: str) -> Iterator[None]:
+    with _lock:
+        gate = _inflight.setdefault(key, [threading.Lock(), 0])
+        gate[1] += 1
+    try:
+        with gate[0]:
+            yield
+    finally:
+        with _lock:
+            gate[1] -= 1
+            if not gate[1]:
+                del _inflight[key]
+
+
+def _opts(spec: Dict[str, Any]) -> Dict[str, Any]:
+    opts = dict(spec.get("opts") or {})
+    if spec.get("dataset_path"):
+        # INT8 calibrates / validates on it, so it is part of what was built.
+        opts["dataset_path"] = os.path.abspath(spec["dataset_path"])
+    return opts
+
+
+def cache_key(spec: Dict[str, Any]) -> str:
+    """The artifact store key for `spec` (see `store.entry_key`)."""
+    fmt = (spec.get("format") or "").lower()
+    if fmt not in EXPORTERS:
+        raise ValueError(f"unknown export format '{fmt}' (expected {sorted(EXPORTERS)})")
+    return store.entry_key(file_sha256(spec["model_path"]), fmt, _opts(spec))
+
+
+def lookup(spec: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The stored ExportResult for `spec` (placed at its `output_path`), or None."""
+    artifacts = store.get_store()
+    if artifacts is None:
+        return None
+    result = artifacts.get(cache_key(spec), spec.get("output_path") or "")
+    if result is not None:
+        result["cached"] = True
+    return result
+
+
+class _JobLog(logging.Handler):
+    """Forwards records logged on the exporting thread into the job log."""
+
+    def __init__(self, append_log: Callable[[str], None]) -> None:
+        super().__init__(logging.INFO)
+        self._append = append_log
+        self._thread = threading.get_ident()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.thread == self._thread:
+            self._append(f"[export] {record.getMessage()}")
+
+
+def run(
+    spec: Dict[str, Any],
+    set_progress: Callable[[float, Dict[str, Any]], None],
+    append_log: Callable[[str], None],
+    is_canceled: Callable[[], bool],
+) -> Optional[Dict[str, Any]]:
+    """Export `spec["model_path"]` to `spec["format"]`; ExportResult + `cached`.
+
+    Returns None when the job was canceled before its conversion started.
+    """
+    fmt = (spec.get("format") or "").lower()
+    set_progress(0.0, {"stage": "hashing"})
+    key = cache_key(spec)
+    with _exclusive(key):
+        hit = lookup(spec)
+        if hit is not None:
+            append_log(f"[runtime] reusing cached {fmt} export -> {hit['output_path']}")
+            set_progress(1.0, {"stage": "done", "cached": True})
+            return hit
+        if is_canceled():
+            return None
+
+        exporter, target = EXPORTERS[fmt]
+        req = SimpleNamespace(
+            model_path=spec["model_path"],
+            format=target,
+            output_path=spec.get("output_path") or "",
+            dataset_path=spec.get("dataset_path") or "",
+            opts=dict(spec.get("opts") or {}),
+        )
+        append_log(f"[runtime] exporting {req.model_path} to {fmt}")
+        set_progress(0.1, {"stage": "exporting"})
+        handler = _JobLog(append_log)
+        ultra_log = logging.getLogger("ultralytics")
+        ultra_log.addHandler(handler)
+        try:
+            result = exporter(req)
+        finally:
+            ultra_log.removeHandler(handler)
+
+        result = dict(result, cached=False)
+        artifacts = store.get_store()
+        if artifacts is not None and result.get("ok") and not is_canceled():
+            meta = {
+                "format": fmt,
+                "weights": spec["model_path"],
+                "opts": store.normalize_opts(_opts(spec)),
+                # Extras such as the INT8 `report` are served back with the hit.
+                "result": {k: v for k, v in result.items() if k not in _RESULT_FIELDS},
+            }
+            try:
+                artifacts.put(key, result["output_path"], meta)
+            except OSError as exc:  # a full disk must not fail the export itself
+                append_log(f"[runtime] could not store the export: {exc}")
+        set_progress(1.0, {"stage": "done", "cached": False})
+        return result
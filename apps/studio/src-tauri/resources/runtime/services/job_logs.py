@@ -0,0 +1,191 @@
+"""Job log files: one long-lived buffered writer and an in-memory tail per log.
+
+`append` writes through a file handle that stays open for the life of the job
+(no open/close per line); a background thread flushes dirty writers every
+VAILABEL_RT_LOG_FLUSH_S seconds (default 0.5) and `close` flushes for good.
+The most recent VAILABEL_RT_LOG_RING_KB (default 256) of each log is also kept
+in a ring buffer indexed by byte offset, so a poller that keeps up (the usual
+case) is answered from memory; older offsets are read from the file, at most
+`max_bytes` at a time and cut at a line boundary.
+
+Offsets are byte positions in the log file, the same `next_offset` values
+`/training/logs` has always returned. Every append publishes the new end
+offset on `topic(path)` (see `services/events.py`) for streaming readers.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from inference.loader import env_number
+from services.events import BROKER
+
+# Bytes `read` returns per call when the caller doesn't say.
+DEFAULT_MAX_BYTES = 64 * 1024
+
+
+def topic(path: str) -> Tuple[str, str]:
+    return ("log", os.path.abspath(path))
+
+
+class LogWriter:
+    """Appends lines to `path` and remembers the tail of what was written."""
+
+    def __init__(self, path: str, ring_bytes: int):
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self.path = path
+        self._fh = open(path, "ab")  # noqa: SIM115 — kept open until `close`
+        self.size = self._fh.tell()
+        self._ring: Deque[Tuple[int, bytes]] = deque()  # (offset, line incl. "\n")
+        self._ring_bytes = 0
+        self._ring_limit = max(0, ring_bytes)
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._topic = topic(path)
+
+    def write(self, line: str) -> None:
+        data = (line + "\n").encode("utf-8")
+        with self._lock:
+            self._fh.write(data)
+            self._ring.append((self.size, data))
+            self.size += len(data)
+            self._ring_bytes += len(data)
+            while len(self._ring) > 1 and self._ring_bytes > self._ring_limit:
+                self._ring_bytes -= len(self._ring.popleft()[1])
+            self._dirty = True
+            end = self.size
+        BROKER.publish(self._topic, end)
+
+    def tail(self, offset: int, max_bytes: int) -> Optional[Tuple[bytes, int]]:
+        """(bytes from `offset`, next offset) from memory, or None if it's not there."""
+        with self._lock:
+            if offset >= self.size:
+                return b"", self.size
+            if not self._ring or offset < self._ring[0][0]:
+                return None
+            chunks: List[bytes] = []
+            taken = 0
+            for start, data in self._ring:
+                end = start + len(data)
+                if end <= offset:
+                    continue
+                piece = data[max(0, offset - start):]
+                if chunks and taken + len(piece) > max_bytes:
+                    break
+                chunks.append(piece)
+                taken += len(piece)
+            return b"".join(chunks), offset + taken
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._dirty and not self._fh.closed:
+                self._fh.flush()
+                self._dirty = False
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._fh.closed:
+                self._fh.close()
+        BROKER.publish(self._topic, self.size)
+
+
+_writers: Dict[str, LogWriter] = {}
+_lock = threading.Lock()
+_flusher: Optional[threading.Thread] = None
+
+
+def _flush_forever() -> None:
+    while True:
+        time.sleep(max(0.05, env_number("VAILABEL_RT_LOG_FLUSH_S", 0.5)))
+        with _lock:
+            writers = list(_writers.values())
+        for writer in writers:
+            try:
+                writer.flush()
+            except (OSError, ValueError):
+                pass
+
+
+def _writer(path: str) -> LogWriter:
+    global _flusher
+    key = os.path.abspath(path)
+    with _lock:
+        writer = _writers.get(key)
+        if writer is None:
+            ring = int(env_number("VAILABEL_RT_LOG_RING_KB", 256) * 1024)
+            writer = _writers[key] = LogWriter(path, ring)
+            if _flusher is None:
+                _flusher = threading.Thread(target=_flush_forever, daemon=True)
+                _flusher.start()
+        return writer
+
+
+def append(path: str, line: str) -> None:
+    """Append one line to the log at `path` (best-effort: never raises)."""
+    if not path:
+        return
+    try:
+        _writer(path).write(line)
+    except Exception:  # noqa: BLE001 — a full disk must not fail the job
+        pass
+
+
+def is_open(path: str) -> bool:
+    """Whether a running job may still append to `path`."""
+    with _lock:
+        return os.path.abspath(path) in _writers
+
+
+def close(path: str) -> None:
+    """Flush and release the writer for `path` (its job is done)."""
+    if not path:
+        return
+    with _lock:
+        writer = _writers.pop(os.path.abspath(path), None)
+    if writer is not None:
+        writer.close()
+
+
+def size(path: str) -> int:
+    with _lock:
+        writer = _writers.get(os.path.abspath(path))
+    if writer is not None:
+        return writer.size
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def read(path: str, offset: int = 0, max_bytes: int = DEFAULT_MAX_BYTES) -> Tuple[List[str], int]:
+    """(complete lines from `offset`, next offset), at most ~`max_bytes` of them.
+
+    A single line longer than `max_bytes` is still returned whole, so a reader
+    always makes progress.
+    """
+    offset, max_bytes = max(0, int(offset)), max(1, int(max_bytes))
+    with _lock:
+        writer = _writers.get(os.path.abspath(path))
+    found = writer.tail(offset, max_bytes) if writer is not None else None
+    if found is None:
+        if writer is not None:
+            writer.flush()
+        try:
+            with open(path, "rb") as fh:
+                fh.seek(offset)
+                data = fh.read(max_bytes)
+                if data and not data.endswith(b"\n"):
+                    cut = data.rfind(b"\n")
+                    if cut >= 0:
+                        data = data[: cut + 1]
+                    else:  # one line longer than max_bytes: finish it
+                        data += fh.readline()
+        except OSError:
+            return [], offset
+        found = (data, offset + len(data))
+    data, next_offset = found
+    return data.decode("utf-8", errors="replace").splitlines(), next_offset
@@ -1,71 +1,309 @@
-"""In-process training job table + background runner.
+"""Training job table + background runner.
 
 Dispatches by `model_family` to a real trainer under `training/` (ultralytics
 for YOLO/RT-DETR) when its deps are installed; otherwise falls back to a
 SIMULATED epoch loop so the end-to-end pipeline (queue → run → complete, live
 logs, progress) stays demonstrable without GPU weights. Job status/progress/
 metrics match the `TrainingJobStatus` wire shape the Rust client expects.
+
+Auto-label jobs (`services/autolabel.py`) and export jobs (`services/exports.py`)
+share the same table, so their progress and logs poll through `/training/jobs`
+(with `?kind=`) and `/training/logs` too; each job carries a `kind`
+("training", "autolabel" or "export") to tell them apart. Export jobs also
+carry their ExportResult as `result` once it is known.
+
+Jobs do not all start at once: a scheduler admits at most
+VAILABEL_RT_MAX_JOBS trainings (default 1), VAILABEL_RT_MAX_AUTOLABEL_JOBS
+auto-label runs (2) and VAILABEL_RT_MAX_EXPORT_JOBS exports (1) at a time. The
+rest wait as "queued" (with a 1-based `queue_position`), highest
+`spec.priority` first and FIFO within a priority, and can be stopped before
+they start. A training that will use the GPU is only admitted while fewer
+than VAILABEL_RT_MAX_GPU_JOBS (1) GPU jobs run and, on CUDA, at least
+VAILABEL_RT_JOB_MIN_VRAM_MB (1024) is free device-wide (the driver's figure,
+`vram_free_mb` in `services/device.gpu_info`); a job held back for the GPU
+does not block CPU-only jobs queued behind it. VRAM can free up without any
+job event (another process exits), so while a job is held back for VRAM the
+queue is re-checked every VAILABEL_RT_JOB_RETRY_S (5).
+
+The table lives in SQLite (`services/job_store.py`): `configure` opens the
+runtime's database and reconciles jobs a previous process left unfinished.
+Queued jobs are queued again; running auto-label jobs resume from their
+output cursor and export jobs re-run (a finished conversion is served from the
+artifact store); training cannot pick up mid-epoch, so it is marked failed.
+Until `configure` runs (tests, imports) an in-memory database is used.
+
+Every change to a row is also published as a delta on `events.JOBS_TOPIC`,
+which `/events` streams to clients.
 """
 
-import os
+import bisect
+import itertools
 import threading
 import time
 
-_jobs = {}
-_lock = threading.Lock()
+from inference.loader import env_number
+from services import job_logs
+from services.events import BROKER, JOBS_TOPIC
+from services.job_store import TERMINAL, JobStore
+
+_store = JobStore()
+# job_id -> log path, so progress updates can record the log size without a read.
+_log_paths = {}
 
 # Families with a real trainer wired under training/.
 _REAL_FAMILIES = {"yolo", "rtdetr"}
 
+# Row fields that never leave the runtime (see job_store._PUBLIC).
+_PRIVATE_FIELDS = ("cancel", "log_offset", "spec")
+
+# kind -> (env var, default) for the number of jobs of that kind run at once.
+_LIMITS = {
+    "training": ("VAILABEL_RT_MAX_JOBS", 1),
+    "autolabel": ("VAILABEL_RT_MAX_AUTOLABEL_JOBS", 2),
+    "export": ("VAILABEL_RT_MAX_EXPORT_JOBS", 1),
+}
+
+# Scheduler state, guarded by `_sched_lock`. `_queue` is kept sorted by
+# (-priority, arrival) so queue positions are list indices.
+_sched_lock = threading.Lock()
+_queue = []
+_waiting = {}  # job_id -> (kind, spec, log_path, uses_gpu)
+_active = {}  # job_id -> (kind, uses_gpu)
+_arrival = itertools.count()
+_retry_timer = None  # threading.Timer re-running `_pump` while a job waits for VRAM
+
+
+def configure(db_path: str) -> list:
+    """Open the job database at `db_path` and reconcile; returns what was done.
+
+    Each entry is `{"job_id", "kind", "action"}` with action "requeued",
+    "resumed", "failed" or "canceled".
+    """
+    global _store
+    _store.close()
+    _store = JobStore(db_path or ":memory:")
+    return reconcile()
+
+
+def reconcile() -> list:
+    """Settle jobs that were queued or running when the previous process died."""
+    actions = []
+    for job in _store.unfinished():
+        job_id, kind, spec = job["job_id"], job["kind"], job["spec"]
+        log_path = job["log_path"]
+        if job["cancel"]:
+            _update(job_id, status="canceled")
+            action = "canceled"
+        elif spec and kind in _RUNNERS and (job["status"] == "queued" or kind != "training"):
+            _log_paths[job_id] = log_path
+            if job["status"] == "running":
+                _append_log(log_path, "[runtime] resuming after a runtime restart")
+            _update(job_id, status="queued")
+            _enqueue(job_id, kind, spec, log_path)
+            action = "requeued" if job["status"] == "queued" else "resumed"
+        else:
+            error = "interrupted by a runtime restart"
+            _update(job_id, status="failed", error=error)
+            _append_log(log_path, f"[runtime] failed: {error}")
+            job_logs.close(log_path)
+            action = "failed"
+        actions.append({"job_id": job_id, "kind": kind, "action": action})
+    _pump()
+    return actions
 
-def start_job(spec: dict) -> None:
-    job_id = spec["job_id"]
+
+def _register(job_id: str, kind: str, spec: dict, **fields) -> str:
     log_path = spec.get("log_path") or ""
-    with _lock:
-        _jobs[job_id] = {
-            "job_id": job_id,
-            "status": "running",
-            "progress": 0.0,
-            "metrics": {},
-            "error": None,
-            "log_path": log_path,
-            "cancel": False,
-        }
-    threading.Thread(target=_run, args=(job_id, spec, log_path), daemon=True).start()
+    _log_paths[job_id] = log_path
+    _store.insert(job_id, kind, spec, **fields)
+    _publish(dict(get_job(job_id) or {}))
+    return log_path
 
 
-def _append_log(log_path: str, line: str) -> None:
-    if not log_path:
+def _publish(delta: dict) -> None:
+    """Announce a job change on `events.JOBS_TOPIC` (what `/events` streams)."""
+    delta = {k: v for k, v in delta.items() if k not in _PRIVATE_FIELDS}
+    if len(delta) > 1:
+        BROKER.publish(JOBS_TOPIC, delta)
+
+
+def _update(job_id: str, **fields) -> None:
+    _store.update(job_id, **fields)
+    _publish(dict(fields, job_id=job_id))
+
+
+def _publish_positions() -> None:
+    """Queue positions shift whenever the queue changes: re-announce them."""
+    if not BROKER.has_subscribers(JOBS_TOPIC):
         return
+    with _sched_lock:
+        ids = [entry[2] for entry in _queue]
+    for position, job_id in enumerate(ids, 1):
+        BROKER.publish(JOBS_TOPIC, {"job_id": job_id, "queue_position": position})
+
+
+def _uses_gpu(kind: str, spec: dict) -> bool:
+    """Whether admitting this job puts a trainer on the GPU."""
+    if kind != "training" or (spec.get("model_family") or "").lower() not in _REAL_FAMILIES:
+        return False
+    if str((spec.get("config") or {}).get("device", "")).lower() == "cpu":
+        return False
+    from services import device
+
+    return device.gpu_available()
+
+
+def _gpu_has_room() -> bool:
+    from services import device
+
+    info = device.gpu_info()
+    if info.get("backend") != "cuda" or "vram_free_mb" not in info:
+        return True
+    return info["vram_free_mb"] >= env_number("VAILABEL_RT_JOB_MIN_VRAM_MB", 1024)
+
+
+def _enqueue(job_id: str, kind: str, spec: dict, log_path: str) -> None:
+    try:
+        priority = int(spec.get("priority") or 0)
+    except (TypeError, ValueError):
+        priority = 0
+    uses_gpu = _uses_gpu(kind, spec)
+    with _sched_lock:
+        bisect.insort(_queue, (-priority, next(_arrival), job_id))
+        _waiting[job_id] = (kind, spec, log_path, uses_gpu)
+
+
+def _pump() -> None:
+    """Start every queued job that fits, in queue order."""
+    # Probe VRAM before taking the lock: gpu_info can take a while (NVML, torch).
+    with _sched_lock:
+        gpu_waiting = any(_waiting[entry[2]][3] for entry in _queue)
+    room = gpu_waiting and _gpu_has_room()
+    admitted = []
+    deferred = False
+    with _sched_lock:
+        for entry in list(_queue):
+            job_id = entry[2]
+            kind, spec, log_path, uses_gpu = _waiting[job_id]
+            name, default = _LIMITS[kind]
+            limit = max(1, int(env_number(name, default)))
+            if sum(1 for k, _ in _active.values() if k == kind) >= limit:
+                continue
+            if uses_gpu:
+                gpu_limit = max(1, int(env_number("VAILABEL_RT_MAX_GPU_JOBS", 1)))
+                if sum(1 for _, g in _active.values() if g) >= gpu_limit:
+                    continue
+                if not room:
+                    deferred = True
+                    continue
+                # The probe predates this admission: the next GPU job waits for a fresh one.
+                room = False
+            _queue.remove(entry)
+            del _waiting[job_id]
+            _active[job_id] = (kind, uses_gpu)
+            admitted.append((job_id, kind, spec, log_path))
+    for job_id, kind, spec, log_path in admitted:
+        _store.update(job_id, status="running")
+        _publish({"job_id": job_id, "status": "running", "queue_position": None})
+        threading.Thread(
+            target=_slot, args=(_RUNNERS[kind], job_id, spec, log_path), daemon=True
+        ).start()
+    if deferred:
+        _schedule_retry()
+    _publish_positions()
+
+
+def _schedule_retry() -> None:
+    """Pump again shortly, unless a retry is already pending."""
+    global _retry_timer
+    with _sched_lock:
+        if _retry_timer is not None:
+            return
+        _retry_timer = threading.Timer(
+            max(0.01, env_number("VAILABEL_RT_JOB_RETRY_S", 5.0)), _retry
+        )
+        _retry_timer.daemon = True
+        _retry_timer.start()
+
+
+def _retry() -> None:
+    global _retry_timer
+    with _sched_lock:
+        _retry_timer = None
+    _pump()
+
+
+def _slot(target, job_id: str, spec: dict, log_path: str) -> None:
+    """Run an admitted job, then hand its slot to the next queued one."""
+    try:
+        target(job_id, spec, log_path)
+    finally:
+        job_logs.close(log_path)
+        with _sched_lock:
+            _active.pop(job_id, None)
+        _pump()
+
+
+def _submit(job_id: str, kind: str, spec: dict) -> dict:
+    log_path = _register(job_id, kind, spec, status="queued")
+    _enqueue(job_id, kind, spec, log_path)
+    _pump()
+    return get_job(job_id)
+
+
+def start_job(spec: dict) -> dict:
+    """Queue a training job; returns its row (status "queued" or "running")."""
+    return _submit(spec["job_id"], "training", spec)
+
+
+def start_autolabel_job(spec: dict) -> dict:
+    return _submit(spec["job_id"], "autolabel", spec)
+
+
+def start_export_job(spec: dict) -> dict:
+    """Register an export job and return its row.
+
+    A cache hit completes the job on the spot (the caller gets the artifact in
+    the response); otherwise the export is queued like any other job.
+    """
+    from services import exports
+
+    job_id = spec["job_id"]
     try:
-        os.makedirs(os.path.dirname(log_path), exist_ok=True)
-        with open(log_path, "a", encoding="utf-8") as fh:
-            fh.write(line + "\n")
-    except Exception:
-        pass
+        hit = exports.lookup(spec)
+    except Exception:  # noqa: BLE001 — the runner reports it as a failed job
+        hit = None
+    if hit is None:
+        return _submit(job_id, "export", spec)
+    log_path = _register(
+        job_id, "export", spec, status="completed", progress=1.0,
+        metrics={"stage": "done", "cached": True}, result=hit,
+    )
+    _append_log(log_path, f"[runtime] reusing cached export -> {hit['output_path']}")
+    job_logs.close(log_path)
+    return get_job(job_id)
+
+
+def _append_log(log_path: str, line: str) -> None:
+    job_logs.append(log_path, line)
 
 
 def _set_status(job_id: str, **fields) -> None:
-    with _lock:
-        job = _jobs.get(job_id)
-        if job:
-            job.update(fields)
+    _update(job_id, **fields)
 
 
 def _set_progress(job_id: str, progress: float, metrics=None) -> None:
-    with _lock:
-        job = _jobs.get(job_id)
-        if not job:
-            return
-        job["progress"] = float(progress)
-        if metrics is not None:
-            job["metrics"] = metrics
+    fields = {"progress": float(progress)}
+    if metrics is not None:
+        fields["metrics"] = metrics
+    log_path = _log_paths.get(job_id)
+    if log_path:
+        fields["log_offset"] = job_logs.size(log_path)
+    _update(job_id, **fields)
 
 
 def _is_canceled(job_id: str) -> bool:
-    with _lock:
-        job = _jobs.get(job_id)
-        return bool(job and job["cancel"])
+    return _store.is_canceled(job_id)
 
 
 def _run(job_id: str, spec: dict, log_path: str) -> None:
@@ -109,18 +347,63 @@ def _run(job_id: str, spec: dict, log_path: str) -> None:
         append(f"[runtime] failed: {exc}")
         return
 
+    _finish(job_id, append)
+
+
+def _run_autolabel(job_id: str, spec: dict, log_path: str) -> None:
+    from services import autolabel
+
+    def append(line: str) -> None:
+        _append_log(log_path, line)
+
+    try:
+        autolabel.run(
+            spec,
+            lambda p, m=None: _set_progress(job_id, p, m),
+            append,
+            lambda: _is_canceled(job_id),
+        )
+    except Exception as exc:  # noqa: BLE001
+        _set_status(job_id, status="failed", error=str(exc))
+        append(f"[runtime] failed: {exc}")
+        return
+    _finish(job_id, append)
+
+
+def _run_export(job_id: str, spec: dict, log_path: str) -> None:
+    from services import exports
+
+    def append(line: str) -> None:
+        _append_log(log_path, line)
+
+    try:
+        result = exports.run(
+            spec,
+            lambda p, m=None: _set_progress(job_id, p, m),
+            append,
+            lambda: _is_canceled(job_id),
+        )
+    except Exception as exc:  # noqa: BLE001
+        _set_status(job_id, status="failed", error=str(exc))
+        append(f"[runtime] failed: {exc}")
+        return
+    if result is not None:
+        _set_status(job_id, result=result)
+        if not result.get("ok"):
+            _set_status(job_id, status="failed", error=result.get("error"))
+            append(f"[runtime] failed: {result.get('error')}")
+            return
+    _finish(job_id, append)
+
+
+def _finish(job_id: str, append) -> None:
     # Finalize (the simulated path sets its own terminal state; this also covers
     # the real path + cancellation).
-    with _lock:
-        job = _jobs.get(job_id)
-        if not job:
-            return
-        if job["cancel"]:
-            job["status"] = "canceled"
-        elif job["status"] == "running":
-            job["status"] = "completed"
-            job["progress"] = 1.0
-    append("[runtime] canceled" if _is_canceled(job_id) else "[runtime] completed")
+    status = _store.finish(job_id)
+    if status is not None:
+        job = _store.get(job_id)
+        _publish({"job_id": job_id, "status": status, "progress": job["progress"]})
+        append("[runtime] canceled" if status == "canceled" else "[runtime] completed")
 
 
 def _run_simulated(job_id: str, spec: dict, log_path: str) -> None:
@@ -149,29 +432,68 @@ def _run_simulated(job_id: str, spec: dict, log_path: str) -> None:
         time.sleep(0.5)
 
 
-def stop_job(job_id: str) -> None:
-    with _lock:
-        if job_id in _jobs:
-            _jobs[job_id]["cancel"] = True
-
-
-def list_jobs() -> list:
-    with _lock:
-        return [{k: v for k, v in job.items() if k != "cancel"} for job in _jobs.values()]
+_RUNNERS = {"training": _run, "autolabel": _run_autolabel, "export": _run_export}
 
 
-def read_logs(job_id: str, offset: int = 0) -> dict:
-    with _lock:
-        job = _jobs.get(job_id)
-        path = job.get("log_path") if job else None
-    lines, next_offset = [], offset
-    if path and os.path.exists(path):
-        try:
-            with open(path, "r", encoding="utf-8", errors="replace") as fh:
-                fh.seek(offset)
-                data = fh.read()
-                next_offset = fh.tell()
-                lines = data.splitlines()
-        except Exception:
-            pass
-    return {"lines": lines, "next_offset": next_offset, "eof": True}
+def stop_job(job_id: str) -> None:
+    """Cancel a job: a queued one never starts, a running one stops cooperatively."""
+    with _sched_lock:
+        waiting = _waiting.pop(job_id, None)
+        if waiting is not None:
+            _queue[:] = [entry for entry in _queue if entry[2] != job_id]
+    if waiting is None:
+        _update(job_id, cancel=1)
+        return
+    _store.update(job_id, cancel=1, status="canceled")
+    _publish({"job_id": job_id, "status": "canceled", "queue_position": None})
+    _append_log(waiting[2], "[runtime] canceled before it started")
+    job_logs.close(waiting[2])
+    _publish_positions()
+
+
+def _with_position(job):
+    if job is not None:
+        job["queue_position"] = None
+        if job["status"] == "queued":
+            with _sched_lock:
+                ids = [entry[2] for entry in _queue]
+            if job["job_id"] in ids:
+                job["queue_position"] = ids.index(job["job_id"]) + 1
+    return job
+
+
+def get_job(job_id: str):
+    return _with_position(_store.get(job_id))
+
+
+def list_jobs(kind=None, project_id=None, status=None, limit=None, offset=0) -> list:
+    """Jobs oldest first; every filter and the page are applied in SQL."""
+    jobs = _store.list(kind, project_id, status, limit, offset)
+    if any(job["status"] == "queued" for job in jobs):
+        with _sched_lock:
+            positions = {entry[2]: i + 1 for i, entry in enumerate(_queue)}
+    else:
+        positions = {}
+    for job in jobs:
+        job["queue_position"] = positions.get(job["job_id"])
+    return jobs
+
+
+def log_topic(job_id: str):
+    """The `events.BROKER` topic a job's log appends are announced on, or None."""
+    job = _store.get(job_id)
+    return job_logs.topic(job["log_path"]) if job and job["log_path"] else None
+
+
+def read_logs(job_id: str, offset: int = 0, max_bytes: int = job_logs.DEFAULT_MAX_BYTES) -> dict:
+    """Up to ~`max_bytes` of complete log lines from byte `offset`.
+
+    `eof` is true only once the job has finished and every line it wrote has
+    been returned, so a poller knows when to stop.
+    """
+    job = _store.get(job_id)
+    path = job["log_path"] if job else ""
+    lines, next_offset = job_logs.read(path, offset, max_bytes) if path else ([], offset)
+    done = job is None or (job["status"] in TERMINAL and not job_logs.is_open(path))
+    eof = done and (not path or next_offset >= job_logs.size(path))
+    return {"lines": lines, "next_offset": next_offset, "eof": eof}
@@ -0,0 +1,195 @@
+"""SQLite-backed job table, so jobs outlive a runtime restart.
+
+One row per job (training, auto-label, export) holding what `/training/jobs`
+reports — status, progress, metrics, error, result — plus what a restarted
+runtime needs to pick a job up again: the original spec, its log path and the
+log size at the last progress update. The database runs in WAL mode, so
+readers (job polling) never wait on the writer (progress updates), and is
+indexed by (project, status) and (status), so listings page straight off an
+index instead of scanning every job.
+
+Only `job_manager` writes here. A single connection is shared by the runner
+threads and serialized by a lock; each statement is short.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id     TEXT PRIMARY KEY,
+    kind       TEXT NOT NULL,
+    project_id TEXT NOT NULL DEFAULT '',
+    status     TEXT NOT NULL,
+    progress   REAL NOT NULL DEFAULT 0,
+    metrics    TEXT NOT NULL DEFAULT '{}',
+    error      TEXT,
+    result     TEXT,
+    log_path   TEXT NOT NULL DEFAULT '',
+    log_offset INTEGER NOT NULL DEFAULT 0,
+    spec       TEXT NOT NULL DEFAULT '{}',
+    cancel     INTEGER NOT NULL DEFAULT 0,
+    created    REAL NOT NULL,
+    updated    REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_project_status ON jobs (project_id, status, created);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created);
+CREATE INDEX IF NOT EXISTS jobs_created ON jobs (created);
+"""
+
+# Stored as JSON text.
+_JSON_FIELDS = ("metrics", "result", "spec")
+
+# Columns `/training/jobs` reports (spec, cancel and bookkeeping stay internal).
+_PUBLIC = (
+    "job_id", "kind", "project_id", "status", "progress", "metrics", "error", "log_path",
+)
+
+TERMINAL = ("completed", "failed", "canceled")
+
+
+class JobStore:
+    """The `jobs` table in the SQLite file at `path` (":memory:" for none)."""
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            if path != ":memory:":
+                self._db.execute("PRAGMA journal_mode=WAL")
+                # WAL + NORMAL: durable across process crashes, fsync only at checkpoints.
+                self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def insert(self, job_id: str, kind: str, spec: Dict[str, Any], **fields: Any) -> None:
+        """Create (or replace: a reused job id starts over) the row for `job_id`."""
+        now = time.time()
+        row = {
+            "job_id": job_id,
+            "kind": kind,
+            "project_id": spec.get("project_id") or "",
+            "status": "running",
+            "progress": 0.0,
+            "metrics": {},
+            "error": None,
+            "result": None,
+            "log_path": spec.get("log_path") or "",
+            "log_offset": 0,
+            "spec": spec,
+            "cancel": 0,
+            "created": now,
+            "updated": now,
+        }
+        row.update(fields)
+        for name in _JSON_FIELDS:
+            row[name] = None if row[name] is None else json.dumps(row[name], default=str)
+        columns = ", ".join(row)
+        marks = ", ".join("?" for _ in row)
+        with self._lock:
+            self._db.execute(
+                f"INSERT OR REPLACE INTO jobs ({columns}) VALUES ({marks})", tuple(row.values())
+            )
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        if not fields:
+            return
+        for name in _JSON_FIELDS:
+            if name in fields and fields[name] is not None:
+                fields[name] = json.dumps(fields[name], default=str)
+        fields["updated"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._db.execute(
+                f"UPDATE jobs SET {assignments} WHERE job_id = ?", (*fields.values(), job_id)
+            )
+
+    def finish(self, job_id: str) -> Optional[str]:
+        """Settle a job whose runner returned: canceled if asked to, else completed.
+
+        A status the runner already set (e.g. "failed") is kept. Returns the
+        final status, or None for an unknown job.
+        """
+        with self._lock:
+            self._db.execute(
+                """
+                UPDATE jobs SET
+                    status = CASE WHEN cancel THEN 'canceled'
+                                  WHEN status = 'running' THEN 'completed'
+                                  ELSE status END,
+                    progress = CASE WHEN NOT cancel AND status = 'running' THEN 1.0
+                                    ELSE progress END,
+                    updated = ?
+                WHERE job_id = ?
+                """,
+                (time.time(), job_id),
+            )
+            row = self._db.execute(
+                "SELECT status FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return row["status"] if row else None
+
+    def get(self, job_id: str, internal: bool = False) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return _decode(row, internal) if row else None
+
+    def is_canceled(self, job_id: str) -> bool:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT cancel FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return bool(row and row["cancel"])
+
+    def list(
+        self,
+        kind: Optional[str] = None,
+        project_id: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """Jobs oldest first, filtered and paged in SQL."""
+        where, args = [], []
+        for column, value in (("kind", kind), ("project_id", project_id), ("status", status)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                args.append(value)
+        sql = "SELECT * FROM jobs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY created, job_id LIMIT ? OFFSET ?"
+        args.extend([-1 if limit is None else int(limit), max(0, int(offset))])
+        with self._lock:
+            rows = self._db.execute(sql, args).fetchall()
+        return [_decode(row) for row in rows]
+
+    def unfinished(self) -> List[Dict[str, Any]]:
+        """Every queued or running job, with its spec (for reconciliation)."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT * FROM jobs WHERE status IN ('queued', 'running') ORDER BY created"
+            ).fetchall()
+        return [_decode(row, internal=True) for row in rows]
+
+
+def _decode(row: sqlite3.Row, internal: bool = False) -> Dict[str, Any]:
+    names = row.keys() if internal else _PUBLIC
+    out = {name: row[name] for name in names}
+    for name in _JSON_FIELDS:
+        if name in out and out[name] is not None:
+            out[name] = json.loads(out[name])
+    if row["kind"] == "export":
+        # Only export jobs report a result (their ExportResult).
+        out["result"] = json.loads(row["result"]) if row["result"] else None
+    if internal:
+        out["cancel"] = bool(row["cancel"])
+    return out
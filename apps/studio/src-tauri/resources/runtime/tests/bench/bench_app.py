@@ -0,0 +1,120 @@
+"""Benchmark: the whole FastAPI app under concurrent load, with a fake adapter.
+
+Builds the real app (`app.build_app`: token middleware, validation, routing,
+threadpool dispatch, response encoding) and swaps `detect.run` for an adapter
+that sleeps `--work-ms` (a forward pass releasing the GIL, as torch does) and
+returns `--boxes` detections. `--concurrency` clients then post
+`/inference/object-detection` in-process over httpx's ASGI transport, so what's
+measured is everything the runtime adds around a model. Runs are repeated as
+JSON, packed (`Accept: application/x-vailabel-drafts`) and JSON with
+VAILABEL_RT_TRACE on, so the tracing overhead shows up too.
+
+Needs fastapi + httpx; prints one JSON object:
+
+    python tests/bench/bench_app.py [--requests 400] [--concurrency 16]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from unittest import mock
+
+RUNTIME_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if RUNTIME_DIR not in sys.path:
+    sys.path.insert(0, RUNTIME_DIR)
+
+from inference import detect, wire  # noqa: E402
+from inference.loader import box_drafts  # noqa: E402
+
+TOKEN = "bench"
+
+
+def fake_adapter(boxes, work_ms):
+    rng = random.Random(0)
+    columns = {
+        "xyxy": [],
+        "classId": [],
+        "confidence": [],
+        "labelName": [],
+    }
+    for _ in range(boxes):
+        x, y = rng.uniform(0, 1200), rng.uniform(0, 650)
+        cls_id = rng.randrange(80)
+        columns["xyxy"].append([x, y, x + 40, y + 60])
+        columns["classId"].append(cls_id)
+        columns["confidence"].append(rng.random())
+        columns["labelName"].append(f"class{cls_id}")
+
+    def run(req):
+        time.sleep(work_ms / 1000)
+        return {"detections": box_drafts(columns)}
+
+    return run
+
+
+async def _load(app, requests, concurrency, headers):
+    import httpx
+
+    body = {"model_path": "/m/yolo/fake.pt", "image_path": "/m/frame.jpg"}
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def worker(count):
+            for _ in range(count):
+                start = time.perf_counter()
+                response = await client.post(
+                    "/inference/object-detection", json=body, headers=headers
+                )
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        share = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in share))
+        elapsed = time.perf_counter() - start
+    ms = sorted(x * 1000 for x in latencies)
+    return {
+        "requests_per_s": round(len(ms) / elapsed, 1),
+        "p50_ms": round(ms[len(ms) // 2], 2),
+        "p95_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 2),
+    }
+
+
+def run(requests=400, concurrency=16, boxes=100, work_ms=5.0):
+    import app as runtime_app
+
+    app = runtime_app.build_app(token=TOKEN, models_dir="", log_dir="")
+    auth = {"authorization": f"Bearer {TOKEN}"}
+    modes = {
+        "json": ({}, auth),
+        "packed": ({}, {**auth, "accept": wire.MEDIA_TYPE}),
+        "traced": ({"VAILABEL_RT_TRACE": "1"}, auth),
+    }
+    report = {"config": {"requests": requests, "concurrency": concurrency, "boxes": boxes,
+                         "work_ms": work_ms}}
+    with mock.patch.object(detect, "run", fake_adapter(boxes, work_ms)):
+        for name, (env, headers) in modes.items():
+            with mock.patch.dict(os.environ, env):
+                report[name] = asyncio.run(_load(app, requests, concurrency, headers))
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--boxes", type=int, default=100)
+    parser.add_argument("--work-ms", dest="work_ms", type=float, default=5.0)
+    args = parser.parse_args()
+    report = run(args.requests, args.concurrency, args.boxes, args.work_ms)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,114 @@
+"""Benchmark: the copilot's pure-Python parsers and QA diff.
+
+Times `qa.qa_findings` on a crowded image (a thousand detections against as
+many existing boxes; some are near-duplicates, some mislabeled), and
+`labels.parse_label_list` / `planning.parse_plan` over the response shapes a
+local model actually returns (JSON, bullets, prose around a fenced object).
+No dependencies; prints one JSON object:
+
+    python tests/bench/bench_copilot.py [--boxes 1000] [--repeat 3]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+RUNTIME_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if RUNTIME_DIR not in sys.path:
+    sys.path.insert(0, RUNTIME_DIR)
+
+from copilot import qa  # noqa: E402
+from copilot.labels import parse_label_list  # noqa: E402
+from copilot.planning import parse_plan  # noqa: E402
+from inference.loader import draft, xyxy_to_points  # noqa: E402
+
+CLASSES = ["car", "person", "truck", "bicycle", "dog", "traffic light"]
+
+LABEL_RESPONSES = [
+    '["car", "person", "traffic light", "bicycle"]',
+    "Here are the labels:\n1. Car\n2. Person\n3. Traffic light\n- bicycle\n* dog",
+    "car, person, truck, bus, motorcycle, stop sign, bench, bird, cat, dog, horse",
+    "Sure! I think the image contains: `car`; 'person'; a parked truck / trees.",
+]
+
+PLAN_RESPONSES = [
+    '{"steps":[{"capability":"detect_all"}]}',
+    'Plan:\n```json\n{"steps":[{"capability":"prompt_to_detect","target":"car"},'
+    '{"capability":"segment_each_detection"}]}\n```\nThis finds then outlines cars.',
+    'I would {"steps":[{"capability":"teleport"},{"capability":"qa","target":" "}]} ok',
+    "No JSON here at all, just an explanation of what I'd do.",
+]
+
+
+def crowded_image(boxes, seed=0):
+    """(detections, annotations): `boxes` of each on a 4K frame."""
+    rng = random.Random(seed)
+    annotations, detections = [], []
+    for i in range(boxes):
+        x, y = rng.uniform(0, 3800), rng.uniform(0, 2100)
+        w, h = rng.uniform(10, 60), rng.uniform(10, 60)
+        name = rng.choice(CLASSES)
+        ann = draft(name, "box", xyxy_to_points(x, y, x + w, y + h), 1.0)
+        ann["id"] = f"a{i}"
+        annotations.append(ann)
+        roll = rng.random()
+        if roll < 0.1:  # near-duplicate annotation
+            dup = draft(name, "box", xyxy_to_points(x + 1, y + 1, x + w, y + h), 1.0)
+            dup["id"] = f"d{i}"
+            annotations.append(dup)
+        if roll < 0.7:  # detector agrees on the box, maybe not on the class
+            label = name if roll < 0.6 else rng.choice(CLASSES)
+            detections.append(draft(label, "box", xyxy_to_points(x, y, x + w, y + h), 0.9))
+        else:  # something the annotator missed
+            mx, my = rng.uniform(0, 3800), rng.uniform(0, 2100)
+            detections.append(draft(name, "box", xyxy_to_points(mx, my, mx + w, my + h), 0.5))
+    return detections, annotations
+
+
+def _best(fn, repeat):
+    best = float("inf")
+    out = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000, 3), out
+
+
+def run(boxes=1000, repeat=3, parses=2000):
+    detections, annotations = crowded_image(boxes)
+    qa_ms, (findings, actions) = _best(lambda: qa.qa_findings(detections, annotations), repeat)
+    labels_ms, _ = _best(
+        lambda: [parse_label_list(r) for _ in range(parses // 4) for r in LABEL_RESPONSES],
+        repeat,
+    )
+    plans_ms, _ = _best(
+        lambda: [parse_plan(r) for _ in range(parses // 4) for r in PLAN_RESPONSES], repeat
+    )
+    return {
+        "qa": {
+            "config": {"detections": len(detections), "annotations": len(annotations)},
+            "findings": len(findings),
+            "actions": len(actions),
+            "qa_findings_ms": qa_ms,
+        },
+        "labels": {"config": {"parses": parses}, "parse_label_list_ms": labels_ms},
+        "planning": {"config": {"parses": parses}, "parse_plan_ms": plans_ms},
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--boxes", type=int, default=1000)
+    parser.add_argument("--parses", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    print(json.dumps(run(args.boxes, args.repeat, args.parses), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,110 @@
+"""Benchmark: `ModelCache` under thread contention.
+
+Many threads hammer one shared cache with a fake loader (a short sleep standing
+in for weight loading, so no model or GPU is needed) and this reports
+`get_or_load` calls per second for:
+
+- `hits`: every key resident, the steady state of a busy runtime;
+- `mixed`: more keys than `capacity`, so lookups race with loads + evictions;
+- `cold`: every thread misses the same key at once; single-flight must load
+  it exactly once (`cold_loads`).
+
+Pure Python; prints one JSON object:
+
+    python tests/bench/bench_model_cache.py [--threads 16] [--calls 2000]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+RUNTIME_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if RUNTIME_DIR not in sys.path:
+    sys.path.insert(0, RUNTIME_DIR)
+
+from inference.loader import ModelCache  # noqa: E402
+
+
+def _hammer(threads, work):
+    """Seconds for `threads` threads to each run `work(index)`, started together."""
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(index):
+        barrier.wait()
+        work(index)
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in pool:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def run(threads=16, calls=2000, keys=8, load_ms=2.0):
+    loads = []
+    lock = threading.Lock()
+
+    def loader(key):
+        def load():
+            time.sleep(load_ms / 1000)
+            with lock:
+                loads.append(key)
+            return object()
+
+        return load
+
+    def no_footprint(model):
+        return 0, 0
+
+    def calls_against(cache, key_count):
+        def work(index):
+            rng = random.Random(index)
+            for _ in range(calls):
+                key = f"k{rng.randrange(key_count)}"
+                cache.get_or_load(key, loader(key))
+
+        return work
+
+    report = {"config": {"threads": threads, "calls_per_thread": calls, "keys": keys,
+                         "load_ms": load_ms}}
+    hot = ModelCache(capacity=keys, ram_budget=0, vram_budget=0, estimate=no_footprint)
+    for i in range(keys):
+        hot.get_or_load(f"k{i}", loader(f"k{i}"))
+    hits_s = _hammer(threads, calls_against(hot, keys))
+    report["hits_per_s"] = round(threads * calls / hits_s)
+
+    churn = ModelCache(capacity=max(1, keys // 2), ram_budget=0, vram_budget=0,
+                       estimate=no_footprint)
+    del loads[:]
+    mixed_s = _hammer(threads, calls_against(churn, keys))
+    report["mixed_per_s"] = round(threads * calls / mixed_s)
+    report["mixed_loads"] = len(loads)
+
+    cold = ModelCache(capacity=keys, ram_budget=0, vram_budget=0, estimate=no_footprint)
+    del loads[:]
+    cold_s = _hammer(threads, lambda index: cold.get_or_load("cold", loader("cold")))
+    report["cold_ms"] = round(cold_s * 1000, 3)
+    report["cold_loads"] = len(loads)
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--keys", type=int, default=8)
+    parser.add_argument("--load-ms", dest="load_ms", type=float, default=2.0)
+    args = parser.parse_args()
+    print(json.dumps(run(args.threads, args.calls, args.keys, args.load_ms), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
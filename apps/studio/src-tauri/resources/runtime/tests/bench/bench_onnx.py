@@ -0,0 +1,139 @@
+"""Benchmark: ONNX Runtime (`inference/onnxrt.py`) vs the torch/ultralytics path.
+
+Runs the same detector weights through both backends on the same images and
+reports cold start (load + first image), per-image latency percentiles and
+images/sec. Give `--weights` (a `.pt`; exported to ONNX next to it unless
+`--onnx` is also given) and optionally `--images` (a directory; otherwise
+synthetic 1280x720 frames are written to a temp dir). A backend whose
+dependencies are missing is reported as skipped. Prints one JSON object:
+
+    python tests/bench/bench_onnx.py --weights yolov8n.pt [--onnx yolov8n.onnx]
+        [--images DIR] [--count 32] [--device cpu]
+"""
+
+import argparse
+import glob
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+RUNTIME_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if RUNTIME_DIR not in sys.path:
+    sys.path.insert(0, RUNTIME_DIR)
+
+from inference import onnxrt  # noqa: E402
+from inference.loader import load_array  # noqa: E402
+
+
+def synthetic_images(directory, count, width=1280, height=720):
+    import numpy as np
+    from PIL import Image
+
+    rng = np.random.default_rng(0)
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"frame_{i:03d}.jpg")
+        Image.fromarray(rng.integers(0, 255, (height, width, 3), dtype=np.uint8)).save(path)
+        paths.append(path)
+    return paths
+
+
+def _stats(first_s, latencies):
+    ms = sorted(x * 1000 for x in latencies)
+    total = sum(latencies)
+    return {
+        "cold_start_ms": round(first_s * 1000, 1),
+        "p50_ms": round(statistics.median(ms), 2),
+        "p95_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 2),
+        "images_per_s": round(len(latencies) / total, 2) if total else None,
+    }
+
+
+def bench_torch(weights, images, device):
+    from ultralytics import YOLO
+
+    start = time.perf_counter()
+    model = YOLO(weights)
+    model.predict(load_array(images[0], "bgr"), device=device, verbose=False)
+    first = time.perf_counter() - start
+    latencies = []
+    for path in images:
+        frame = load_array(path, "bgr")
+        t0 = time.perf_counter()
+        model.predict(frame, device=device, verbose=False)
+        latencies.append(time.perf_counter() - t0)
+    return _stats(first, latencies)
+
+
+def bench_onnx(onnx_path, images):
+    start = time.perf_counter()
+    det = onnxrt.OnnxDetector(onnx_path)
+    det.predict([load_array(images[0])])
+    first = time.perf_counter() - start
+    latencies = []
+    for path in images:
+        frame = load_array(path)
+        t0 = time.perf_counter()
+        det.predict([frame])
+        latencies.append(time.perf_counter() - t0)
+    report = _stats(first, latencies)
+    report.update(layout=det.layout, providers=det.session.get_providers())
+    return report
+
+
+def _skip(exc):
+    return {"skipped": f"{type(exc).__name__}: {exc}"}
+
+
+def run(weights=None, onnx_path=None, images_dir=None, count=32, device="cpu"):
+    with tempfile.TemporaryDirectory() as tmp:
+        if images_dir:
+            images = sorted(glob.glob(os.path.join(images_dir, "*")))[:count]
+        else:
+            images = synthetic_images(tmp, count)
+        report = {"config": {"images": len(images), "device": device}}
+
+        if not onnx_path:
+            try:
+                from ultralytics import YOLO
+
+                onnx_path = str(YOLO(weights).export(format="onnx"))
+            except Exception as exc:  # noqa: BLE001 — report, don't crash the bench
+                report["export"] = _skip(exc)
+        if weights:
+            try:
+                report["torch"] = bench_torch(weights, images, device)
+            except Exception as exc:  # noqa: BLE001
+                report["torch"] = _skip(exc)
+        if onnx_path:
+            try:
+                report["onnxruntime"] = bench_onnx(onnx_path, images)
+            except Exception as exc:  # noqa: BLE001
+                report["onnxruntime"] = _skip(exc)
+        torch_ips = report.get("torch", {}).get("images_per_s")
+        onnx_ips = report.get("onnxruntime", {}).get("images_per_s")
+        if torch_ips and onnx_ips:
+            report["onnx_speedup"] = round(onnx_ips / torch_ips, 2)
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--weights", help="ultralytics .pt weights (torch path)")
+    parser.add_argument("--onnx", help="exported .onnx (default: export --weights)")
+    parser.add_argument("--images", help="directory of images (default: synthetic frames)")
+    parser.add_argument("--count", type=int, default=32)
+    parser.add_argument("--device", default="cpu")
+    args = parser.parse_args()
+    if not (args.weights or args.onnx):
+        parser.error("give --weights and/or --onnx")
+    report = run(args.weights, args.onnx, args.images, args.count, args.device)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,136 @@
+"""Benchmark: batched `masks_to_polygons` vs the legacy per-mask path.
+
+Draws N synthetic object masks (ellipses and spiky stars, so some blow past the
+vertex cap) on a 4K frame and times:
+
+- `legacy`:  the pre-batching loop — per-mask `np.asarray` + full-frame uint8
+  copy + `findContours` + the grow-epsilon-by-1.5x `approxPolyDP` loop;
+- `batched`: `loader.masks_to_polygons` over the whole `[N, H, W]` stack
+  (one host copy, bounding-box crops, binary-searched epsilon).
+
+With torch installed the stack is also timed as a tensor, which is what
+`segment.run` actually hands over. Needs numpy + opencv; prints one JSON object:
+
+    python tests/bench/bench_polygons.py [--masks 64] [--width 3840] [--height 2160]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+RUNTIME_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if RUNTIME_DIR not in sys.path:
+    sys.path.insert(0, RUNTIME_DIR)
+
+from inference.loader import MAX_POLYGON_VERTICES, masks_to_polygons  # noqa: E402
+
+
+def legacy_mask_to_polygon(mask):
+    """The per-mask implementation `masks_to_polygons` replaced (reference)."""
+    import cv2
+    import numpy as np
+
+    m = np.asarray(mask)
+    if m.ndim > 2:
+        m = m.squeeze()
+    if m.dtype != np.uint8:
+        m = (m > 0).astype(np.uint8) * 255
+    contours, _ = cv2.findContours(m, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return []
+    contour = max(contours, key=cv2.contourArea)
+    peri = cv2.arcLength(contour, True)
+    eps = 0.01 * peri
+    approx = cv2.approxPolyDP(contour, eps, True)
+    while len(approx) > MAX_POLYGON_VERTICES and eps < peri:
+        eps *= 1.5
+        approx = cv2.approxPolyDP(contour, eps, True)
+    pts = approx.reshape(-1, 2)[:MAX_POLYGON_VERTICES]
+    return [{"x": float(pt[0]), "y": float(pt[1])} for pt in pts]
+
+
+def synthetic_masks(count, width, height, seed=0):
+    """`[count, height, width]` float32 0/1 masks, like ultralytics' `masks.data`."""
+    import cv2
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    stack = np.zeros((count, height, width), dtype=np.float32)
+    for i in range(count):
+        canvas = np.zeros((height, width), dtype=np.uint8)
+        cx, cy = int(rng.integers(0, width)), int(rng.integers(0, height))
+        radius = int(rng.integers(20, max(21, min(width, height) // 6)))
+        if i % 3 == 0:
+            # Spiky star: hundreds of raw contour vertices, exercises the cap.
+            spikes = 240
+            angles = np.linspace(0, 2 * np.pi, spikes * 2, endpoint=False)
+            radii = np.where(np.arange(spikes * 2) % 2 == 0, radius, radius * 0.6)
+            pts = np.stack([cx + radii * np.cos(angles), cy + radii * np.sin(angles)], axis=1)
+            cv2.fillPoly(canvas, [pts.astype(np.int32)], 1)
+        else:
+            axes = (radius, int(radius * rng.uniform(0.3, 1.0)))
+            cv2.ellipse(canvas, (cx, cy), axes, float(rng.uniform(0, 180)), 0, 360, 1, -1)
+        stack[i] = canvas
+    return stack
+
+
+def _time(fn, repeat):
+    best = float("inf")
+    out = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+def run(masks=64, width=3840, height=2160, repeat=3):
+    stack = synthetic_masks(masks, width, height)
+
+    legacy_s, legacy = _time(lambda: [legacy_mask_to_polygon(m) for m in stack], repeat)
+    batched_s, batched = _time(lambda: masks_to_polygons(stack), repeat)
+    report = {
+        "config": {"masks": masks, "frame": f"{width}x{height}"},
+        "legacy_ms": round(legacy_s * 1000, 2),
+        "batched_ms": round(batched_s * 1000, 2),
+        "speedup": round(legacy_s / batched_s, 2) if batched_s else None,
+        "legacy_mean_vertices": sum(map(len, legacy)) / max(1, len(legacy)),
+        "batched_mean_vertices": sum(map(len, batched)) / max(1, len(batched)),
+        "max_vertices": max((len(p) for p in batched), default=0),
+    }
+
+    try:
+        import torch
+    except Exception:  # noqa: BLE001 — torch is optional for this bench
+        return report
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    tensor = torch.from_numpy(stack).to(device)
+    legacy_t, _ = _time(
+        lambda: [legacy_mask_to_polygon(tensor[i].cpu().numpy()) for i in range(masks)], repeat
+    )
+    batched_t, _ = _time(lambda: masks_to_polygons(tensor), repeat)
+    report.update(
+        {
+            "tensor_device": device,
+            "tensor_legacy_ms": round(legacy_t * 1000, 2),
+            "tensor_batched_ms": round(batched_t * 1000, 2),
+        }
+    )
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--masks", type=int, default=64)
+    parser.add_argument("--width", type=int, default=3840)
+    parser.add_argument("--height", type=int, default=2160)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    print(json.dumps(run(args.masks, args.width, args.height, args.repeat), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,104 @@
+"""Benchmark: packed `application/x-vailabel-drafts` vs JSON response encoding.
+
+Builds a segmentation-shaped response (N polygon drafts of V vertices, the
+worst case the studio sees) plus a dense detection response, and reports
+payload bytes and best-of-R encode/decode times for `json.dumps`/`json.loads`
+against `wire.encode`/`wire.decode`, plus the time to build the detection
+drafts from columns (`loader.box_drafts`). Pure Python; prints one JSON object:
+
+    python tests/bench/bench_wire.py [--masks 48] [--vertices 150] [--boxes 300]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+RUNTIME_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if RUNTIME_DIR not in sys.path:
+    sys.path.insert(0, RUNTIME_DIR)
+
+from inference import wire  # noqa: E402
+from inference.loader import box_drafts, draft  # noqa: E402
+
+
+def segmentation_payload(masks, vertices, seed=0):
+    rng = random.Random(seed)
+    out = []
+    for i in range(masks):
+        poly = [{"x": rng.uniform(0, 3840), "y": rng.uniform(0, 2160)} for _ in range(vertices)]
+        item = draft("object", "polygon", poly, 1.0)
+        item["promptIndex"] = i
+        out.append(item)
+    return {"masks": out}
+
+
+def detection_columns(boxes, seed=0):
+    """Dense detections as the detectors' columnar result (see `detect._columns`)."""
+    rng = random.Random(seed)
+    columns = {"xyxy": [], "classId": [], "confidence": [], "labelName": []}
+    for _ in range(boxes):
+        x, y = rng.uniform(0, 3800), rng.uniform(0, 2100)
+        cls_id = rng.randrange(80)
+        columns["xyxy"].append([x, y, x + 40, y + 60])
+        columns["classId"].append(cls_id)
+        columns["confidence"].append(rng.random())
+        columns["labelName"].append(f"class{cls_id}")
+    return columns
+
+
+def detection_payload(boxes, seed=0):
+    return {"detections": box_drafts(detection_columns(boxes, seed))}
+
+
+def _best(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000, 3)
+
+
+def compare(payload, repeat):
+    as_json = json.dumps(payload).encode("utf-8")
+    packed = wire.encode(payload)
+    return {
+        "json_bytes": len(as_json),
+        "packed_bytes": len(packed),
+        "size_ratio": round(len(as_json) / len(packed), 2),
+        "json_encode_ms": _best(lambda: json.dumps(payload).encode("utf-8"), repeat),
+        "packed_encode_ms": _best(lambda: wire.encode(payload), repeat),
+        "json_decode_ms": _best(lambda: json.loads(as_json), repeat),
+        "packed_decode_ms": _best(lambda: wire.decode(packed), repeat),
+    }
+
+
+def run(masks=48, vertices=150, boxes=300, repeat=20):
+    columns = detection_columns(boxes)
+    return {
+        "segmentation": {"config": {"masks": masks, "vertices": vertices},
+                         **compare(segmentation_payload(masks, vertices), repeat)},
+        "detection": {
+            "config": {"boxes": boxes},
+            "drafts_ms": _best(lambda: box_drafts(columns), repeat),
+            **compare(detection_payload(boxes), repeat),
+        },
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--masks", type=int, default=48)
+    parser.add_argument("--vertices", type=int, default=150)
+    parser.add_argument("--boxes", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(run(args.masks, args.vertices, args.boxes, args.repeat), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,274 @@
+"""Load generator: mixed traffic against the runtime, backed by synthetic models.
+
+Drives the app at a chosen concurrency with no real weights, so scheduler,
+batching and cache changes can be measured offline on a plain Linux box. By
+default the app is built in-process (`app.build_app`) and requests go over
+httpx's ASGI transport, with VAILABEL_RT_SYNTHETIC=1 set for this process.
+With `--url` they go to a running runtime instead, which must have been
+started with VAILABEL_RT_SYNTHETIC=1 to accept `synthetic://` model paths.
+
+Traffic is a weighted mix of request kinds (`--mix`):
+
+- `detect`: `/inference/object-detection` (micro-batched across clients);
+- `batch`: `/inference/object-detection/batch` over `--batch-images` images;
+- `segment`: `/inference/segmentation` with a few box prompts;
+- `caption`: `/inference/caption`;
+- `copilot`: a `/copilot/turn` "detect and outline" turn. It uses the keyword
+  planner unless a local LLM server is running or `--llm-url` is given.
+
+Each request picks one of `--models` detectors, so more models than the cache
+holds (`VAILABEL_RT_MODEL_CACHE`, `VAILABEL_RT_RAM_BUDGET_MB`) exercises
+eviction. `--load-ms`, `--compute-ms`, `--work`, `--boxes` and `--mb` shape the
+fake models (see `inference/synthetic.py`). Every `--sample-s`, the model cache
+(from `/health`) and, in-process, this process's RSS are sampled.
+
+The report is one JSON object: per-kind and overall throughput, p50/p95/p99
+latency and error counts, plus the memory timeline.
+
+    python tests/bench/loadgen.py [--duration 20] [--concurrency 32]
+        [--mix detect=6,segment=2,caption=1,copilot=1] [--models 4] [--url URL]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+RUNTIME_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if RUNTIME_DIR not in sys.path:
+    sys.path.insert(0, RUNTIME_DIR)
+
+DEFAULT_MIX = "detect=6,segment=2,caption=1,copilot=1"
+KINDS = ("detect", "batch", "segment", "caption", "copilot")
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix: Dict[str, float] = {}
+    for part in text.split(","):
+        if not part.strip():
+            continue
+        kind, _, weight = part.partition("=")
+        kind = kind.strip()
+        if kind not in KINDS:
+            raise ValueError(f"unknown request kind '{kind}' (have: {', '.join(KINDS)})")
+        mix[kind] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("the mix needs at least one kind with a positive weight")
+    return mix
+
+
+def model_spec(name: str, args: argparse.Namespace, **extra: Any) -> str:
+    params = {
+        "load_ms": args.load_ms,
+        "compute_ms": args.compute_ms,
+        "work": args.work,
+        "boxes": args.boxes,
+        "mb": args.mb,
+        **extra,
+    }
+    return f"synthetic://{name}?" + "&".join(f"{k}={v}" for k, v in params.items())
+
+
+def make_images(directory: str, count: int) -> List[str]:
+    """Placeholder image files: synthetic models only check that they exist."""
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"frame_{i:04d}.jpg")
+        with open(path, "wb") as fh:
+            fh.write(b"\xff\xd8synthetic\xff\xd9")
+        paths.append(path)
+    return paths
+
+
+def request_for(kind: str, rng: random.Random, args, images, detectors) -> tuple:
+    """(path, json body) for one request of `kind`."""
+    image = rng.choice(images)
+    detector = rng.choice(detectors)
+    if kind == "detect":
+        return "/inference/object-detection", {"model_path": detector, "image_path": image}
+    if kind == "batch":
+        return "/inference/object-detection/batch", {
+            "model_path": detector,
+            "image_paths": rng.sample(images, min(len(images), args.batch_images)),
+        }
+    if kind == "segment":
+        boxes = [[10.0 * i, 10.0 * i, 10.0 * i + 50, 10.0 * i + 50] for i in range(3)]
+        return "/inference/segmentation", {
+            "model_path": args.segmenter,
+            "image_path": image,
+            "boxes": boxes,
+        }
+    if kind == "caption":
+        return "/inference/caption", {"model_path": args.captioner, "image_path": image}
+    item = {"id": "item-1", "projectId": "p1", "path": image}
+    return "/copilot/turn", {
+        "payload": {"itemId": "item-1", "projectId": "p1",
+                    "message": "find all class1 and outline them"},
+        "context": {
+            "item": item,
+            "detectorModelPath": detector,
+            "detectorClassNames": [f"class{i}" for i in range(8)],
+            "segmentationModelPath": args.segmenter,
+        },
+        "llmSettings": {"baseUrl": args.llm_url} if args.llm_url else None,
+    }
+
+
+def _rss_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/statm", encoding="ascii") as fh:
+            pages = int(fh.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _summary(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    ms = sorted(x * 1000 for x in latencies)
+
+    def pct(q: float) -> Optional[float]:
+        return round(ms[min(len(ms) - 1, int(q * len(ms)))], 2) if ms else None
+
+    return {
+        "requests": len(ms),
+        "errors": errors,
+        "requests_per_s": round(len(ms) / elapsed, 1) if elapsed else None,
+        "p50_ms": pct(0.5),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+    }
+
+
+async def drive(client, args, images) -> Dict[str, Any]:
+    import httpx
+
+    mix = parse_mix(args.mix)
+    kinds, weights = list(mix), list(mix.values())
+    detectors = [model_spec(f"detector-{i}", args) for i in range(args.models)]
+    headers = {"authorization": f"Bearer {args.token}"} if args.token else {}
+    latencies: Dict[str, List[float]] = {kind: [] for kind in kinds}
+    errors: Dict[str, int] = {kind: 0 for kind in kinds}
+    error_samples: List[str] = []
+    timeline: List[Dict[str, Any]] = []
+    start = time.perf_counter()
+    deadline = start + args.duration
+
+    async def client_loop(index: int) -> None:
+        rng = random.Random(index)
+        while time.perf_counter() < deadline:
+            kind = rng.choices(kinds, weights)[0]
+            path, body = request_for(kind, rng, args, images, detectors)
+            began = time.perf_counter()
+            try:
+                response = await client.post(path, json=body, headers=headers)
+                ok = response.status_code == 200
+                detail = f"{path}: HTTP {response.status_code} {response.text[:200]}"
+            except httpx.HTTPError as exc:
+                ok, detail = False, f"{path}: {type(exc).__name__}: {exc}"
+            if ok:
+                latencies[kind].append(time.perf_counter() - began)
+            else:
+                errors[kind] += 1
+                if len(error_samples) < 5:
+                    error_samples.append(detail)
+
+    async def sampler() -> None:
+        while time.perf_counter() < deadline:
+            sample: Dict[str, Any] = {"t": round(time.perf_counter() - start, 2)}
+            if args.url is None:
+                sample["rss_mb"] = _rss_mb()
+            try:
+                cache = (await client.get("/health", headers=headers)).json()["model_cache"]
+                sample["cache_entries"] = len(cache.get("entries", []))
+                sample["cache_ram_mb"] = round(cache.get("ram_used_mb", 0.0), 1)
+            except (httpx.HTTPError, ValueError, KeyError):
+                pass
+            timeline.append(sample)
+            await asyncio.sleep(args.sample_s)
+
+    await asyncio.gather(sampler(), *(client_loop(i) for i in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    all_latencies = [x for values in latencies.values() for x in values]
+    return {
+        "config": {
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "mix": mix,
+            "models": args.models,
+            "load_ms": args.load_ms,
+            "compute_ms": args.compute_ms,
+            "work": args.work,
+            "boxes": args.boxes,
+            "mb": args.mb,
+            "target": args.url or "in-process",
+        },
+        "overall": _summary(all_latencies, sum(errors.values()), elapsed),
+        "by_kind": {kind: _summary(latencies[kind], errors[kind], elapsed) for kind in kinds},
+        "error_samples": error_samples,
+        "memory": timeline,
+    }
+
+
+async def run_async(args: argparse.Namespace) -> Dict[str, Any]:
+    import httpx
+
+    args.segmenter = model_spec("segmenter", args, masks=1, vertices=64)
+    args.captioner = model_spec("captioner", args, text_chars=200)
+    timeout = httpx.Timeout(args.timeout)
+    with tempfile.TemporaryDirectory() as tmp:
+        images = make_images(tmp, args.images)
+        if args.url:
+            async with httpx.AsyncClient(base_url=args.url, timeout=timeout) as client:
+                return await drive(client, args, images)
+        import app as runtime_app
+
+        os.environ["VAILABEL_RT_SYNTHETIC"] = "1"
+        app = runtime_app.build_app(token=args.token, models_dir="", log_dir="")
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://loadgen", timeout=timeout
+        ) as client:
+            return await drive(client, args, images)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=None, help="running runtime (default: in-process)")
+    parser.add_argument("--token", default="", help="bearer token of the runtime")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of load")
+    parser.add_argument("--concurrency", type=int, default=32, help="closed-loop clients")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="kind=weight,…")
+    parser.add_argument("--models", type=int, default=4, help="distinct detectors")
+    parser.add_argument("--images", type=int, default=64, help="distinct image paths")
+    parser.add_argument("--batch-images", dest="batch_images", type=int, default=16)
+    parser.add_argument("--load-ms", dest="load_ms", type=float, default=500.0)
+    parser.add_argument("--compute-ms", dest="compute_ms", type=float, default=20.0)
+    parser.add_argument("--work", choices=("sleep", "cpu"), default="sleep")
+    parser.add_argument("--boxes", type=int, default=20)
+    parser.add_argument("--mb", type=float, default=64.0, help="resident MB per model")
+    parser.add_argument("--sample-s", dest="sample_s", type=float, default=1.0)
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-request seconds")
+    parser.add_argument("--llm-url", dest="llm_url", default="", help="copilot LLM server")
+    parser.add_argument("--out", default="", help="also write the report here")
+    args = parser.parse_args()
+    try:
+        parse_mix(args.mix)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    report = asyncio.run(run_async(args))
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,207 @@
+"""Benchmark suite: the runtime's hot paths in one run, compared against a baseline.
+
+Runs every `bench_*.py` that needs no GPU or model weights. Each one is still
+runnable on its own:
+
+- `polygons`: `masks_to_polygons` on synthetic masks at several frame sizes;
+- `wire`: draft building and JSON vs packed encode/decode;
+- `copilot`: `qa.qa_findings` on a crowded image, `parse_label_list` and `parse_plan`;
+- `model_cache`: `ModelCache` under thread contention;
+- `app`: the FastAPI app end to end with a fake adapter under concurrent load;
+- `onnx`: ONNX Runtime vs torch, only when `--weights` (a `.pt` or `.onnx`) is given.
+
+A bench whose dependencies are missing is reported under `skipped`, not as a
+failure. Benches nest their inputs (sizes, counts, the fake adapter's
+`work_ms`, …) under a `config` key; the report is one JSON object with those
+and the measured metrics kept apart, each flattened to dotted names:
+
+    {"meta": {...}, "config": {"app.config.work_ms": 5.0, ...},
+     "results": {"polygons.1920x1080.batched_ms": 12.3, ...},
+     "skipped": {"onnx": "no --weights"}}
+
+With `--baseline` (an earlier report), every `*_ms` result (lower is better)
+and `*_per_s` result (higher is better) is checked against it. The run exits 1
+when one got worse by more than `--tolerance` (a fraction, default 0.25).
+Times under `--floor-ms` in both runs are too noisy to judge and are ignored.
+Counts, sizes and anything under `config` are reported but never compared.
+
+    python tests/bench/suite.py [--quick] [--only wire,copilot] [--out run.json]
+        [--baseline baseline.json] [--tolerance 0.25] [--weights yolov8n.pt]
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RUNTIME_DIR = os.path.dirname(os.path.dirname(BENCH_DIR))
+for path in (BENCH_DIR, RUNTIME_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from inference.loader import RuntimeDependencyError  # noqa: E402
+
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_FLOOR_MS = 0.05
+
+
+def _polygons(args):
+    import bench_polygons
+
+    sizes = [(640, 480), (1920, 1080)] + ([] if args.quick else [(3840, 2160)])
+    masks, repeat = (16, 1) if args.quick else (64, 3)
+    return {f"{w}x{h}": bench_polygons.run(masks, w, h, repeat) for w, h in sizes}
+
+
+def _wire(args):
+    import bench_wire
+
+    return bench_wire.run(repeat=5 if args.quick else 20)
+
+
+def _copilot(args):
+    import bench_copilot
+
+    return bench_copilot.run(boxes=300 if args.quick else 1000, repeat=1 if args.quick else 3)
+
+
+def _model_cache(args):
+    import bench_model_cache
+
+    return bench_model_cache.run(calls=500 if args.quick else 2000)
+
+
+def _app(args):
+    import bench_app
+
+    return bench_app.run(requests=100 if args.quick else 400)
+
+
+def _onnx(args):
+    if not args.weights:
+        raise _Skip("no --weights")
+    import bench_onnx
+
+    count = 8 if args.quick else 32
+    if args.weights.endswith(".onnx"):
+        return bench_onnx.run(None, args.weights, None, count)
+    return bench_onnx.run(args.weights, None, None, count)
+
+
+BENCHES = {
+    "polygons": _polygons,
+    "wire": _wire,
+    "copilot": _copilot,
+    "model_cache": _model_cache,
+    "app": _app,
+    "onnx": _onnx,
+}
+
+
+class _Skip(Exception):
+    pass
+
+
+def flatten(report, prefix="", config=False, _in_config=False):
+    """`{"a": {"b_ms": 1}}` -> `{"a.b_ms": 1}`, numbers only.
+
+    Values under a `config` key are a bench's inputs: they are left out, or are
+    the only ones kept with `config=True`.
+    """
+    out = {}
+    for key, value in report.items():
+        name = f"{prefix}{key}"
+        inside = _in_config or key == "config"
+        if isinstance(value, dict):
+            out.update(flatten(value, name + ".", config, inside))
+        elif inside == config and isinstance(value, (int, float)) and not isinstance(value, bool):
+            out[name] = value
+    return out
+
+
+def compare(current, baseline, tolerance=DEFAULT_TOLERANCE, floor_ms=DEFAULT_FLOOR_MS):
+    """Metrics in both runs that got worse by more than `tolerance`, worst first."""
+    regressions = []
+    for name, old in baseline.items():
+        new = current.get(name)
+        if new is None or not old:
+            continue
+        if name.endswith("_ms"):
+            if max(old, new) < floor_ms:
+                continue
+            change = (new - old) / old
+        elif name.endswith("_per_s"):
+            change = (old - new) / old
+        else:
+            continue
+        if change > tolerance:
+            regressions.append(
+                {"metric": name, "baseline": old, "current": new, "worse_by": round(change, 3)}
+            )
+    return sorted(regressions, key=lambda r: -r["worse_by"])
+
+
+def run(args):
+    names = [n.strip() for n in args.only.split(",")] if args.only else list(BENCHES)
+    unknown = [n for n in names if n not in BENCHES]
+    if unknown:
+        raise SystemExit(f"unknown bench: {', '.join(unknown)} (have: {', '.join(BENCHES)})")
+    config, results, skipped, seconds = {}, {}, {}, {}
+    for name in names:
+        start = time.perf_counter()
+        try:
+            report = BENCHES[name](args)
+            config.update(flatten(report, name + ".", config=True))
+            results.update(flatten(report, name + "."))
+        except _Skip as exc:
+            skipped[name] = str(exc)
+        except (ImportError, RuntimeDependencyError) as exc:
+            skipped[name] = f"missing dependency: {exc}"
+        seconds[name] = round(time.perf_counter() - start, 2)
+        print(f"{name}: {seconds[name]}s", file=sys.stderr)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count() or 0,
+            "quick": args.quick,
+            "seconds": seconds,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "config": config,
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", default="", help="comma-separated bench names")
+    parser.add_argument("--quick", action="store_true", help="smaller inputs, fewer repeats")
+    parser.add_argument("--out", default="", help="also write the report here")
+    parser.add_argument("--baseline", default="", help="earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--floor-ms", dest="floor_ms", type=float, default=DEFAULT_FLOOR_MS)
+    parser.add_argument("--weights", default="", help="detector .pt / .onnx for the onnx bench")
+    args = parser.parse_args()
+
+    report = run(args)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)["results"]
+        report["regressions"] = compare(
+            report["results"], baseline, args.tolerance, args.floor_ms
+        )
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    print(text)
+    return 1 if report.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,132 @@
+"""Auto-label job runner: dataset walk, NDJSON output and checkpointed resume.
+
+The per-chunk labeler is swapped for a fake, so this runs with a bare Python:
+`python -m unittest tests.test_autolabel` (cwd = runtime dir).
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import autolabel  # noqa: E402
+
+
+def fake_chunk(task, family, model_path, paths, config):
+    return [{"image_path": p, "detections": [{"name": os.path.basename(p)}]} for p in paths]
+
+
+class AutoLabelTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+        self.data = os.path.join(self.root, "data")
+        os.makedirs(os.path.join(self.data, "b"))
+        os.makedirs(os.path.join(self.data, "a"))
+        for rel in ("a/2.jpg", "a/1.png", "b/3.jpg", "b/notes.txt", "0.jpeg"):
+            open(os.path.join(self.data, rel), "wb").close()
+        self.out = os.path.join(self.root, "out", "labels.ndjson")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def spec(self, **config):
+        return {
+            "job_id": "j",
+            "task": "detect",
+            "model_path": "/m/yolo/x.pt",
+            "source": self.data,
+            "output_path": self.out,
+            "config": {"batch_size": 2, **config},
+        }
+
+    def read_out(self):
+        with open(self.out, "r", encoding="utf-8") as fh:
+            return [json.loads(line)["image_path"] for line in fh]
+
+    def test_directory_walk_is_sorted_and_filtered(self):
+        rels = [os.path.relpath(p, self.data) for p in autolabel.iter_images(self.data)]
+        self.assertEqual(rels, ["0.jpeg", os.path.join("a", "1.png"),
+                                os.path.join("a", "2.jpg"), os.path.join("b", "3.jpg")])
+
+    def test_manifest_resolves_relative_and_ndjson_entries(self):
+        manifest = os.path.join(self.data, "manifest.txt")
+        with open(manifest, "w", encoding="utf-8") as fh:
+            fh.write("# comment\na/1.png\n\n{\"image_path\": \"/abs/x.jpg\"}\n")
+        self.assertEqual(
+            list(autolabel.iter_images(manifest)),
+            [os.path.join(self.data, "a/1.png"), "/abs/x.jpg"],
+        )
+
+    def test_cancel_then_resume_writes_each_image_once(self):
+        progress = []
+        calls = {"n": 0}
+
+        def cancel_after_first_chunk():
+            return calls["n"] >= 1
+
+        def counting_chunk(*args):
+            calls["n"] += 1
+            return fake_chunk(*args)
+
+        with mock.patch.object(autolabel, "_label_chunk", counting_chunk):
+            autolabel.run(self.spec(), lambda p, m=None: progress.append(m),
+                          lambda line: None, cancel_after_first_chunk)
+        self.assertEqual(len(self.read_out()), 2)
+        self.assertEqual(progress[-1]["processed"], 2)
+
+        # A torn line past the checkpoint must be dropped on resume.
+        with open(self.out, "ab") as fh:
+            fh.write(b'{"image_path": "torn')
+
+        with mock.patch.object(autolabel, "_label_chunk", fake_chunk):
+            autolabel.run(self.spec(), lambda p, m=None: progress.append(m),
+                          lambda line: None, lambda: False)
+        paths = self.read_out()
+        self.assertEqual(paths, list(autolabel.iter_images(self.data)))
+        self.assertEqual(progress[-1]["processed"], 4)
+        self.assertEqual(progress[-1]["output_offset"], os.path.getsize(self.out))
+
+    def test_resume_false_starts_over(self):
+        with mock.patch.object(autolabel, "_label_chunk", fake_chunk):
+            autolabel.run(self.spec(), lambda p, m=None: None, lambda line: None, lambda: False)
+            autolabel.run(self.spec(resume=False), lambda p, m=None: None,
+                          lambda line: None, lambda: False)
+        self.assertEqual(len(self.read_out()), 4)
+
+    def test_resume_with_another_model_starts_over(self):
+        with mock.patch.object(autolabel, "_label_chunk", fake_chunk):
+            autolabel.run(self.spec(), lambda p, m=None: None, lambda line: None, lambda: False)
+            other = dict(self.spec(), model_path="/m/yolo/y.pt")
+            autolabel.run(other, lambda p, m=None: None, lambda line: None, lambda: False)
+            autolabel.run(self.spec(conf=0.6), lambda p, m=None: None,
+                          lambda line: None, lambda: False)
+        self.assertEqual(len(self.read_out()), 4)
+
+    def test_undecodable_image_is_isolated_in_the_batched_path(self):
+        seen = []
+
+        def predict_many(det, paths, conf, iou, columnar=False):
+            seen.append(list(paths))
+            if any(p.endswith("2.jpg") for p in paths):
+                raise OSError("cannot identify image file")
+            return [[] for _ in paths]
+
+        from inference import exported, onnxrt
+
+        paths = list(autolabel.iter_images(self.data))
+        with mock.patch.object(onnxrt, "_detector", lambda model_path: object()), \
+                mock.patch.object(exported, "predict_many", predict_many):
+            records = autolabel._label_chunk("detect", "onnx", "/m/x.onnx", paths, {})
+        self.assertEqual([r["image_path"] for r in records], paths)
+        self.assertEqual([bool(r.get("error")) for r in records], [False, False, True, False])
+        self.assertEqual(seen[0], paths)
+        self.assertEqual(len(seen), 1 + len(paths))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+"""Benchmark suite bookkeeping: flattening reports and the baseline comparison.
+
+Pure Python: `python -m unittest tests.test_bench_suite` (cwd = runtime dir).
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench"))
+
+import suite  # noqa: E402
+
+
+class SuiteTests(unittest.TestCase):
+    def test_flatten_keeps_numbers_under_dotted_names(self):
+        report = {"detection": {"boxes": 300, "json_ms": 3.5, "ok": True}, "frame": "4K"}
+        self.assertEqual(
+            suite.flatten(report, "wire."),
+            {"wire.detection.boxes": 300, "wire.detection.json_ms": 3.5},
+        )
+
+    def test_config_is_kept_apart_from_the_metrics(self):
+        report = {"config": {"work_ms": 5.0, "frame": "4K"}, "json": {"p50_ms": 7.0},
+                  "detection": {"config": {"boxes": 300}, "drafts_ms": 1.5}}
+        self.assertEqual(
+            suite.flatten(report, "app."), {"app.json.p50_ms": 7.0, "app.detection.drafts_ms": 1.5}
+        )
+        self.assertEqual(
+            suite.flatten(report, "app.", config=True),
+            {"app.config.work_ms": 5.0, "app.detection.config.boxes": 300},
+        )
+
+    def test_compare_flags_only_regressions_beyond_tolerance(self):
+        baseline = {
+            "a.slow_ms": 10.0,
+            "a.fine_ms": 10.0,
+            "a.faster_ms": 10.0,
+            "a.tiny_ms": 0.01,
+            "b.requests_per_s": 100.0,
+            "b.boxes": 300,
+            "c.gone_ms": 5.0,
+        }
+        current = {
+            "a.slow_ms": 14.0,
+            "a.fine_ms": 12.0,
+            "a.faster_ms": 5.0,
+            "a.tiny_ms": 0.04,
+            "b.requests_per_s": 50.0,
+            "b.boxes": 9000,
+        }
+        regressions = suite.compare(current, baseline, tolerance=0.25, floor_ms=0.05)
+        self.assertEqual(
+            [(r["metric"], r["worse_by"]) for r in regressions],
+            [("b.requests_per_s", 0.5), ("a.slow_ms", 0.4)],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+"""Detection post-processing in `inference/detect.py`, against fake `Results`.
+
+No ultralytics/torch needed: `python -m unittest tests.test_detect`
+(cwd = runtime dir).
+"""
+
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference import detect  # noqa: E402
+
+
+class FakeData:
+    """Stands in for a `[N, 6]` tensor; counts host copies."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.copies = 0
+
+    def cpu(self):
+        self.copies += 1
+        return self
+
+    def numpy(self):
+        return self
+
+    def tolist(self):
+        return [list(r) for r in self.rows]
+
+
+def fake_result(rows, names=None):
+    boxes = SimpleNamespace(data=FakeData(rows))
+    return SimpleNamespace(names=names or {0: "person", 1: "car"}, boxes=boxes)
+
+
+class ColumnsTests(unittest.TestCase):
+    def test_columns_come_from_one_host_copy(self):
+        res = fake_result([[1, 2, 3, 4, 0.9, 0], [5, 6, 7, 8, 0.5, 1], [0, 0, 1, 1, 0.1, 7]])
+        cols = detect._columns(res)
+        self.assertEqual(res.boxes.data.copies, 1)
+        self.assertEqual(cols["xyxy"][1], [5, 6, 7, 8])
+        self.assertEqual(cols["classId"], [0, 1, 7])
+        self.assertEqual(cols["confidence"], [0.9, 0.5, 0.1])
+        self.assertEqual(cols["labelName"], ["person", "car", "7"])
+
+    def test_drafts_match_columns(self):
+        drafts = detect._detections(fake_result([[1, 2, 3, 4, 0.9, 1]]))
+        self.assertEqual(len(drafts), 1)
+        self.assertEqual(drafts[0]["name"], "car")
+        self.assertEqual(drafts[0]["classId"], 1)
+        self.assertEqual(drafts[0]["coordinates"], [{"x": 1.0, "y": 2.0}, {"x": 3.0, "y": 4.0}])
+
+    def test_tracked_boxes_read_conf_and_class_from_the_tail(self):
+        cols = detect._columns(fake_result([[1, 2, 3, 4, 42, 0.8, 0]]))
+        self.assertEqual((cols["classId"], cols["confidence"]), ([0], [0.8]))
+
+    def test_no_boxes_gives_empty_columns(self):
+        cols = detect._columns(SimpleNamespace(names={}, boxes=None))
+        self.assertEqual(cols, {"xyxy": [], "classId": [], "confidence": [], "labelName": []})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+"""Job event stream: the thread-to-asyncio broker and `/events` coalescing.
+
+Needs fastapi for the stream test (driven directly: the stream never ends, so
+a buffering test client can't consume it):
+`python -m unittest tests.test_events` (cwd = runtime dir).
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import job_manager  # noqa: E402
+from services.events import Broker  # noqa: E402
+
+try:
+    from routers import events as events_router
+except ImportError:  # pragma: no cover - optional in a bare runtime
+    events_router = None
+
+
+class BrokerTests(unittest.TestCase):
+    def test_thread_publishes_reach_the_loop_and_slow_readers_drop_oldest(self):
+        broker = Broker()
+
+        async def scenario():
+            with broker.subscribe("t", maxsize=2) as sub:
+                worker = threading.Thread(
+                    target=lambda: [broker.publish("t", i) for i in range(5)]
+                )
+                worker.start()
+                worker.join()
+                await asyncio.sleep(0.05)
+                return sub.drain(), sub.dropped
+
+        items, dropped = asyncio.run(scenario())
+        self.assertEqual((items, dropped), ([3, 4], 3))
+        self.assertFalse(broker.has_subscribers("t"))
+        broker.publish("t", "nobody listening")
+
+
+class ChattyRunner:
+    """Reports many progress updates in a burst, then finishes."""
+
+    def __init__(self):
+        self.go = threading.Event()
+
+    def __call__(self, job_id, spec, log_path):
+        self.go.wait(5)
+        for step in range(1, 51):
+            job_manager._set_progress(job_id, step / 50, {"step": step})
+        job_manager._finish(job_id, lambda line: None)
+
+
+@unittest.skipIf(events_router is None, "fastapi not installed")
+class EventStreamTests(unittest.TestCase):
+    def setUp(self):
+        job_manager.configure("")
+
+    def _collect(self, runner):
+        async def scenario():
+            stream = events_router._job_events(["ev-1"])
+            batches, snapshot = [], None
+            try:
+                async for message in stream:
+                    if message.startswith(":"):
+                        continue
+                    event, _, data = message.rpartition("data: ")
+                    data = json.loads(data)
+                    if event.startswith("event: snapshot"):
+                        snapshot = data
+                        # Unrelated jobs must not show up in this stream.
+                        job_manager.start_autolabel_job({"job_id": "other"})
+                        runner.go.set()
+                        continue
+                    batches.append(data)
+                    if data[-1].get("status") == "completed":
+                        return snapshot, batches
+            finally:
+                await stream.aclose()
+
+        return asyncio.run(asyncio.wait_for(scenario(), 10))
+
+    def test_deltas_are_filtered_and_coalesced(self):
+        runner = ChattyRunner()
+        env = {"VAILABEL_RT_EVENTS_INTERVAL_S": "0.2"}
+        with mock.patch.dict(job_manager._RUNNERS, {"training": runner}), \
+                mock.patch.dict(os.environ, env):
+            job_manager.start_job({"job_id": "ev-1"})
+            snapshot, batches = self._collect(runner)
+        self.assertEqual([job["job_id"] for job in snapshot], ["ev-1"])
+        self.assertEqual({d["job_id"] for batch in batches for d in batch}, {"ev-1"})
+        self.assertLess(len(batches), 10)  # 50 updates coalesced
+        self.assertEqual(batches[-1][-1]["progress"], 1.0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+"""Exported-detector backends (ONNX Runtime, OpenVINO) on a tiny synthetic graph.
+
+The graph ignores its pixels and emits a fixed YOLO-layout head, so this checks
+letterbox mapping, decode, NMS and metadata handling without real weights.
+Needs numpy, opencv, onnx and onnxruntime (plus openvino for its tests):
+`python -m unittest tests.test_exported` (cwd = runtime dir).
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference import onnxrt, openvino_ir  # noqa: E402
+from inference.loader import ModelCache, infer_family  # noqa: E402
+
+try:
+    import cv2  # noqa: F401
+    import numpy as np
+    import onnx
+    import onnxruntime  # noqa: F401
+    from onnx import TensorProto, helper
+except ImportError:  # pragma: no cover - optional in a bare runtime
+    onnx = None
+
+try:
+    import openvino as ov
+except ImportError:  # pragma: no cover - optional in a bare runtime
+    ov = None
+
+# [4 + nc, anchors]: cx, cy, w, h, score(cat), score(dog).
+ANCHORS = [
+    [32, 22, 20, 20, 0.9, 0.0],  # kept
+    [33, 22, 20, 20, 0.8, 0.0],  # same cat, suppressed by NMS
+    [10, 10, 4, 4, 0.0, 0.1],  # dog below conf
+]
+NAMES = {0: "cat", 1: "dog"}
+
+
+def write_model(path, head, names, imgsz=64):
+    """A graph mapping `images[1, 3, imgsz, imgsz]` to the constant `head`."""
+    head = np.asarray(head, dtype=np.float32)
+    const = helper.make_tensor("head", TensorProto.FLOAT, head.shape, head.flatten().tolist())
+    graph = helper.make_graph(
+        [helper.make_node("Constant", [], ["output0"], value=const)],
+        "fake_head",
+        [helper.make_tensor_value_info("images", TensorProto.FLOAT, [1, 3, imgsz, imgsz])],
+        [helper.make_tensor_value_info("output0", TensorProto.FLOAT, list(head.shape))],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+    model.ir_version = 8
+    for key, value in {"task": "detect", "names": str(names), "imgsz": str([imgsz, imgsz])}.items():
+        entry = model.metadata_props.add()
+        entry.key, entry.value = key, value
+    onnx.save(model, path)
+
+
+@unittest.skipIf(onnx is None, "numpy/opencv/onnx/onnxruntime not installed")
+class OnnxDetectorTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.model_path = os.path.join(self._tmp.name, "yolo", "best.onnx")
+        os.makedirs(os.path.dirname(self.model_path))
+        write_model(self.model_path, [np.asarray(ANCHORS).T], NAMES)
+        self.image_path = os.path.join(self._tmp.name, "wide.png")
+        cv2.imwrite(self.image_path, np.zeros((64, 128, 3), dtype=np.uint8))
+        patcher = mock.patch.object(onnxrt, "CACHE", ModelCache())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_onnx_paths_resolve_to_the_onnx_family(self):
+        self.assertEqual(infer_family(self.model_path), "onnx")
+        self.assertEqual(infer_family(self.model_path, explicit="yolo"), "yolo")
+
+    def test_letterboxed_boxes_map_back_to_image_pixels(self):
+        req = SimpleNamespace(model_path=self.model_path, image_path=self.image_path,
+                              conf=None, iou=None, columnar=True)
+        columns = onnxrt.run(req)["columns"]
+        self.assertEqual(columns["labelName"], ["cat"])
+        # Net box (22, 12, 42, 32); gain 0.5, 16 px of top padding.
+        self.assertEqual([round(v, 3) for v in columns["xyxy"][0]], [44.0, 0.0, 84.0, 32.0])
+        self.assertAlmostEqual(columns["confidence"][0], 0.9, places=5)
+
+    def test_batch_flags_missing_images(self):
+        progress = []
+        req = SimpleNamespace(model_path=self.model_path, conf=None, iou=None, columnar=False,
+                              batch_size=None, image_paths=[self.image_path, "/no/such.jpg"],
+                              on_progress=lambda done, total: progress.append((done, total)))
+        results = onnxrt.run_batch(req)["results"]
+        self.assertEqual(results[0]["detections"][0]["classId"], 0)
+        self.assertIn("not found", results[1]["error"])
+        self.assertEqual(progress, [(1, 1)])
+
+
+
+@unittest.skipIf(onnx is None or ov is None, "numpy/opencv/onnx/openvino not installed")
+class OpenVinoDetectorTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        onnx_path = os.path.join(self._tmp.name, "best.onnx")
+        write_model(onnx_path, [np.asarray(ANCHORS).T], NAMES)
+        self.model_dir = os.path.join(self._tmp.name, "openvino", "best_openvino_model")
+        os.makedirs(self.model_dir)
+        ov.save_model(ov.convert_model(onnx_path), os.path.join(self.model_dir, "best.xml"))
+        with open(os.path.join(self.model_dir, "metadata.yaml"), "w", encoding="utf-8") as fh:
+            fh.write("task: detect\nimgsz: [64, 64]\nnames:\n  0: cat\n  1: dog\n")
+        self.image_path = os.path.join(self._tmp.name, "wide.png")
+        cv2.imwrite(self.image_path, np.zeros((64, 128, 3), dtype=np.uint8))
+        patcher = mock.patch.object(openvino_ir, "CACHE", ModelCache())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_export_dirs_and_xml_resolve_to_the_openvino_family(self):
+        self.assertEqual(infer_family(self.model_dir), "openvino")
+        self.assertEqual(infer_family(os.path.join(self.model_dir, "best.xml")), "openvino")
+
+    def test_async_queue_matches_the_onnx_results(self):
+        req = SimpleNamespace(model_path=self.model_dir, conf=None, iou=None, columnar=True,
+                              batch_size=None, image_paths=[self.image_path] * 5)
+        results = openvino_ir.run_batch(req)["results"]
+        self.assertEqual(len(results), 5)
+        for entry in results:
+            self.assertEqual(entry["columns"]["labelName"], ["cat"])
+            self.assertEqual([round(v, 3) for v in entry["columns"]["xyxy"][0]],
+                             [44.0, 0.0, 84.0, 32.0])
+
+    def test_unknown_performance_hint_is_rejected(self):
+        req = SimpleNamespace(model_path=self.model_dir, image_path=self.image_path,
+                              perf_hint="fastest")
+        with self.assertRaises(ValueError):
+            openvino_ir.run(req)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,231 @@
+"""Export jobs (`services/exports.py` + `job_manager`) and the artifact store.
+
+The exporter is a fake, so this needs nothing beyond the runtime itself:
+`python -m unittest tests.test_exports` (cwd = runtime dir).
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from export import store  # noqa: E402
+from services import exports, job_manager  # noqa: E402
+
+
+class FakeExporter:
+    """Writes `<output_path>` (default: next to the weights) and counts calls."""
+
+    def __init__(self, gate=None):
+        self.calls = 0
+        self.gate = gate
+
+    def __call__(self, req):
+        self.calls += 1
+        if self.gate is not None:
+            self.gate.wait(5)
+        out = req.output_path or os.path.splitext(req.model_path)[0] + ".onnx"
+        with open(out, "w", encoding="utf-8") as fh:
+            fh.write(f"graph of {req.model_path} {sorted(req.opts.items())}")
+        return {"ok": True, "output_path": out, "error": None}
+
+
+class ExportCacheTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = self._tmp.name
+        self.weights = os.path.join(self.dir, "best.pt")
+        with open(self.weights, "wb") as fh:
+            fh.write(b"weights-v1")
+        self.fake = FakeExporter()
+        patcher = mock.patch.dict(exports.EXPORTERS, {"onnx": (self.fake, "onnx")})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        store.configure(os.path.join(self.dir, "models"))
+        self.addCleanup(store.configure, "")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _spec(self, out, **extra):
+        spec = {"model_path": self.weights, "format": "onnx", "output_path": out, "opts": {}}
+        spec.update(extra)
+        return spec
+
+    def _run(self, spec):
+        return exports.run(spec, lambda p, m=None: None, lambda line: None, lambda: False)
+
+    def test_repeat_export_reuses_the_artifact(self):
+        first = self._run(self._spec(os.path.join(self.dir, "a.onnx")))
+        self.assertEqual((first["ok"], first["cached"]), (True, False))
+        again = self._run(self._spec(os.path.join(self.dir, "b.onnx")))
+        self.assertTrue(again["cached"])
+        self.assertEqual(self.fake.calls, 1)
+        with open(again["output_path"], encoding="utf-8") as a, open(first["output_path"]) as b:
+            self.assertEqual(a.read(), b.read())
+
+    def test_concurrent_identical_exports_run_once_and_leave_no_lock(self):
+        gate = threading.Event()
+        self.fake.gate = gate
+        spec = self._spec(os.path.join(self.dir, "a.onnx"))
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self._run(spec)))
+                   for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        gate.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(self.fake.calls, 1)
+        self.assertEqual(sorted(r["cached"] for r in results), [False, True])
+        self.assertEqual(exports._inflight, {})
+
+    def test_key_covers_weights_content_and_opts(self):
+        self._run(self._spec(os.path.join(self.dir, "a.onnx")))
+        self._run(self._spec(os.path.join(self.dir, "a.onnx"), opts={"imgsz": 320}))
+        self.assertEqual(self.fake.calls, 2)
+        with open(self.weights, "wb") as fh:
+            fh.write(b"weights-v2-retrained")
+        self._run(self._spec(os.path.join(self.dir, "a.onnx")))
+        self.assertEqual(self.fake.calls, 3)
+
+    def test_hit_is_a_hardlink_and_survives_the_original(self):
+        first = self._run(self._spec(os.path.join(self.dir, "a.onnx")))
+        os.remove(first["output_path"])
+        again = self._run(self._spec(os.path.join(self.dir, "b.onnx")))
+        self.assertTrue(again["cached"])
+        self.assertEqual(os.stat(again["output_path"]).st_nlink, 2)  # + the store's copy
+
+    def test_upgraded_toolchain_is_a_new_entry(self):
+        self._run(self._spec(""))
+        with mock.patch.object(store, "toolchain", lambda fmt: {"ultralytics": "99.0"}):
+            self.assertIsNone(exports.lookup(self._spec("")))
+
+    def test_extras_such_as_reports_are_served_back(self):
+        plain = self.fake
+
+        def reporting(req):
+            return dict(plain(req), report={"map50_95_drop": 0.004})
+
+        with mock.patch.dict(exports.EXPORTERS, {"onnx": (reporting, "onnx")}):
+            self._run(self._spec(""))
+        self.assertEqual(exports.lookup(self._spec(""))["report"], {"map50_95_drop": 0.004})
+
+    def test_without_a_models_dir_nothing_is_stored(self):
+        store.configure("")
+        self._run(self._spec(""))
+        self._run(self._spec(""))
+        self.assertEqual(self.fake.calls, 2)
+
+    def test_job_runs_then_repeat_completes_on_start(self):
+        log_path = os.path.join(self.dir, "export.log")
+        spec = self._spec(os.path.join(self.dir, "a.onnx"), job_id="exp-1", log_path=log_path)
+        row = job_manager.start_export_job(spec)
+        self.assertEqual(row["kind"], "export")
+        deadline = time.time() + 5
+        while job_manager.get_job("exp-1")["status"] == "running" and time.time() < deadline:
+            time.sleep(0.02)
+        job = job_manager.get_job("exp-1")
+        self.assertEqual(job["status"], "completed")
+        self.assertTrue(job["result"]["ok"])
+        self.assertIn("exp-1", [j["job_id"] for j in job_manager.list_jobs(kind="export")])
+
+        row = job_manager.start_export_job(dict(spec, job_id="exp-2"))
+        self.assertEqual(row["status"], "completed")
+        self.assertTrue(row["result"]["cached"])
+        self.assertEqual(self.fake.calls, 1)
+
+    def test_stopped_job_is_canceled_and_not_recorded(self):
+        self.fake.gate = threading.Event()
+        spec = self._spec(os.path.join(self.dir, "a.onnx"), job_id="exp-c")
+        job_manager.start_export_job(spec)
+        job_manager.stop_job("exp-c")
+        self.fake.gate.set()
+        deadline = time.time() + 5
+        while job_manager.get_job("exp-c")["status"] == "running" and time.time() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(job_manager.get_job("exp-c")["status"], "canceled")
+        self.assertIsNone(exports.lookup(spec))
+
+class ArtifactStoreTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _artifact(self, name, size):
+        path = os.path.join(self.dir, name)
+        with open(path, "wb") as fh:
+            fh.write(b"x" * size)
+        return path
+
+    def test_least_recently_used_entries_are_collected_by_size(self):
+        artifacts = store.ArtifactStore(os.path.join(self.dir, "cache"), budget_bytes=250)
+        for key in ("a", "b"):
+            artifacts.put(key, self._artifact(f"{key}.onnx", 100), {})
+            time.sleep(0.01)
+        self.assertIsNotNone(artifacts.get("a"))  # "a" is now the most recent
+        artifacts.put("c", self._artifact("c.onnx", 100), {})
+        self.assertEqual(sorted(k for k, _, _ in artifacts.entries()), ["a", "c"])
+        self.assertEqual(artifacts.stats()["bytes"], 200)
+
+    def test_orphans_are_swept_but_live_staging_is_kept(self):
+        root = os.path.join(self.dir, "cache")
+        artifacts = store.ArtifactStore(root, budget_bytes=0)
+        artifacts.put("good", self._artifact("good.onnx", 10), {})
+        stale, live, broken = (os.path.join(root, n) for n in (".staging-old", ".staging-new", "k"))
+        for path in (stale, live, broken):
+            os.makedirs(path)
+        os.utime(stale, (time.time() - 2 * 3600,) * 2)
+        store.ArtifactStore(root, budget_bytes=0)
+        self.assertEqual(sorted(os.listdir(root)), [".staging-new", "good"])
+
+    def test_ir_directories_round_trip(self):
+        artifacts = store.ArtifactStore(os.path.join(self.dir, "cache"), budget_bytes=0)
+        ir = os.path.join(self.dir, "best_openvino_model")
+        os.makedirs(ir)
+        for name in ("best.xml", "best.bin"):
+            with open(os.path.join(ir, name), "w", encoding="utf-8") as fh:
+                fh.write(name)
+        artifacts.put("k", ir, {"result": {}})
+        out = artifacts.get("k", os.path.join(self.dir, "elsewhere", "model_openvino_model"))
+        self.assertEqual(sorted(os.listdir(out["output_path"])), ["best.bin", "best.xml"])
+
+    def test_file_hit_at_an_existing_directory_lands_inside_it(self):
+        artifacts = store.ArtifactStore(os.path.join(self.dir, "cache"), budget_bytes=0)
+        artifacts.put("k", self._artifact("best.onnx", 10), {})
+        folder = os.path.join(self.dir, "exports")
+        os.makedirs(folder)
+        keep = self._artifact(os.path.join("exports", "notes.txt"), 3)
+        out = artifacts.get("k", folder)
+        self.assertEqual(out["output_path"], os.path.join(folder, "best.onnx"))
+        self.assertTrue(os.path.isfile(keep))
+        self.assertEqual(os.path.getsize(out["output_path"]), 10)
+
+    def test_ir_hit_never_replaces_a_file(self):
+        artifacts = store.ArtifactStore(os.path.join(self.dir, "cache"), budget_bytes=0)
+        ir = os.path.join(self.dir, "best_openvino_model")
+        os.makedirs(ir)
+        artifacts.put("k", ir, {})
+        target = self._artifact("model_openvino_model", 3)
+        with self.assertRaises(FileExistsError):
+            artifacts.get("k", target)
+        self.assertEqual(os.path.getsize(target), 3)
+
+    def test_opts_are_normalized(self):
+        self.assertEqual(
+            store.entry_key("sha", "onnx", {"imgsz": 640, "half": None}),
+            store.entry_key("sha", "onnx", {"imgsz": [640, 640]}),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
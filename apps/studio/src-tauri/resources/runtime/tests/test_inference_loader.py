@@ -0,0 +1,434 @@
+"""Shared primitives in `inference/loader.py` (batching, model + image caches).
+
+Pure threading — no torch/ultralytics — so this runs with a bare Python:
+`python -m unittest tests.test_inference_loader` (cwd = runtime dir).
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference import loader  # noqa: E402
+from inference.loader import (  # noqa: E402
+    ImageCache,
+    MicroBatcher,
+    ModelCache,
+    estimate_footprint,
+)
+
+
+def run_concurrently(fn, args):
+    """Call fn(arg) for every arg on its own thread; return results in order."""
+    results = [None] * len(args)
+    errors = [None] * len(args)
+    start = threading.Barrier(len(args))
+
+    def worker(i, arg):
+        start.wait()
+        try:
+            results[i] = fn(arg)
+        except Exception as exc:  # noqa: BLE001
+            errors[i] = exc
+
+    threads = [threading.Thread(target=worker, args=(i, a)) for i, a in enumerate(args)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(10)
+    return results, errors
+
+
+class MicroBatcherTests(unittest.TestCase):
+    def test_concurrent_submits_share_batches_and_keep_order(self):
+        sizes = []
+
+        def square_all(items):
+            sizes.append(len(items))
+            return [i * i for i in items]
+
+        shared = MicroBatcher(square_all, max_batch=16, window_s=0.05)
+        results, errors = run_concurrently(shared.submit, list(range(12)))
+        self.assertEqual(errors, [None] * 12)
+        self.assertEqual(results, [i * i for i in range(12)])
+        self.assertEqual(sum(sizes), 12)
+        self.assertLess(len(sizes), 12)
+
+    def test_batches_never_exceed_max(self):
+        sizes = []
+
+        def echo(items):
+            sizes.append(len(items))
+            return list(items)
+
+        shared = MicroBatcher(echo, max_batch=3, window_s=0.02)
+        results, _ = run_concurrently(shared.submit, list(range(10)))
+        self.assertEqual(results, list(range(10)))
+        self.assertTrue(all(n <= 3 for n in sizes))
+
+    def test_failing_item_only_fails_its_own_caller(self):
+        def picky(items):
+            if 2 in items:
+                raise ValueError("bad item")
+            return list(items)
+
+        shared = MicroBatcher(picky, max_batch=8, window_s=0.05)
+        results, errors = run_concurrently(shared.submit, [1, 2, 3])
+        self.assertEqual((results[0], results[2]), (1, 3))
+        self.assertEqual((errors[0], errors[2]), (None, None))
+        self.assertIsInstance(errors[1], ValueError)
+        self.assertEqual(shared.submit(7), 7)
+
+    def test_registry_disabled_when_max_is_one(self):
+        with mock.patch.dict(os.environ, {"VAILABEL_RT_BATCH_MAX": "1"}):
+            self.assertIsNone(loader.batcher("k-disabled", lambda items: items))
+        with mock.patch.dict(os.environ, {"VAILABEL_RT_BATCH_MAX": "4"}):
+            first = loader.batcher("k-enabled", lambda items: items)
+            self.assertIs(first, loader.batcher("k-enabled", lambda items: items))
+
+    def test_batchers_leave_with_their_model(self):
+        cache = ModelCache(capacity=1, ram_budget=0, vram_budget=0,
+                           on_evict=loader.drop_batchers)
+        with mock.patch.dict(os.environ, {"VAILABEL_RT_BATCH_MAX": "4"}):
+            mine = loader.batcher("detect:yolo:/m/a.pt:None:None:detections", list)
+            other = loader.batcher("detect:yolo:/m/a.pt2:None:None:detections", list)
+            cache.get_or_load("detect:yolo:/m/a.pt", lambda: "a")
+            cache.get_or_load("detect:yolo:/m/b.pt", lambda: "b")  # evicts a
+            self.assertNotIn("detect:yolo:/m/a.pt:None:None:detections", loader._BATCHERS)
+            self.assertIs(other, loader.batcher("detect:yolo:/m/a.pt2:None:None:detections", list))
+            self.assertIsNot(mine, loader.batcher("detect:yolo:/m/a.pt:None:None:detections", list))
+
+
+class FakeTensor:
+    def __init__(self, numel, device="cpu", element_size=4):
+        self._numel = numel
+        self._element_size = element_size
+        self.device = SimpleNamespace(type=device)
+
+    def numel(self):
+        return self._numel
+
+    def element_size(self):
+        return self._element_size
+
+
+class FakeModule:
+    def __init__(self, *tensors):
+        self._tensors = tensors
+
+    def parameters(self):
+        return iter(self._tensors)
+
+    def buffers(self):
+        return iter(())
+
+
+MB = 1024 * 1024
+
+
+def sized(ram_mb=0, vram_mb=0):
+    """A cache entry whose estimate is exactly (ram_mb, vram_mb)."""
+    return SimpleNamespace(size=(ram_mb * MB, vram_mb * MB))
+
+
+def by_size(model):
+    return model.size
+
+
+class ModelCacheBudgetTests(unittest.TestCase):
+    def test_footprint_walks_wrappers_and_tuples_by_device(self):
+        yolo = SimpleNamespace(model=FakeModule(FakeTensor(1000), FakeTensor(500, "cuda", 2)))
+        vlm = (FakeModule(FakeTensor(10, "cuda")), "processor", "cuda")
+        self.assertEqual(estimate_footprint(yolo), (4000, 1000))
+        self.assertEqual(estimate_footprint(vlm), (0, 40))
+        self.assertEqual(estimate_footprint(object()), (0, 0))
+
+    def test_evicts_lru_until_ram_budget_fits(self):
+        cache = ModelCache(capacity=100, ram_budget=100 * MB, vram_budget=0, estimate=by_size)
+        for name in ("a", "b", "c"):
+            cache.get_or_load(name, lambda: sized(ram_mb=30))
+        cache.get_or_load("a", lambda: self.fail("a should still be cached"))
+        cache.get_or_load("big", lambda: sized(ram_mb=50))
+        # b was least recently used, then c: evicting both gets under budget.
+        self.assertEqual(cache.loaded_keys(), ["a", "big"])
+
+    def test_vram_budget_is_independent_of_ram(self):
+        cache = ModelCache(capacity=100, ram_budget=0, vram_budget=10 * MB, estimate=by_size)
+        cache.get_or_load("cpu-1", lambda: sized(ram_mb=500))
+        cache.get_or_load("gpu-1", lambda: sized(vram_mb=6))
+        cache.get_or_load("gpu-2", lambda: sized(vram_mb=6))
+        self.assertEqual(cache.loaded_keys(), ["gpu-2"])
+
+    def test_oversized_entry_is_kept_alone(self):
+        cache = ModelCache(capacity=100, ram_budget=10 * MB, vram_budget=0, estimate=by_size)
+        cache.get_or_load("small", lambda: sized(ram_mb=1))
+        model = cache.get_or_load("huge", lambda: sized(ram_mb=50))
+        self.assertEqual(cache.loaded_keys(), ["huge"])
+        self.assertIs(cache.get_or_load("huge", lambda: None), model)
+
+    def test_capacity_still_caps_entry_count(self):
+        cache = ModelCache(capacity=2, ram_budget=0, vram_budget=0, estimate=by_size)
+        for name in ("a", "b", "c"):
+            cache.get_or_load(name, lambda: sized())
+        self.assertEqual(cache.loaded_keys(), ["b", "c"])
+
+    def test_stats_report_usage_against_budget(self):
+        cache = ModelCache(capacity=4, ram_budget=100 * MB, vram_budget=20 * MB, estimate=by_size)
+        cache.get_or_load("m", lambda: sized(ram_mb=3, vram_mb=5))
+        stats = cache.stats()
+        self.assertEqual(
+            stats["entries"], [{"key": "m", "ram_mb": 3.0, "vram_mb": 5.0, "pinned": False}]
+        )
+        self.assertEqual(stats["ram_used_mb"], 3.0)
+        self.assertEqual(stats["vram_budget_mb"], 20.0)
+
+
+class ModelCachePinTests(unittest.TestCase):
+    def test_pinned_entries_survive_eviction(self):
+        cache = ModelCache(capacity=2, ram_budget=0, vram_budget=0, estimate=by_size)
+        cache.get_or_load("detector", lambda: sized())
+        self.assertTrue(cache.pin("detector"))
+        for name in ("caption-1", "caption-2", "caption-3"):
+            cache.get_or_load(name, lambda: sized())
+        self.assertEqual(cache.loaded_keys(), ["detector", "caption-3"])
+
+    def test_unpin_reapplies_budget_and_unload_drops_pinned(self):
+        cache = ModelCache(capacity=1, ram_budget=0, vram_budget=0, estimate=by_size)
+        cache.get_or_load("a", lambda: sized())
+        cache.pin("a")
+        cache.get_or_load("b", lambda: sized())
+        self.assertEqual(cache.loaded_keys(), ["a", "b"])
+        cache.pin("a", False)
+        self.assertEqual(cache.loaded_keys(), ["b"])
+        cache.pin("b")
+        self.assertTrue(cache.unload("b"))
+        self.assertFalse(cache.unload("b"))
+        self.assertFalse(cache.pin("missing"))
+
+    def test_unload_by_model_path_and_unknown_family(self):
+        from inference import warmup
+
+        with mock.patch.object(warmup, "CACHE", ModelCache(capacity=8, ram_budget=0,
+                                                            vram_budget=0, estimate=by_size)):
+            warmup.CACHE.get_or_load("detect:yolo:/m/a.pt", lambda: sized(), "/m/a.pt")
+            warmup.CACHE.get_or_load("segment:/m/a.pt", lambda: sized(), "/m/a.pt")
+            warmup.CACHE.get_or_load("detect:yolo:/m/b.pt", lambda: sized(), "/m/b.pt")
+            # PaddleOCR's key doesn't contain its path.
+            warmup.CACHE.get_or_load("paddleocr", lambda: sized(), "/m/paddle")
+            self.assertEqual(
+                sorted(warmup.unload(model_path="/m/a.pt")),
+                ["detect:yolo:/m/a.pt", "segment:/m/a.pt"],
+            )
+            self.assertEqual(warmup.unload(model_path="/m/paddle"), ["paddleocr"])
+            self.assertEqual(warmup.unload(model_path="/m/a"), [])
+            self.assertEqual(warmup.CACHE.loaded_keys(), ["detect:yolo:/m/b.pt"])
+        with self.assertRaises(ValueError):
+            warmup.warm("/m/x", family="nope")
+
+    def test_pinning_load_is_never_evicted(self):
+        cache = ModelCache(capacity=1, ram_budget=0, vram_budget=0, estimate=by_size)
+        cache.get_or_load("a", lambda: sized(), pin=True)
+        cache.get_or_load("b", lambda: sized())
+        self.assertEqual(cache.loaded_keys(), ["a", "b"])
+        cache.get_or_load("b", lambda: sized(), pin=True)  # a hit pins too
+        cache.get_or_load("c", lambda: sized())
+        self.assertEqual(cache.loaded_keys(), ["a", "b", "c"])
+
+    def test_warm_pins_through_the_adapter(self):
+        from inference import synthetic, warmup
+
+        cache = ModelCache(capacity=1, ram_budget=0, vram_budget=0)
+        with mock.patch.object(synthetic, "CACHE", cache), \
+                mock.patch.dict(os.environ, {"VAILABEL_RT_SYNTHETIC": "1"}):
+            info = warmup.warm("synthetic://w?load_ms=0&compute_ms=0&mb=0")
+            synthetic.warmup("synthetic://other?load_ms=0&compute_ms=0&mb=0", "synthetic")
+        self.assertTrue(info["pinned"])
+        self.assertEqual([e["pinned"] for e in cache.stats()["entries"]], [True, False])
+
+
+class ModelCacheSingleFlightTests(unittest.TestCase):
+    def test_concurrent_misses_load_once(self):
+        cache = ModelCache(capacity=4, ram_budget=0, vram_budget=0)
+        calls = {"n": 0}
+        release = threading.Event()
+
+        def slow_load():
+            calls["n"] += 1
+            release.wait(5)
+            return object()
+
+        def get(_):
+            return cache.get_or_load("florence:/m", slow_load)
+
+        timer = threading.Timer(0.1, release.set)
+        timer.start()
+        results, errors = run_concurrently(get, list(range(8)))
+        timer.cancel()
+        self.assertEqual(errors, [None] * 8)
+        self.assertEqual(calls["n"], 1)
+        self.assertTrue(all(r is results[0] for r in results))
+
+    def test_failed_load_reaches_all_waiters_and_does_not_poison_key(self):
+        cache = ModelCache(capacity=4, ram_budget=0, vram_budget=0)
+        release = threading.Event()
+
+        def broken_load():
+            release.wait(5)
+            raise OSError("weights corrupt")
+
+        timer = threading.Timer(0.1, release.set)
+        timer.start()
+        _, errors = run_concurrently(lambda _: cache.get_or_load("k", broken_load), [0, 1, 2, 3])
+        timer.cancel()
+        self.assertTrue(all(isinstance(e, OSError) for e in errors))
+        self.assertEqual(cache.loaded_keys(), [])
+        fixed = cache.get_or_load("k", lambda: "model")
+        self.assertEqual(fixed, "model")
+
+
+class ImageCacheTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.decodes = []
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def write(self, name, data=b"x"):
+        path = os.path.join(self._tmp.name, name)
+        with open(path, "wb") as fh:
+            fh.write(data)
+        return path
+
+    def decode(self, path):
+        self.decodes.append(path)
+        with open(path, "rb") as fh:
+            raw = fh.read()
+        return raw, len(raw)
+
+    def test_decodes_each_file_version_once(self):
+        cache = ImageCache(budget_bytes=1000)
+        path = self.write("a.jpg", b"one")
+        self.assertEqual(cache.get(path, "rgb", self.decode), b"one")
+        self.assertEqual(cache.get(path, "rgb", self.decode), b"one")
+        self.assertEqual(len(self.decodes), 1)
+        # Rewriting changes size/mtime: a fresh decode, not stale pixels.
+        self.write("a.jpg", b"second")
+        self.assertEqual(cache.get(path, "rgb", self.decode), b"second")
+        self.assertEqual(len(self.decodes), 2)
+
+    def test_kinds_are_cached_separately(self):
+        cache = ImageCache(budget_bytes=1000)
+        path = self.write("a.jpg")
+        cache.get(path, "rgb", self.decode)
+        cache.get(path, "data_url", self.decode)
+        self.assertEqual(len(self.decodes), 2)
+        self.assertEqual(cache.stats()["entries"], 2)
+
+    def test_byte_budget_evicts_lru_and_skips_oversized(self):
+        cache = ImageCache(budget_bytes=10)
+        a, b, c = (self.write(n, b"12345") for n in ("a", "b", "c"))
+        cache.get(a, "rgb", self.decode)
+        cache.get(b, "rgb", self.decode)
+        cache.get(a, "rgb", self.decode)
+        cache.get(c, "rgb", self.decode)  # evicts b, the least recently used
+        self.assertEqual(self.decodes, [a, b, c])
+        cache.get(a, "rgb", self.decode)
+        self.assertEqual(len(self.decodes), 3)
+        big = self.write("big", b"x" * 11)
+        cache.get(big, "rgb", self.decode)
+        self.assertEqual(cache.stats()["entries"], 2)
+
+    def test_missing_file_raises_file_not_found(self):
+        with self.assertRaises(FileNotFoundError):
+            ImageCache(budget_bytes=10).get("/no/such/img.jpg", "rgb", self.decode)
+
+    def test_copilot_data_url_is_memoized(self):
+        from copilot import llm
+
+        path = self.write("shot.png", b"\x89PNG")
+        fresh = ImageCache(budget_bytes=1000)
+        with mock.patch.object(loader, "IMAGES", fresh):
+            url = llm.image_data_url(path)
+            self.assertTrue(url.startswith("data:image/png;base64,"))
+            self.assertIs(llm.image_data_url(path), url)
+            self.assertIsNone(llm.image_data_url(path + ".missing"))
+
+
+class AdapterRegistryTests(unittest.TestCase):
+    def test_every_entry_resolves_and_unknowns_raise(self):
+        from inference import adapters, segment
+
+        for task, (default, by_family) in adapters.ADAPTERS.items():
+            for family in list(by_family) + ([] if default is None else ["unlisted"]):
+                self.assertTrue(callable(adapters.adapter(task, family)), (task, family))
+        self.assertIs(adapters.adapter("segment", "sam2"), segment.run)
+        with self.assertRaises(ValueError):
+            adapters.adapter("warmup", "unlisted")
+        with self.assertRaises(ValueError):
+            adapters.adapter("teleport", "yolo")
+
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - optional in a bare runtime
+    Image = None
+
+
+@unittest.skipIf(Image is None, "pillow not installed")
+class DecodeOrientationTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_exif_orientation_is_applied_by_every_decoder(self):
+        # Stored 40x20 with the left half red; orientation 6 displays it rotated
+        # 90 degrees clockwise, i.e. 20 wide and 40 tall with red on top.
+        img = Image.new("RGB", (40, 20), (0, 0, 255))
+        img.paste((255, 0, 0), (0, 0, 20, 20))
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        path = os.path.join(self._tmp.name, "phone.jpg")
+        img.save(path, exif=exif, quality=95)
+
+        with mock.patch.object(loader, "IMAGES", ImageCache(budget_bytes=1 << 20)):
+            rgb = loader.load_array(path)
+            bgr = loader.load_array(path, "bgr")
+        for arr in (rgb, bgr, loader.decode_rgb(path)):
+            self.assertEqual(arr.shape, (40, 20, 3))
+        self.assertGreater(int(rgb[2, 10, 0]), 200)
+        self.assertGreater(int(rgb[37, 10, 2]), 200)
+        self.assertGreater(int(bgr[2, 10, 2]), 200)
+
+
+try:
+    import cv2  # noqa: F401
+    import numpy as np
+except ImportError:  # pragma: no cover - optional in a bare runtime
+    np = None
+
+
+@unittest.skipIf(np is None, "numpy/opencv not installed")
+class MasksToPolygonsTests(unittest.TestCase):
+    def test_batched_polygons_are_in_full_image_coordinates(self):
+        masks = np.zeros((3, 40, 60), dtype=np.float32)
+        masks[0, 10:20, 30:50] = 1.0
+        masks[2, 0:5, 0:5] = 1.0
+        polys = loader.masks_to_polygons(masks)
+        self.assertEqual(len(polys), 3)
+        self.assertEqual(polys[1], [])
+        xs = [p["x"] for p in polys[0]]
+        ys = [p["y"] for p in polys[0]]
+        self.assertEqual((min(xs), max(xs), min(ys), max(ys)), (30.0, 49.0, 10.0, 19.0))
+        self.assertEqual(loader.mask_to_polygon(masks[0] * 255), polys[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+"""Job logs (`services/job_logs.py`): ring buffer, bounded reads, eof and the
+`/training/logs/stream` SSE feed.
+
+Needs fastapi + httpx for the streaming test:
+`python -m unittest tests.test_job_logs` (cwd = runtime dir).
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import job_logs, job_manager  # noqa: E402
+
+try:
+    from fastapi.testclient import TestClient
+
+    import app as runtime_app
+except ImportError:  # pragma: no cover - optional in a bare runtime
+    TestClient = None
+
+
+class ScriptedRunner:
+    """Writes `count` lines, then waits for `done` before finishing the job."""
+
+    def __init__(self, count):
+        self.count = count
+        self.done = threading.Event()
+
+    def __call__(self, job_id, spec, log_path):
+        for i in range(self.count):
+            job_manager._append_log(log_path, f"line {i}")
+        self.done.wait(5)
+        job_manager._finish(job_id, lambda line: job_manager._append_log(log_path, line))
+
+
+class JobLogTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "logs", "job.log")
+        job_manager.configure("")
+
+    def tearDown(self):
+        job_logs.close(self.path)
+        self._tmp.cleanup()
+
+    def test_ring_serves_recent_lines_and_file_serves_older_ones(self):
+        with mock.patch.dict(os.environ, {"VAILABEL_RT_LOG_RING_KB": "0.05"}):  # ~51 bytes
+            for i in range(20):
+                job_logs.append(self.path, f"line {i:02d}")
+        lines, offset = job_logs.read(self.path, 0, max_bytes=40)
+        self.assertEqual(lines, ["line 00", "line 01", "line 02", "line 03", "line 04"])
+        lines, end = job_logs.read(self.path, offset, max_bytes=10_000)
+        self.assertEqual(lines[0], "line 05")
+        self.assertEqual(end, job_logs.size(self.path))
+        self.assertEqual(job_logs.read(self.path, end), ([], end))
+        job_logs.close(self.path)
+        with open(self.path, encoding="utf-8") as fh:
+            self.assertEqual(len(fh.read().splitlines()), 20)
+
+    def test_eof_only_after_the_job_finished_and_was_read(self):
+        runner = ScriptedRunner(3)
+        with mock.patch.dict(job_manager._RUNNERS, {"training": runner}):
+            job_manager.start_job({"job_id": "logs-1", "log_path": self.path})
+            deadline = time.time() + 5
+            while job_logs.size(self.path) == 0 and time.time() < deadline:
+                time.sleep(0.01)
+            chunk = job_manager.read_logs("logs-1", 0, max_bytes=8)
+            self.assertEqual((chunk["lines"], chunk["eof"]), (["line 0"], False))
+            runner.done.set()
+            while job_logs.is_open(self.path) and time.time() < deadline:
+                time.sleep(0.01)
+        rest = job_manager.read_logs("logs-1", chunk["next_offset"])
+        self.assertEqual(rest["lines"], ["line 1", "line 2", "[runtime] completed"])
+        self.assertTrue(rest["eof"])
+        self.assertTrue(job_manager.read_logs("missing")["eof"])
+
+    @unittest.skipIf(TestClient is None, "fastapi/httpx not installed")
+    def test_stream_pushes_lines_then_eof(self):
+        runner = ScriptedRunner(2)
+        client = TestClient(runtime_app.build_app(token="", models_dir="", log_dir=""))
+        with mock.patch.dict(job_manager._RUNNERS, {"training": runner}):
+            job_manager.start_job({"job_id": "logs-2", "log_path": self.path})
+            threading.Timer(0.2, runner.done.set).start()
+            lines, events = [], []
+            with client.stream("GET", "/training/logs/stream", params={"job_id": "logs-2"}) as resp:
+                self.assertEqual(resp.headers["content-type"].split(";")[0], "text/event-stream")
+                for raw in resp.iter_lines():
+                    if raw.startswith("event:"):
+                        events.append(raw.split(":", 1)[1].strip())
+                    elif raw.startswith("data:") and not events:
+                        lines.extend(json.loads(raw[5:])["lines"])
+        self.assertEqual(lines, ["line 0", "line 1", "[runtime] completed"])
+        self.assertEqual(events, ["eof"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,235 @@
+"""Persistent job table (`services/job_store.py`), restart reconciliation and the
+`job_manager` scheduler.
+
+Stdlib only (sqlite3); the export runner is a fake:
+`python -m unittest tests.test_job_store` (cwd = runtime dir).
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import exports, job_manager  # noqa: E402
+from services.job_store import JobStore  # noqa: E402
+
+try:
+    from fastapi.testclient import TestClient
+
+    import app as runtime_app
+except ImportError:  # pragma: no cover - optional in a bare runtime
+    TestClient = None
+
+
+class JobStoreTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "jobs.sqlite3")
+
+    def tearDown(self):
+        job_manager.configure("")
+        self._tmp.cleanup()
+
+    def test_rows_survive_reopening_in_wal_mode(self):
+        db = JobStore(self.path)
+        db.insert("j1", "training", {"project_id": "p1", "log_path": "/tmp/j1.log"})
+        db.update("j1", progress=0.5, metrics={"epoch": 3})
+        db.close()
+
+        db = JobStore(self.path)
+        job = db.get("j1")
+        self.assertEqual(
+            (job["status"], job["progress"], job["metrics"]), ("running", 0.5, {"epoch": 3})
+        )
+        self.assertEqual(job["project_id"], "p1")
+        self.assertNotIn("spec", job)
+        mode = sqlite3.connect(self.path).execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+        db.close()
+
+    def test_listing_filters_and_pages_in_sql(self):
+        db = JobStore()
+        for i in range(5):
+            db.insert(f"j{i}", "training", {"project_id": "p1" if i % 2 else "p2"})
+        db.update("j3", status="completed")
+        self.assertEqual([j["job_id"] for j in db.list(project_id="p1")], ["j1", "j3"])
+        self.assertEqual([j["job_id"] for j in db.list(status="running", limit=2, offset=1)],
+                         ["j1", "j2"])
+        self.assertEqual(db.list(kind="export"), [])
+        plan = db._db.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM jobs WHERE project_id = ? AND status = ?",
+            ("p1", "running"),
+        ).fetchall()
+        self.assertIn("jobs_project_status", " ".join(str(tuple(row)) for row in plan))
+
+    @unittest.skipIf(TestClient is None, "fastapi/httpx not installed")
+    def test_training_jobs_route_lists_other_kinds_only_on_request(self):
+        client = TestClient(runtime_app.build_app(token="", models_dir="", log_dir=""))
+        for job_id, kind in (("t", "training"), ("a", "autolabel"), ("e", "export")):
+            job_manager._store.insert(job_id, kind, {})
+
+        def listed(**params):
+            return [j["job_id"] for j in client.get("/training/jobs", params=params).json()]
+
+        self.assertEqual(listed(), ["t"])
+        self.assertEqual(listed(kind="autolabel"), ["a"])
+        self.assertCountEqual(listed(kind="all"), ["t", "a", "e"])
+
+    def test_finish_settles_cancellation_and_keeps_failures(self):
+        db = JobStore()
+        for job_id in ("ok", "stop", "bad"):
+            db.insert(job_id, "training", {})
+        db.update("stop", cancel=1)
+        db.update("bad", status="failed", error="boom")
+        self.assertEqual([db.finish(j) for j in ("ok", "stop", "bad")],
+                         ["completed", "canceled", "failed"])
+        self.assertEqual(db.get("ok")["progress"], 1.0)
+        self.assertIsNone(db.finish("missing"))
+
+    def test_restart_fails_training_and_resumes_exports(self):
+        weights = os.path.join(self._tmp.name, "best.pt")
+        with open(weights, "wb") as fh:
+            fh.write(b"weights")
+        out = os.path.join(self._tmp.name, "best.onnx")
+        db = JobStore(self.path)
+        db.insert("train", "training", {"job_id": "train", "model_family": "yolo"})
+        db.insert("exp", "export", {"job_id": "exp", "model_path": weights,
+                                    "format": "onnx", "output_path": out})
+        db.insert("stopped", "export", {"job_id": "stopped"}, cancel=1)
+        db.close()
+
+        def fake(req):
+            with open(req.output_path, "w", encoding="utf-8") as fh:
+                fh.write("graph")
+            return {"ok": True, "output_path": req.output_path, "error": None}
+
+        with mock.patch.dict(exports.EXPORTERS, {"onnx": (fake, "onnx")}):
+            actions = job_manager.configure(self.path)
+            deadline = time.time() + 5
+            while job_manager.get_job("exp")["status"] == "running" and time.time() < deadline:
+                time.sleep(0.02)
+        self.assertEqual({a["job_id"]: a["action"] for a in actions},
+                         {"train": "failed", "exp": "resumed", "stopped": "canceled"})
+        self.assertEqual(job_manager.get_job("train")["error"], "interrupted by a runtime restart")
+        self.assertEqual(job_manager.get_job("exp")["status"], "completed")
+        self.assertTrue(job_manager.get_job("exp")["result"]["ok"])
+
+
+class GatedRunner:
+    """Stands in for a job runner: records starts, blocks until released."""
+
+    def __init__(self):
+        self.started = []
+        self.gates = {}
+
+    def __call__(self, job_id, spec, log_path):
+        self.gates[job_id] = threading.Event()
+        self.started.append(job_id)
+        self.gates[job_id].wait(5)
+        job_manager._finish(job_id, lambda line: None)
+
+    def release(self, job_id):
+        self._wait(lambda: job_id in self.gates)
+        self.gates[job_id].set()
+        self._wait(lambda: job_manager.get_job(job_id)["status"] != "running")
+
+    @staticmethod
+    def _wait(condition):
+        deadline = time.time() + 5
+        while not condition() and time.time() < deadline:
+            time.sleep(0.01)
+
+
+class SchedulerTests(unittest.TestCase):
+    def setUp(self):
+        job_manager.configure("")
+        self.runner = GatedRunner()
+        patches = [
+            mock.patch.dict(job_manager._RUNNERS, {"training": self.runner,
+                                                   "autolabel": self.runner}),
+            mock.patch.dict(os.environ, {"VAILABEL_RT_MAX_JOBS": "1"}),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(self._cancel_retry)
+
+    def tearDown(self):
+        for gate in list(self.runner.gates.values()):
+            gate.set()
+
+    @staticmethod
+    def _cancel_retry():
+        timer, job_manager._retry_timer = job_manager._retry_timer, None
+        if timer is not None:
+            timer.cancel()
+
+    def _start(self, job_id, **spec):
+        return job_manager.start_job(dict({"job_id": job_id, "model_family": "sim"}, **spec))
+
+    def test_excess_jobs_queue_by_priority_then_arrival(self):
+        self.assertEqual(self._start("a")["status"], "running")
+        self.assertEqual(self._start("b")["queue_position"], 1)
+        urgent = self._start("c", priority=5)
+        self.assertEqual((urgent["status"], urgent["queue_position"]), ("queued", 1))
+        self.assertEqual(job_manager.get_job("b")["queue_position"], 2)
+
+        self.runner.release("a")
+        self.runner.release("c")
+        self.runner.release("b")
+        self.assertEqual(self.runner.started, ["a", "c", "b"])
+        queued = job_manager.list_jobs(status="queued")
+        self.assertEqual(queued, [])
+
+    def test_queued_job_can_be_canceled_before_it_starts(self):
+        self._start("a")
+        self._start("b")
+        job_manager.stop_job("b")
+        self.assertEqual(job_manager.get_job("b")["status"], "canceled")
+        self.runner.release("a")
+        self.assertEqual(self.runner.started, ["a"])
+
+    def test_job_waiting_for_the_gpu_does_not_block_cpu_jobs(self):
+        with mock.patch.object(job_manager, "_uses_gpu", lambda kind, spec: kind == "training"), \
+                mock.patch.object(job_manager, "_gpu_has_room", lambda: False):
+            self.assertEqual(self._start("gpu")["status"], "queued")
+            label = job_manager.start_autolabel_job({"job_id": "label"})
+            self.assertEqual(label["status"], "running")
+            self.runner.release("label")
+            self.assertEqual(self.runner.started, ["label"])
+            job_manager.stop_job("gpu")
+
+    def test_vram_room_is_the_device_wide_free_figure(self):
+        from services import device
+
+        # Little allocated by this process, yet other processes hold most of the card.
+        info = {"backend": "cuda", "vram_total_mb": 8192, "vram_used_mb": 100,
+                "vram_free_mb": 512}
+        with mock.patch.object(device, "gpu_info", lambda: info):
+            self.assertFalse(job_manager._gpu_has_room())
+            info["vram_free_mb"] = 4096
+            self.assertTrue(job_manager._gpu_has_room())
+
+    def test_job_waiting_for_vram_starts_once_it_frees_up(self):
+        vram = {"free": False}
+        with mock.patch.object(job_manager, "_uses_gpu", lambda kind, spec: True), \
+                mock.patch.object(job_manager, "_gpu_has_room", lambda: vram["free"]), \
+                mock.patch.dict(os.environ, {"VAILABEL_RT_JOB_RETRY_S": "0.02"}):
+            self.assertEqual(self._start("gpu")["status"], "queued")
+            time.sleep(0.1)
+            self.assertEqual(self.runner.started, [])
+            # No submit or finish follows: only the retry timer can admit it.
+            vram["free"] = True
+            self.runner._wait(lambda: self.runner.started == ["gpu"])
+            self.assertEqual(self.runner.started, ["gpu"])
+            self.runner.release("gpu")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+"""Sliced inference: tile grid, cross-tile NMS and lazy raster windows; batch entries.
+
+Needs numpy only (no ultralytics — the detector is a fake):
+`python -m unittest tests.test_postprocess` (cwd = runtime dir).
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference import detect  # noqa: E402
+from inference.loader import RuntimeDependencyError, open_raster  # noqa: E402
+from inference.postprocess import batch_results, nms, tile_grid  # noqa: E402
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional in a bare runtime
+    np = None
+
+try:
+    import cv2  # noqa: F401
+    from PIL import Image
+except ImportError:  # pragma: no cover - optional in a bare runtime
+    Image = None
+
+
+class TileGridTests(unittest.TestCase):
+    def test_windows_cover_the_image_and_stay_full_size(self):
+        windows = tile_grid(2500, 1000, 1024, 0.25)
+        self.assertEqual({w[0] for w in windows}, {0, 768, 1476})
+        self.assertEqual({w[1] for w in windows}, {0})
+        for x0, y0, x1, y1 in windows:
+            self.assertEqual((x1 - x0, y1 - y0), (1024, 1000))
+        self.assertEqual(max(w[2] for w in windows), 2500)
+
+    def test_small_image_is_one_window(self):
+        self.assertEqual(tile_grid(300, 200, 640), [(0, 0, 300, 200)])
+
+
+@unittest.skipIf(np is None, "numpy not installed")
+class NmsTests(unittest.TestCase):
+    def test_suppresses_overlaps_within_a_class_only(self):
+        boxes = [[0, 0, 10, 10], [1, 1, 11, 11], [0, 0, 10, 10], [50, 50, 60, 60]]
+        keep = nms(boxes, [0.9, 0.8, 0.7, 0.6], [0, 0, 1, 0], iou=0.5)
+        self.assertEqual(keep, [0, 2, 3])
+        self.assertEqual(nms([], [], []), [])
+        self.assertEqual(nms(boxes, [0.9, 0.8, 0.7, 0.6], [0, 0, 1, 0], max_keep=2), [0, 2])
+
+
+class BatchResultsTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.paths = []
+        for name in ("a.jpg", "bad.jpg", "c.jpg"):
+            self.paths.append(os.path.join(tmp.name, name))
+            open(self.paths[-1], "wb").close()
+
+    def test_bad_image_fails_only_its_own_entry(self):
+        calls, progress = [], []
+
+        def predict(chunk):
+            calls.append([os.path.basename(p) for p in chunk])
+            if any(p.endswith("bad.jpg") for p in chunk):
+                raise OSError("cannot identify image file")
+            return [[{"name": os.path.basename(p)}] for p in chunk]
+
+        paths = self.paths[:2] + ["/no/such.jpg"] + self.paths[2:]
+        report = batch_results(paths, predict, 2, on_progress=lambda *a: progress.append(a))
+        results = report["results"]
+        self.assertEqual([r["image_path"] for r in results], paths)
+        self.assertEqual([r.get("error", "")[:6] for r in results],
+                         ["", "cannot", "image ", ""])
+        self.assertEqual(results[0]["detections"], [{"name": "a.jpg"}])
+        self.assertEqual(calls, [["a.jpg", "bad.jpg"], ["a.jpg"], ["bad.jpg"], ["c.jpg"]])
+        self.assertEqual(progress, [(2, 3), (3, 3)])
+
+    def test_missing_dependency_still_fails_the_batch(self):
+        def predict(chunk):
+            raise RuntimeDependencyError("ultralytics", "ultralytics")
+
+        with self.assertRaises(RuntimeDependencyError):
+            batch_results(self.paths, predict, 2)
+
+
+class FakeTileModel:
+    """Reports one box at a fixed *global* position in every tile that sees it."""
+
+    def __init__(self, windows, box):
+        self.windows = list(windows)
+        self.box = box
+        self.batches = []
+
+    def predict(self, sources, batch, **kwargs):
+        self.batches.append((len(sources), kwargs.get("imgsz")))
+        out = []
+        for src in sources:
+            x0, y0, x1, y1 = self.windows.pop(0)
+            assert src.shape == (y1 - y0, x1 - x0, 3)
+            bx1, by1, bx2, by2 = self.box
+            rows = []
+            if bx1 >= x0 and by1 >= y0 and bx2 <= x1 and by2 <= y1:
+                rows.append([bx1 - x0, by1 - y0, bx2 - x0, by2 - y0, 0.9, 3])
+            data = np.asarray(rows, dtype=np.float32).reshape(-1, 6)
+            out.append(SimpleNamespace(names={3: "car"}, boxes=SimpleNamespace(data=data)))
+        return out
+
+
+@unittest.skipIf(np is None, "numpy not installed")
+class TiledDetectTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "scan.npy")
+        pixels = np.zeros((600, 900), dtype=np.uint16)
+        pixels[0, 0] = 65535
+        np.save(self.path, pixels)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_raster_windows_are_lazy_and_normalized(self):
+        raster = open_raster(self.path)
+        self.assertIsInstance(raster.pixels, np.memmap)
+        self.assertEqual((raster.width, raster.height), (900, 600))
+        win = raster.read(0, 0, 4, 2, order="bgr")
+        self.assertEqual((win.shape, win.dtype, int(win[0, 0, 0])), ((2, 4, 3), np.uint8, 255))
+
+    def test_12_bit_scans_use_one_range_for_every_window(self):
+        path = os.path.join(self._tmp.name, "micro12.npy")
+        pixels = np.full((600, 900), 1024, dtype=np.uint16)
+        pixels[300:, 450:] = 4095
+        np.save(path, pixels)
+        raster = open_raster(path)
+        self.assertEqual(raster.value_range, (0.0, 4095.0))
+        # A dim tile is not stretched to white: it matches the same level elsewhere.
+        self.assertEqual(int(raster.read(0, 0, 8, 8)[0, 0, 0]), 63)
+        self.assertEqual(int(raster.read(440, 290, 460, 310)[0, 0, 0]), 63)
+        self.assertEqual(int(raster.read(890, 590, 900, 600)[0, 0, 0]), 255)
+
+    def test_float_scans_beyond_unit_range_are_scaled_not_clipped(self):
+        path = os.path.join(self._tmp.name, "aerial.npy")
+        pixels = np.linspace(0.0, 300.0, 600 * 900, dtype=np.float32).reshape(600, 900)
+        np.save(path, pixels)
+        raster = open_raster(path)
+        self.assertEqual(int(raster.read(0, 0, 4, 4)[0, 0, 0]), 0)
+        self.assertEqual(int(raster.read(896, 596, 900, 600)[-1, -1, 0]), 255)
+        self.assertLess(int(raster.read(0, 300, 4, 304)[0, 0, 0]), 200)
+
+    def test_duplicates_across_overlapping_tiles_merge_to_one_box(self):
+        windows = tile_grid(900, 600, 400, 0.5)
+        model = FakeTileModel(windows, (300, 250, 340, 290))
+        columns = detect.run_tiled(model, self.path, 400, overlap=0.5)
+        self.assertEqual(columns["xyxy"], [[300.0, 250.0, 340.0, 290.0]])
+        self.assertEqual(columns["labelName"], ["car"])
+        self.assertTrue(all(size == 400 for _, size in model.batches))
+
+
+@unittest.skipIf(np is None or Image is None, "numpy/pillow/opencv not installed")
+class OversizedRasterTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_png_past_the_decompression_bomb_limit_still_opens(self):
+        # 200 MP: over twice PIL's MAX_IMAGE_PIXELS, which raises on open.
+        path = os.path.join(self._tmp.name, "scan.png")
+        img = Image.new("1", (20000, 10000), 0)
+        img.paste(1, (19990, 9990, 20000, 10000))
+        img.save(path)
+        del img
+        self.assertGreater(20000 * 10000, 2 * Image.MAX_IMAGE_PIXELS)
+
+        raster = open_raster(path)
+        self.assertEqual((raster.width, raster.height), (20000, 10000))
+        corner = raster.read(19980, 9980, 20000, 10000)
+        self.assertEqual(corner.shape, (20, 20, 3))
+        self.assertEqual((int(corner[-1, -1, 0]), int(corner[0, 0, 0])), (255, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+"""INT8 export (`export/quantize.py`): calibration sampling and the mAP guard.
+
+Export, quantization and validation are swapped for fakes, so this needs only
+PyYAML: `python -m unittest tests.test_quantize` (cwd = runtime dir).
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from export import quantize  # noqa: E402
+
+try:
+    import yaml  # noqa: F401
+except ImportError:  # pragma: no cover - optional in a bare runtime
+    yaml = None
+
+
+@unittest.skipIf(yaml is None, "pyyaml not installed")
+class QuantizeTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        root = self._tmp.name
+        for split in ("train", "val"):
+            os.makedirs(os.path.join(root, "images", split))
+            for i in range(10):
+                open(os.path.join(root, "images", split, f"{i:02d}.jpg"), "wb").close()
+        self.data = os.path.join(root, "data.yaml")
+        with open(self.data, "w", encoding="utf-8") as fh:
+            fh.write("path: .\ntrain: images/train\nval: images/val\nnames: {0: cat}\n")
+        self.out = os.path.join(root, "out", "model_int8.onnx")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_calibration_sample_is_deterministic_and_from_train(self):
+        train = quantize.split_images(self.data)
+        self.assertEqual(len(train), 10)
+        sample = quantize.calibration_sample(train, 4, seed=1)
+        self.assertEqual(sample, quantize.calibration_sample(train, 4, seed=1))
+        self.assertEqual(len(sample), 4)
+        self.assertTrue(all(os.sep + "train" + os.sep in p for p in sample))
+
+    def _run(self, fp32_map, int8_map, **opts):
+        int8 = os.path.join(self._tmp.name, "scratch_int8.onnx")
+        open(int8, "wb").close()
+        scores = {"fp32": fp32_map, "int8": int8_map}
+
+        def fake_eval(artifact, dataset_path, imgsz, family):
+            kind = "int8" if artifact == int8 else "fp32"
+            return {"map50": scores[kind], "map50_95": scores[kind], "latency_ms": 10.0}
+
+        req = SimpleNamespace(model_path="/m/yolo/best.pt", format="onnx", output_path=self.out,
+                              dataset_path=self.data, opts={"calib_size": 3, **opts})
+        artifacts = {"fp32": "fp32", "int8": int8}
+        with mock.patch.object(quantize, "_load", lambda path: object()), \
+                mock.patch.object(quantize, "_quantize_onnx", lambda *args: artifacts), \
+                mock.patch.object(quantize, "_evaluate", fake_eval):
+            return quantize.run(req)
+
+    def test_report_compares_fp32_and_int8(self):
+        result = self._run(0.50, 0.495)
+        self.assertTrue(result["ok"], result["error"])
+        self.assertEqual(result["output_path"], self.out)
+        self.assertTrue(os.path.exists(self.out))
+        self.assertEqual(result["report"]["calibration_images"], 3)
+        self.assertEqual(result["report"]["map50_95_drop"], 0.005)
+
+    def test_max_map_drop_rejects_a_degraded_model(self):
+        result = self._run(0.50, 0.40, max_map_drop=0.01)
+        self.assertFalse(result["ok"])
+        self.assertIn("max_map_drop", result["error"])
+        self.assertFalse(os.path.exists(self.out))
+
+    def test_rejected_openvino_model_leaves_nothing_next_to_the_weights(self):
+        weights = os.path.join(self._tmp.name, "models", "best.pt")
+        os.makedirs(os.path.dirname(weights))
+        open(weights, "wb").close()
+
+        class FakeModel:
+            def export(self, format, int8=False, **kwargs):
+                name = "best_int8_openvino_model" if int8 else "best_openvino_model"
+                produced = os.path.join(os.path.dirname(weights), name)
+                os.makedirs(produced)
+                open(os.path.join(produced, "best.xml"), "wb").close()
+                return produced
+
+        def fake_eval(artifact, dataset_path, imgsz, family):
+            score = 0.40 if artifact.endswith("int8_openvino_model") else 0.50
+            return {"map50": score, "map50_95": score, "latency_ms": 10.0}
+
+        def fake_import(module, pip=None):
+            return __import__(module) if module == "yaml" else None
+
+        req = SimpleNamespace(model_path=weights, format="openvino", output_path="",
+                              dataset_path=self.data, opts={"max_map_drop": 0.01})
+        with mock.patch.object(quantize, "_load", lambda path: FakeModel()), \
+                mock.patch.object(quantize, "lazy_import", fake_import), \
+                mock.patch.object(quantize, "_evaluate", fake_eval):
+            result = quantize.run(req)
+        self.assertFalse(result["ok"])
+        self.assertIn("max_map_drop", result["error"])
+        self.assertEqual(os.listdir(os.path.dirname(weights)), ["best.pt"])
+
+    def test_rtdetr_weights_are_validated_with_the_rtdetr_class(self):
+        built = []
+        metrics = SimpleNamespace(box=SimpleNamespace(map50=0.5, map=0.4),
+                                  speed={"inference": 3.0})
+
+        def wrapper(kind):
+            def build(artifact, **kwargs):
+                built.append(kind)
+                return SimpleNamespace(val=lambda **kw: metrics)
+            return build
+
+        ultra = SimpleNamespace(RTDETR=wrapper("rtdetr"), YOLO=wrapper("yolo"))
+        with mock.patch.object(quantize, "lazy_import", lambda module, pip=None: ultra):
+            report = quantize._evaluate("m.onnx", self.data, None, "rtdetr")
+            quantize._evaluate("m.onnx", self.data, None, "yolo")
+        self.assertEqual(built, ["rtdetr", "yolo"])
+        self.assertEqual(report["map50_95"], 0.4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -36,6 +36,7 @@ def test_adapter_modules_import_without_heavy_deps():
     import inference.florence  # noqa: F401
     import inference.qwen  # noqa: F401
     import inference.paddle  # noqa: F401
+    import inference.warmup  # noqa: F401
     import export._common  # noqa: F401
     import export.onnx  # noqa: F401
     import export.tensorrt  # noqa: F401
@@ -56,9 +57,35 @@ def test_routers_and_app_build():
     routes = {r.path for r in built.routes}
     assert "/health" in routes
     assert "/inference/object-detection" in routes
+    assert "/inference/object-detection/batch" in routes
     assert "/ocr" in routes
     assert "/training/start" in routes
+    assert "/autolabel/start" in routes
     assert "/export/onnx" in routes
+    assert "/export/int8" in routes
+    assert "/export/start" in routes and "/export/jobs" in routes
+    assert "/events" in routes and "/training/logs/stream" in routes
+    assert "/models/warmup" in routes
+    assert "/metrics" in routes
+
+
+def test_unknown_perf_hint_is_rejected_before_dispatch():
+    """An OpenVINO hint outside the known set is a 422, not a failed inference."""
+    if not (_has("fastapi") and _has("httpx")):
+        print("  (skipped: fastapi/httpx not installed in this interpreter)")
+        return
+    from fastapi.testclient import TestClient
+
+    import app
+
+    client = TestClient(app.build_app(token="", models_dir="", log_dir=""))
+    body = {"model_path": "/m/openvino/best_openvino_model", "image_path": "/m/a.jpg"}
+    for path, extra in (
+        ("/inference/object-detection", {}),
+        ("/inference/object-detection/batch", {"image_paths": ["/m/a.jpg"]}),
+    ):
+        response = client.post(path, json={**body, **extra, "perf_hint": "fastest"})
+        assert response.status_code == 422, response.text
 
 
 def test_infer_family():
@@ -70,6 +97,7 @@ def test_infer_family():
     assert infer_family("/m/qwen/x") == "qwen"
     assert infer_family("/m/paddleocr/x") == "paddleocr"
     assert infer_family("/m/whatever/yolov8n.pt") == "yolo"
+    assert infer_family("/m/yolo/yolov8n.onnx") == "onnx"
     assert infer_family("ignored", explicit="RTDETR") == "rtdetr"
 
 
@@ -91,6 +119,41 @@ def test_inference_adapters_raise_dependency_error_when_absent():
             pass
 
 
+def test_batch_detect_reports_missing_images_per_entry():
+    """Missing paths fail only their own entry — and never load a model."""
+    from inference import detect
+
+    req = SimpleNamespace(
+        model_path="/no/such/model.pt",
+        image_paths=["/no/such/a.jpg", "/no/such/b.jpg"],
+        conf=None, iou=None, family=None, batch_size=4,
+    )
+    result = detect.run_batch(req)
+    assert [r["image_path"] for r in result["results"]] == req.image_paths
+    for entry in result["results"]:
+        assert entry["detections"] == []
+        assert "not found" in entry["error"]
+
+
+def test_segment_prompt_batches():
+    """Many boxes / point groups become one SAM call each; ragged groups pad."""
+    from inference.segment import _prompt_batches
+
+    req = SimpleNamespace(
+        points=[[1, 2]], box_xyxy=[0, 0, 5, 5],
+        boxes=[[0, 0, 1, 1], [2, 2, 3, 3]],
+        point_groups=[[[1, 1]], [[2, 2], [3, 3]]],
+    )
+    batches = _prompt_batches(req)
+    assert [first for first, _ in batches] == [0, 1, 3]
+    assert batches[0][1] == {"points": [[1, 2]], "labels": [1], "bboxes": [[0, 0, 5, 5]]}
+    assert batches[1][1] == {"bboxes": [[0, 0, 1, 1], [2, 2, 3, 3]]}
+    assert batches[2][1]["points"] == [[[1, 1], [0.0, 0.0]], [[2, 2], [3, 3]]]
+    assert batches[2][1]["labels"] == [[1, -1], [1, 1]]
+    empty = SimpleNamespace(points=[], box_xyxy=None, boxes=[], point_groups=[])
+    assert _prompt_batches(empty) == [(None, {})]
+
+
 def _dep_for(fn) -> str:
     return {
         "inference.detect": "ultralytics",
@@ -101,10 +164,10 @@ def _dep_for(fn) -> str:
 
 
 def test_exporters_degrade_to_ok_false_when_absent():
-    from export import onnx, openvino, tensorrt
+    from export import onnx, openvino, quantize, tensorrt
 
     req = SimpleNamespace(model_path="/no/such/model.pt", output_path="/tmp/out.onnx", opts={})
-    for mod in (onnx, tensorrt, openvino):
+    for mod in (onnx, tensorrt, openvino, quantize):
         result = mod.run(req)
         assert result["ok"] is False
         assert result["error"]  # a non-empty, explanatory message
@@ -147,8 +210,11 @@ def main() -> int:
     tests = [
         test_adapter_modules_import_without_heavy_deps,
         test_routers_and_app_build,
+        test_unknown_perf_hint_is_rejected_before_dispatch,
         test_infer_family,
         test_inference_adapters_raise_dependency_error_when_absent,
+        test_batch_detect_reports_missing_images_per_entry,
+        test_segment_prompt_batches,
         test_exporters_degrade_to_ok_false_when_absent,
         test_simulated_trainer_runs_end_to_end,
     ]
@@ -0,0 +1,100 @@
+"""SAM embedding reuse in `inference/segment.py`, against a fake predictor.
+
+No ultralytics/torch needed: `python -m unittest tests.test_segment`
+(cwd = runtime dir).
+"""
+
+import gc
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference import segment  # noqa: E402
+from inference.loader import ImageCache  # noqa: E402
+
+
+class FakeFeatures:
+    def numel(self):
+        return 256 * 64 * 64
+
+    def element_size(self):
+        return 4
+
+
+class FakePredictor:
+    def __init__(self):
+        self.features = None
+        self.encodes = 0
+        self.calls = []
+
+    def set_image(self, image):
+        self.encodes += 1
+        self.features = FakeFeatures()
+
+    def reset_image(self):
+        self.features = None
+
+    def __call__(self, image, **prompts):
+        assert self.features is not None, "decoder ran without an embedding"
+        self.calls.append(prompts)
+        return ["result"]
+
+
+class FakeSam:
+    def __init__(self):
+        self.predictor = FakePredictor()
+
+    def predict(self, *args, **kwargs):
+        raise AssertionError("prompted calls must go through the predictor")
+
+
+class EmbeddingReuseTests(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.image_path = os.path.join(self._tmp.name, "img.jpg")
+        with open(self.image_path, "wb") as fh:
+            fh.write(b"jpeg")
+        patcher = mock.patch.object(segment, "EMBEDDINGS", ImageCache(64 * 1024 * 1024))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_repeated_clicks_encode_the_image_once(self):
+        sam = FakeSam()
+        for clicks in ([[1, 1]], [[1, 1], [5, 5]], [[1, 1], [5, 5], [9, 9]]):
+            prompts = {"points": clicks, "labels": [1] * len(clicks)}
+            out = segment._predict(sam, "/m/sam/mobile_sam.pt", self.image_path, "img", prompts)
+            self.assertEqual(out, ["result"])
+        self.assertEqual(sam.predictor.encodes, 1)
+        self.assertEqual(len(sam.predictor.calls), 3)
+        # The shared predictor never leaks one image's embedding into the next call.
+        self.assertIsNone(sam.predictor.features)
+
+    def test_embeddings_are_per_model_and_per_file_version(self):
+        first, second = FakeSam(), FakeSam()
+        segment._predict(first, "/m/a.pt", self.image_path, "img", {"bboxes": [[0, 0, 1, 1]]})
+        segment._predict(second, "/m/b.pt", self.image_path, "img", {"bboxes": [[0, 0, 1, 1]]})
+        self.assertEqual((first.predictor.encodes, second.predictor.encodes), (1, 1))
+        with open(self.image_path, "wb") as fh:
+            fh.write(b"edited jpeg")
+        segment._predict(first, "/m/a.pt", self.image_path, "img", {"bboxes": [[0, 0, 1, 1]]})
+        self.assertEqual(first.predictor.encodes, 2)
+
+    def test_predict_lock_goes_away_with_its_model(self):
+        sam = FakeSam()
+        segment._predict(sam, "/m/a.pt", self.image_path, "img", {"bboxes": [[0, 0, 1, 1]]})
+        self.assertIn(sam, segment._PREDICT_LOCKS)
+        before = len(segment._PREDICT_LOCKS)
+        del sam
+        gc.collect()
+        self.assertEqual(len(segment._PREDICT_LOCKS), before - 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+"""Synthetic model family: spec parsing, adapter output shapes and routing.
+
+Pure Python apart from the app test (needs fastapi):
+`python -m unittest tests.test_synthetic` (cwd = runtime dir).
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference import synthetic  # noqa: E402
+from inference.loader import ModelCache, infer_family  # noqa: E402
+
+try:
+    from fastapi.testclient import TestClient
+
+    import app as runtime_app
+except ImportError:  # pragma: no cover - optional in a bare runtime
+    runtime_app = None
+
+SPEC = "synthetic://det-a?load_ms=0&compute_ms=1&boxes=5&mb=1&vertices=12"
+
+
+class SyntheticTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.images = []
+        for name in ("a.jpg", "b.jpg"):
+            path = os.path.join(tmp.name, name)
+            open(path, "wb").close()
+            self.images.append(path)
+        cache = ModelCache(capacity=4, ram_budget=0, vram_budget=0)
+        patcher = mock.patch.object(synthetic, "CACHE", cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = cache
+        env = mock.patch.dict(
+            os.environ, {"VAILABEL_RT_BATCH_MAX": "1", "VAILABEL_RT_SYNTHETIC": "1"}
+        )
+        env.start()
+        self.addCleanup(env.stop)
+
+    def test_spec_and_family(self):
+        params = synthetic.parse_spec(SPEC + "&work=cpu&bogus=1&boxes=oops")
+        self.assertEqual((params["name"], params["work"], params["boxes"]), ("det-a", "cpu", 5))
+        self.assertEqual(params["compute_ms"], 1.0)
+        self.assertEqual(synthetic.parse_spec("synthetic://x")["load_ms"], 500.0)
+        self.assertEqual(infer_family(SPEC), "synthetic")
+        self.assertEqual(infer_family("/models/synthetic/det.pt"), "synthetic")
+        self.assertEqual(infer_family("/models/yolo/synthetic_rtdetr.onnx"), "synthetic")
+        self.assertEqual(synthetic.parse_spec("synthetic://x?mb=1e9")["mb"], synthetic.MAX_MB)
+
+    def test_disabled_without_the_env_switch(self):
+        with mock.patch.dict(os.environ, {"VAILABEL_RT_SYNTHETIC": ""}):
+            self.assertEqual(infer_family(SPEC), "yolo")
+            self.assertEqual(infer_family("/models/synthetic/det.pt"), "yolo")
+            with self.assertRaises(ValueError):
+                synthetic.run(SimpleNamespace(model_path=SPEC, image_path=self.images[0]))
+        self.assertEqual(self.cache.loaded_keys(), [])
+
+    def test_detect_is_deterministic_and_cache_accounted(self):
+        req = SimpleNamespace(model_path=SPEC, image_path=self.images[0])
+        first = synthetic.run(req)["detections"]
+        self.assertEqual(len(first), 5)
+        self.assertEqual(first, synthetic.run(req)["detections"])
+        self.assertEqual(first[0]["type"], "box")
+        self.assertEqual(self.cache.stats()["ram_used_mb"], 1.0)
+        with self.assertRaises(FileNotFoundError):
+            synthetic.run(SimpleNamespace(model_path=SPEC, image_path="/no/such.jpg"))
+
+    def test_batch_flags_missing_images_and_reports_progress(self):
+        progress = []
+        req = SimpleNamespace(
+            model_path=SPEC,
+            image_paths=[self.images[0], "/no/such.jpg", self.images[1]],
+            columnar=True,
+            batch_size=1,
+            on_progress=lambda done, total: progress.append((done, total)),
+        )
+        results = synthetic.run_batch(req)["results"]
+        self.assertEqual(len(results[0]["columns"]["xyxy"]), 5)
+        self.assertIn("not found", results[1]["error"])
+        self.assertEqual(progress, [(1, 2), (2, 2)])
+
+    def test_segment_caption_and_ocr_shapes(self):
+        seg = synthetic.run_segment(
+            SimpleNamespace(model_path=SPEC, image_path=self.images[0], boxes=[[0, 0, 5, 5]] * 3)
+        )["masks"]
+        self.assertEqual([m["promptIndex"] for m in seg], [0, 1, 2])
+        self.assertEqual(len(seg[0]["coordinates"]), 12)
+        one = SimpleNamespace(model_path=SPEC + "&text_chars=40&lines=2", image_path=self.images[1])
+        self.assertLessEqual(len(synthetic.run_caption(one)["text"]), 40)
+        self.assertEqual(len(synthetic.run_ocr(one)["lines"]), 2)
+
+
+@unittest.skipIf(runtime_app is None, "fastapi not installed")
+class SyntheticRouteTests(unittest.TestCase):
+    @mock.patch.dict(os.environ, {"VAILABEL_RT_SYNTHETIC": "1"})
+    def test_routes_dispatch_synthetic_models(self):
+        with tempfile.NamedTemporaryFile(suffix=".jpg") as image:
+            client = TestClient(runtime_app.build_app(token="", models_dir="", log_dir=""))
+            body = {"model_path": SPEC, "image_path": image.name}
+            detect = client.post("/inference/object-detection", json=body)
+            caption = client.post("/inference/caption", json=body)
+            segment = client.post("/inference/segmentation", json=body)
+        self.assertEqual(len(detect.json()["detections"]), 5)
+        self.assertTrue(caption.json()["text"])
+        self.assertEqual(len(segment.json()["masks"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""Stage tracing: spans, the Prometheus summaries and `Server-Timing` headers.
+
+Needs fastapi for the dispatch test:
+`python -m unittest tests.test_tracing` (cwd = runtime dir).
+"""
+
+import asyncio
+import contextvars
+import os
+import sys
+import time
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference import tracing  # noqa: E402
+
+try:
+    from routers import inference as inference_router
+except ImportError:  # pragma: no cover - optional in a bare runtime
+    inference_router = None
+
+
+class TracingTests(unittest.TestCase):
+    def test_spans_add_up_and_are_noops_without_a_trace(self):
+        def scenario():
+            self.assertIs(tracing.span("predict"), tracing._NO_SPAN)
+            with mock.patch.dict(os.environ, {"VAILABEL_RT_TRACE": "1"}):
+                trace = tracing.begin()
+            for _ in range(2):
+                with tracing.span("predict"):
+                    time.sleep(0.01)
+            return trace
+
+        trace = contextvars.copy_context().run(scenario)
+        self.assertEqual(list(trace.stages), ["predict"])
+        self.assertGreaterEqual(trace.stages["predict"], 0.02)
+        self.assertRegex(trace.server_timing(), r"^predict;dur=\d+\.\d\d$")
+
+    def test_summaries_render_quantiles_sum_and_count(self):
+        summaries = tracing.Summaries(window=100)
+        for ms in range(1, 101):
+            trace = tracing.Trace()
+            trace.add("predict", ms / 1000)
+            summaries.record("/inference/object-detection", "yolo", trace)
+        text = summaries.render()
+        labels = 'route="/inference/object-detection",family="yolo",stage="predict"'
+        self.assertIn(f'vailabel_stage_seconds{{{labels},quantile="0.5"}} 0.051000', text)
+        self.assertIn(f'vailabel_stage_seconds{{{labels},quantile="0.99"}} 0.100000', text)
+        self.assertIn(f"vailabel_stage_seconds_sum{{{labels}}} 5.050000", text)
+        self.assertIn(f"vailabel_stage_seconds_count{{{labels}}} 100", text)
+        self.assertIn("# TYPE vailabel_stage_seconds summary", text)
+
+
+@unittest.skipIf(inference_router is None, "fastapi not installed")
+class DispatchTests(unittest.TestCase):
+    def setUp(self):
+        tracing.SUMMARIES.clear()
+        self.addCleanup(tracing.SUMMARIES.clear)
+
+    def _dispatch(self, env):
+        def adapter(req):
+            with tracing.span("predict"):
+                time.sleep(0.005)
+            return {"detections": []}
+
+        req = SimpleNamespace(model_path="/m/yolo/yolov8n.pt", family=None)
+        with mock.patch.dict(os.environ, env):
+            return asyncio.run(inference_router._dispatch(adapter, req, None, "/x"))
+
+    def test_traced_response_carries_server_timing_and_feeds_metrics(self):
+        response = self._dispatch({"VAILABEL_RT_TRACE": "1"})
+        timing = response.headers["Server-Timing"]
+        for stage in ("threadpool", "predict", "encode", "total"):
+            self.assertIn(f"{stage};dur=", timing)
+        self.assertEqual(response.body, b'{"detections":[]}')
+        self.assertIn('route="/x",family="yolo",stage="predict"', tracing.SUMMARIES.render())
+
+    def test_untraced_dispatch_returns_the_plain_result(self):
+        self.assertEqual(self._dispatch({"VAILABEL_RT_TRACE": "0"}), {"detections": []})
+        self.assertNotIn("vailabel_stage_seconds{", tracing.SUMMARIES.render())
+
+
+if __name__ == "__main__":
+    unittest.main()
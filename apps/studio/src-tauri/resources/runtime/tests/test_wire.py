@@ -0,0 +1,66 @@
+"""Packed response encoding (`inference/wire.py`) and its content negotiation.
+
+Pure Python: `python -m unittest tests.test_wire` (cwd = runtime dir).
+"""
+
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference import wire  # noqa: E402
+from inference.loader import draft, xyxy_to_points  # noqa: E402
+
+
+def polygon(n, dx=0.0):
+    return [{"x": float(i) + dx, "y": float(2 * i) + 0.5} for i in range(n)]
+
+
+class WireRoundTripTests(unittest.TestCase):
+    def test_drafts_round_trip_and_shrink(self):
+        masks = []
+        for i in range(20):
+            item = draft("object", "polygon", polygon(150, i), 1.0)
+            item["promptIndex"] = i
+            masks.append(item)
+        payload = {"masks": masks}
+        blob = wire.encode(payload)
+        self.assertTrue(blob.startswith(wire.MAGIC))
+        self.assertEqual(wire.decode(blob), payload)
+        self.assertLess(len(blob), len(json.dumps(payload)) / 2)
+
+    def test_nested_tables_ragged_keys_and_empty_lists(self):
+        hit = draft("car", "box", xyxy_to_points(1, 2, 3, 4), 0.75)
+        hit["classId"] = 2
+        plain = draft("dog", "box", xyxy_to_points(5, 6, 7, 8), 0.25)
+        payload = {
+            "results": [
+                {"image_path": "/a.jpg", "detections": [hit, plain]},
+                {"image_path": "/b.jpg", "detections": [], "error": "missing"},
+            ],
+            "lines": [{"text": "hi", "confidence": 1.0, "coordinates": []}],
+        }
+        self.assertEqual(wire.decode(wire.encode(payload)), payload)
+
+    def test_non_draft_payloads_pass_through(self):
+        for payload in ({"text": "a cat"}, {"columns": {"xyxy": [[1, 2, 3, 4]]}}):
+            self.assertEqual(wire.decode(wire.encode(payload)), payload)
+
+    def test_bad_magic_is_rejected(self):
+        with self.assertRaises(ValueError):
+            wire.decode(b"JSON{}")
+
+
+class AcceptTests(unittest.TestCase):
+    def test_accept_header_negotiation(self):
+        self.assertTrue(wire.accepts_packed(wire.MEDIA_TYPE))
+        self.assertTrue(wire.accepts_packed(f"application/json;q=0.5, {wire.MEDIA_TYPE}"))
+        self.assertFalse(wire.accepts_packed(f"{wire.MEDIA_TYPE};q=0"))
+        self.assertFalse(wire.accepts_packed("application/json"))
+        self.assertFalse(wire.accepts_packed(None))
+
+
+if __name__ == "__main__":
+    unittest.main()